@@ -122,7 +122,7 @@ class RecommendationEngine:
             selected_cold = np.random.choice(cold_nums, min(cold_count, len(cold_nums)), replace=False)
             
             return {
-                'numbers': sorted(list(selected_hot) + list(selected_cold)),
+                'numbers': sorted(selected_hot.tolist() + selected_cold.tolist()),
                 'hot_numbers': sorted(selected_hot.tolist()),
                 'cold_numbers': sorted(selected_cold.tolist()),
                 'strategy': 'שילוב מספרים "חמים" ו"קרים"',
@@ -126,7 +126,7 @@ class StatisticsEngine:
                 'chi_square': {
                     'statistic': float(chi2_stat),
                     'p_value': float(p_value),
-                    'is_fair': p_value > 0.05,
+                    'is_fair': bool(p_value > 0.05),
                     'interpretation': 'התפלגות אחידה' if p_value > 0.05 else 'סטייה מהתפלגות אחידה'
                 },
                 'sample_size': len(self.numbers)
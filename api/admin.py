@@ -1,42 +1,49 @@
 """Admin API routes"""
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request, send_file
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from models.database import Database
-from datetime import datetime
+from api.auth import DUMMY_HASH, VerifierBusy
+from api.extensions import current_etl_queue, current_password_verifier, db
+import base64
 import logging
-import hashlib
+import os
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 admin_bp = Blueprint('admin', __name__)
-db = Database()
-
-def hash_password(password):
-    """Simple password hashing (use bcrypt in production)"""
-    return hashlib.sha256(password.encode()).hexdigest()
 
 @admin_bp.route('/login', methods=['POST'])
 def admin_login():
-    """Admin login endpoint"""
+    """Admin login endpoint (admin_users; hashing runs on the bounded verifier pool)"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         username = data.get('username')
         password = data.get('password')
         
         if not username or not password:
             return jsonify({'success': False, 'error': 'Missing credentials'}), 400
         
-        # Check credentials (simplified - use proper auth in production)
-        from flask import current_app
-        if username == current_app.config['ADMIN_USERNAME'] and password == current_app.config['ADMIN_PASSWORD']:
-            access_token = create_access_token(identity=username)
-            return jsonify({
-                'success': True,
-                'access_token': access_token,
-                'username': username
-            }), 200
-        else:
+        user = db.get_admin_user(username)
+        active = bool(user and user['is_active'])
+        # Unknown and inactive users are checked against a dummy hash so every failure costs the same
+        try:
+            valid = current_password_verifier().verify(password, user['password_hash'] if active else DUMMY_HASH)
+        except VerifierBusy:
+            logger.warning("Login rejected: password verification pool is saturated")
+            response = jsonify({'success': False, 'error': 'Too many login attempts, retry shortly'})
+            response.headers['Retry-After'] = '1'
+            return response, 503
+        
+        if not (active and valid):
             return jsonify({'success': False, 'error': 'Invalid credentials'}), 401
+        
+        db.update_admin_last_login(user['id'])
+        access_token = create_access_token(identity=username, additional_claims={'role': user['role']})
+        return jsonify({
+            'success': True,
+            'access_token': access_token,
+            'username': username
+        }), 200
     except Exception as e:
         logger.error(f"Login error: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -44,52 +51,146 @@ def admin_login():
 @admin_bp.route('/trigger-etl', methods=['POST'])
 @jwt_required()
 def trigger_etl():
-    """Manually trigger ETL process"""
+    """Queue an ETL run; returns the job id immediately"""
     try:
         current_user = get_jwt_identity()
-        logger.info(f"ETL triggered by {current_user}")
         
-        data = request.get_json() or {}
+        data = request.get_json(silent=True) or {}
         game_id = data.get('game_id', 'all')
         mode = data.get('mode', 'incremental')
+        if mode not in ('incremental', 'full'):
+            return jsonify({'success': False, 'error': f"Invalid mode '{mode}'"}), 400
         
-        # Import and run ETL
-        from scripts.etl_runner import run_etl
-        result = run_etl(game_id=game_id, mode=mode)
+        etl_queue = current_etl_queue()
+        etl_queue.start(workers=current_app.config['ETL_JOB_WORKERS'])
+        job, created = etl_queue.submit(game_id=game_id, mode=mode, requested_by=current_user)
+        logger.info(f"ETL triggered by {current_user}: job {job['id']}")
         
         return jsonify({
             'success': True,
-            'message': 'ETL completed',
-            'result': result
-        }), 200
+            'message': 'ETL job queued' if created else 'Identical ETL job already pending',
+            'job_id': job['id'],
+            'status': job['status'],
+            'status_url': f"/api/admin/etl-jobs/{job['id']}"
+        }), 202
     except Exception as e:
         logger.error(f"ETL trigger error: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@admin_bp.route('/etl-jobs', methods=['GET'])
+@jwt_required()
+def list_etl_jobs():
+    """List recent ETL jobs"""
+    try:
+        limit = min(int(request.args.get('limit', 50)), 500)
+        return jsonify({
+            'success': True,
+            'jobs': db.list_etl_jobs(limit=limit)
+        }), 200
+    except Exception as e:
+        logger.error(f"Error listing ETL jobs: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@admin_bp.route('/etl-jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_etl_job(job_id):
+    """Get ETL job status with per-game progress"""
+    try:
+        job = db.get_etl_job(job_id)
+        if not job:
+            return jsonify({'success': False, 'error': 'Job not found'}), 404
+        return jsonify({'success': True, 'job': job}), 200
+    except Exception as e:
+        logger.error(f"Error getting ETL job {job_id}: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def _parse_day(value, name):
+    """Validate an optional YYYY-MM-DD query parameter"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f"Invalid {name} '{value}' (expected YYYY-MM-DD)")
+
+def _encode_cursor(cursor):
+    return base64.urlsafe_b64encode(f'{cursor[0]}|{cursor[1]}'.encode()).decode()
+
+def _decode_cursor(value):
+    try:
+        run_date, run_id = base64.urlsafe_b64decode(value.encode()).decode().rsplit('|', 1)
+        return run_date, int(run_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor')
+
 @admin_bp.route('/ingestion-logs', methods=['GET'])
 @jwt_required()
 def get_ingestion_logs():
-    """Get ETL ingestion logs"""
+    """Get ETL ingestion logs (filters: game_id, status, from, to; keyset paging via cursor)"""
     try:
         limit = min(int(request.args.get('limit', 50)), 500)
+        try:
+            date_from = _parse_day(request.args.get('from'), 'from')
+            date_to = _parse_day(request.args.get('to'), 'to')
+            before = _decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                SELECT * FROM ingestion_runs
-                ORDER BY run_date DESC
-                LIMIT ?
-            ''', (limit,))
-            logs = [dict(row) for row in cursor.fetchall()]
+        logs, next_cursor = db.get_ingestion_runs(
+            game_id=request.args.get('game_id'),
+            status=request.args.get('status'),
+            date_from=date_from,
+            date_to=date_to,
+            limit=limit,
+            before=before
+        )
         
         return jsonify({
             'success': True,
-            'logs': logs
+            'logs': logs,
+            'next_cursor': _encode_cursor(next_cursor) if next_cursor else None
         }), 200
     except Exception as e:
         logger.error(f"Error fetching logs: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@admin_bp.route('/ingestion-logs/summary', methods=['GET'])
+@jwt_required()
+def get_ingestion_summary():
+    """Daily per-game rollups of ingestion runs older than the retention window"""
+    try:
+        try:
+            date_from = _parse_day(request.args.get('from'), 'from')
+            date_to = _parse_day(request.args.get('to'), 'to')
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        limit = min(int(request.args.get('limit', 366)), 5000)
+        
+        return jsonify({
+            'success': True,
+            'summary': db.get_ingestion_summary(request.args.get('game_id'), date_from, date_to, limit)
+        }), 200
+    except Exception as e:
+        logger.error(f"Error fetching ingestion summary: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@admin_bp.route('/ingestion-logs/trends', methods=['GET'])
+@jwt_required()
+def get_ingestion_trends():
+    """Per-game daily trends of ETL stage timings, bytes, throughput and retries"""
+    try:
+        days = min(int(request.args.get('days', 30)), 365)
+        trends = db.get_ingestion_trends(days=days, game_id=request.args.get('game_id'))
+        
+        return jsonify({
+            'success': True,
+            'days': days,
+            'trends': trends
+        }), 200
+    except Exception as e:
+        logger.error(f"Error fetching ingestion trends: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @admin_bp.route('/schedules', methods=['GET'])
 @jwt_required()
 def get_schedules():
@@ -117,14 +218,22 @@ def update_schedule():
         game_id = data.get('game_id')
         cron_expression = data.get('cron_expression')
         is_enabled = data.get('is_enabled', True)
+        if not game_id:
+            return jsonify({'success': False, 'error': 'Missing game_id'}), 400
         
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT OR REPLACE INTO etl_schedules
-                (game_id, schedule_type, cron_expression, is_enabled, updated_at)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (game_id, 'cron', cron_expression, is_enabled, datetime.now()))
+        from scripts import scheduler
+        if cron_expression:
+            try:
+                scheduler.build_trigger(cron_expression)
+            except ValueError as e:
+                return jsonify({'success': False, 'error': str(e)}), 400
+        
+        db.upsert_etl_schedule(game_id, cron_expression, is_enabled)
+        
+        # Apply immediately if this process runs the scheduler; otherwise the
+        # scheduler process picks the change up on its next sync.
+        if scheduler.active_scheduler:
+            scheduler.active_scheduler.reload()
         
         return jsonify({
             'success': True,
@@ -168,9 +277,69 @@ def get_system_stats():
             'stats': {
                 'total_draws': total_draws,
                 'draws_by_game': draws_by_game,
-                'recent_ingestion_runs': recent_runs
+                'recent_ingestion_runs': recent_runs,
+                'startup': current_app.extensions.get('startup_report')
             }
         }), 200
     except Exception as e:
         logger.error(f"Error getting system stats: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
+
+@admin_bp.route('/stats/queries', methods=['GET', 'DELETE'])
+@jwt_required()
+def get_query_stats():
+    """Top SQL statements by total time in this worker (DELETE resets)"""
+    try:
+        from models import query_profiler
+        if query_profiler.profiler is None:
+            return jsonify({'success': False, 'error': 'Query profiler is disabled (QUERY_PROFILER_ENABLED)'}), 404
+        
+        if request.method == 'DELETE':
+            query_profiler.profiler.reset()
+            return jsonify({'success': True}), 200
+        
+        sort = request.args.get('sort', 'total')
+        if sort not in ('total', 'mean', 'max', 'count'):
+            return jsonify({'success': False, 'error': f"Invalid sort '{sort}'"}), 400
+        limit = min(int(request.args.get('limit', 20)), 200)
+        
+        return jsonify({
+            'success': True,
+            'since': query_profiler.profiler.started_at,
+            'slow_ms': query_profiler.profiler.slow_seconds * 1000,
+            'queries': query_profiler.profiler.top(limit=limit, sort=sort)
+        }), 200
+    except Exception as e:
+        logger.error(f"Error getting query stats: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@admin_bp.route('/profiles', methods=['GET'])
+@jwt_required()
+def list_profiles():
+    """Recent request profiles (newest first)"""
+    try:
+        store = current_app.extensions.get('profile_store')
+        if store is None:
+            return jsonify({'success': False, 'error': 'Request profiling is disabled (PROFILING_ENABLED)'}), 404
+        limit = min(int(request.args.get('limit', 50)), 500)
+        return jsonify({'success': True, 'profiles': store.list(limit=limit)}), 200
+    except Exception as e:
+        logger.error(f"Error listing profiles: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@admin_bp.route('/profiles/<profile_id>', methods=['GET'])
+@jwt_required()
+def download_profile(profile_id):
+    """Download a profile (folded stacks for flamegraph.pl/speedscope, or pstats)"""
+    try:
+        store = current_app.extensions.get('profile_store')
+        found = store.get(profile_id) if store else None
+        if not found:
+            return jsonify({'success': False, 'error': 'Profile not found'}), 404
+        meta, path = found
+        mimetype = 'text/plain' if meta['mode'] == 'sample' else 'application/octet-stream'
+        return send_file(os.path.abspath(path), mimetype=mimetype, as_attachment=True,
+                         download_name=meta['file'])
+    except Exception as e:
+        logger.error(f"Error downloading profile {profile_id}: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
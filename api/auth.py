@@ -1,7 +1,12 @@
 """Authentication utilities"""
 
 import hashlib
+import hmac
 import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+PBKDF2_ITERATIONS = 100000
 
 def hash_password(password, salt=None):
     """
@@ -10,25 +15,63 @@ def hash_password(password, salt=None):
     """
     if salt is None:
         salt = secrets.token_hex(16)
-    
+
     pwd_hash = hashlib.pbkdf2_hmac(
         'sha256',
         password.encode('utf-8'),
         salt.encode('utf-8'),
-        100000
+        PBKDF2_ITERATIONS
     )
     return salt + ':' + pwd_hash.hex()
 
 def verify_password(password, stored_hash):
-    """Verify password against stored hash"""
+    """Verify password against stored hash (constant-time comparison)"""
     try:
         salt, pwd_hash = stored_hash.split(':')
         test_hash = hashlib.pbkdf2_hmac(
             'sha256',
             password.encode('utf-8'),
             salt.encode('utf-8'),
-            100000
+            PBKDF2_ITERATIONS
         ).hex()
-        return test_hash == pwd_hash
-    except:
+        return hmac.compare_digest(test_hash, pwd_hash)
+    except (AttributeError, TypeError, ValueError):
         return False
+
+# Verified instead of a real hash for unknown/inactive users, so their
+# logins cost the same PBKDF2 work as wrong passwords for existing ones
+DUMMY_HASH = '0' * 32 + ':' + '0' * 64
+
+class VerifierBusy(Exception):
+    """Raised when the password hashing queue is full"""
+
+class PasswordVerifier:
+    """
+    Runs password verification on a small dedicated thread pool.
+    At most `workers` hashes run at once and at most `max_pending` wait;
+    beyond that verify() raises VerifierBusy immediately, so a login burst
+    cannot tie up the request threads serving read traffic.
+    """
+
+    def __init__(self, workers=2, max_pending=16, timeout=10.0):
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+
+    def verify(self, password, stored_hash):
+        """True if password matches stored_hash; raises VerifierBusy when saturated"""
+        if not self._slots.acquire(blocking=False):
+            raise VerifierBusy('Too many concurrent login attempts')
+        try:
+            future = self._executor.submit(verify_password, password, stored_hash)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise VerifierBusy('Password verification timed out')
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
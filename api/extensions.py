@@ -0,0 +1,21 @@
+"""Per-app shared objects (created by app.create_app) and request-time accessors"""
+
+from flask import current_app, has_app_context
+from werkzeug.local import LocalProxy
+from models.database import get_database
+
+def current_db():
+    """The current app's Database; outside an app context, the default shared one"""
+    if has_app_context():
+        return current_app.extensions['lottery_db']
+    return get_database()
+
+def current_etl_queue():
+    """The current app's ETL job queue"""
+    return current_app.extensions['etl_queue']
+
+def current_password_verifier():
+    """The current app's bounded password verification pool"""
+    return current_app.extensions['password_verifier']
+
+db = LocalProxy(current_db)
@@ -0,0 +1,132 @@
+"""
+Memory accounting for analytics requests
+
+With MEMORY_TRACKING_ENABLED, tracemalloc runs in the worker and the peak
+allocation of each request to MEMORY_TRACKING_PATHS and of each analytics
+stage (track_memory) is exported as Prometheus histograms. tracemalloc's
+peak is process-wide, so with threaded workers concurrent requests inflate
+each other's peaks; numbers are exact with sync workers.
+
+ANALYTICS_MEMORY_BUDGET_MB caps what one analytics computation may
+allocate: MemoryBudget.plan() shrinks the number of draws analyzed (down to
+ANALYTICS_MIN_DRAWS) so the estimated peak fits, and the response is marked
+as degraded. Estimates start at ANALYTICS_BYTES_PER_DRAW and follow the
+measured peaks while tracking is on.
+"""
+
+import logging
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from flask import current_app, g, request
+from api.metrics import ANALYTICS_DEGRADED, ANALYTICS_MEMORY_PEAK, REQUEST_MEMORY_PEAK
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+@contextmanager
+def track_memory(stage=None):
+    """
+    Measure the peak bytes allocated inside the block (nesting-safe).
+    Yields a dict whose 'peak_bytes' is set on exit (None when tracemalloc
+    is not tracing); with a stage name the peak is also exported.
+    """
+    result = {'peak_bytes': None}
+    if not tracemalloc.is_tracing():
+        yield result
+        return
+
+    stack = _local.__dict__.setdefault('stack', [])
+    current, peak = tracemalloc.get_traced_memory()
+    if stack:
+        stack[-1][1] = max(stack[-1][1], peak)
+    tracemalloc.reset_peak()
+    frame = [current, current]  # [start, highest traced total seen]
+    stack.append(frame)
+    try:
+        yield result
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        stack.pop()
+        frame[1] = max(frame[1], peak)
+        result['peak_bytes'] = max(0, frame[1] - frame[0])
+        if stack:
+            stack[-1][1] = max(stack[-1][1], frame[1])
+        if stage:
+            ANALYTICS_MEMORY_PEAK.labels(stage).observe(result['peak_bytes'])
+
+
+class MemoryBudget:
+    """Chooses how many draws an analytics computation may use under a byte budget"""
+
+    def __init__(self, budget_bytes=0, bytes_per_draw=2048, min_draws=100, smoothing=0.2):
+        self.budget_bytes = budget_bytes
+        self.default_bytes_per_draw = bytes_per_draw
+        self.min_draws = min_draws
+        self.smoothing = smoothing
+        self._estimates = {}
+        self._lock = threading.Lock()
+
+    def bytes_per_draw(self, kind):
+        with self._lock:
+            return self._estimates.get(kind, self.default_bytes_per_draw)
+
+    def record(self, kind, peak_bytes, draws):
+        """Fold a measured peak into the per-draw estimate for this kind of computation"""
+        if not peak_bytes or not draws:
+            return
+        observed = peak_bytes / draws
+        with self._lock:
+            previous = self._estimates.get(kind)
+            self._estimates[kind] = observed if previous is None else (
+                previous + self.smoothing * (observed - previous)
+            )
+
+    def plan(self, kind, requested):
+        """(draws to use, degraded) for a computation over `requested` draws"""
+        if not self.budget_bytes:
+            return requested, False
+        affordable = int(self.budget_bytes // max(self.bytes_per_draw(kind), 1))
+        if affordable >= requested:
+            return requested, False
+        draws = max(self.min_draws, affordable)
+        if draws >= requested:
+            return requested, False
+        ANALYTICS_DEGRADED.labels(kind).inc()
+        logger.warning(
+            f"Memory budget: {kind} limited to {draws} of {requested} draws "
+            f"(~{self.bytes_per_draw(kind):.0f} B/draw, budget {self.budget_bytes} B)"
+        )
+        return draws, True
+
+
+def current_budget():
+    """The current app's MemoryBudget"""
+    return current_app.extensions['memory_budget']
+
+
+def init_memory_tracking(app):
+    """Start tracemalloc and record per-request peaks for MEMORY_TRACKING_PATHS"""
+    paths = tuple(p.strip() for p in app.config['MEMORY_TRACKING_PATHS'].split(',') if p.strip())
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    @app.before_request
+    def _start_request_tracking():
+        if request.path.startswith(paths):
+            tracker = track_memory()
+            g.memory_tracker = (tracker, tracker.__enter__())
+
+    @app.teardown_request
+    def _finish_request_tracking(exc):
+        state = g.pop('memory_tracker', None)
+        if state is None:
+            return
+        tracker, result = state
+        tracker.__exit__(None, None, None)
+        rule = request.url_rule.rule if request.url_rule else '<unmatched>'
+        REQUEST_MEMORY_PEAK.labels(request.blueprint or 'app', rule).observe(result['peak_bytes'])
+
+    logger.info(f"Memory tracking enabled for {', '.join(paths)}")
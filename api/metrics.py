@@ -0,0 +1,121 @@
+"""Prometheus metrics: per-route request latency/size/status and DB query timing"""
+
+import hmac
+import os
+import time
+import logging
+from flask import Response, g, jsonify, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+)
+from prometheus_client import multiprocess
+from models.database import add_query_listener
+
+logger = logging.getLogger(__name__)
+
+# Analytics endpoints can take seconds on large histories
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+MEMORY_BUCKETS = (65536, 262144, 1048576, 4194304, 16777216, 67108864, 268435456, 1073741824)
+
+REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests by route and status',
+    ['method', 'blueprint', 'route', 'status']
+)
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency',
+    ['method', 'blueprint', 'route'], buckets=LATENCY_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'HTTP response body size (non-streamed responses)',
+    ['blueprint', 'route'], buckets=SIZE_BUCKETS
+)
+IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'Requests currently being handled',
+    ['blueprint', 'route'], multiprocess_mode='livesum'
+)
+DB_QUERY_LATENCY = Histogram(
+    'db_query_duration_seconds', 'SQLite statement execution time',
+    ['operation'], buckets=QUERY_BUCKETS
+)
+# Filled by api.memory (tracemalloc peaks, MEMORY_TRACKING_ENABLED)
+REQUEST_MEMORY_PEAK = Histogram(
+    'http_request_memory_peak_bytes', 'Peak Python allocation during a request (tracemalloc)',
+    ['blueprint', 'route'], buckets=MEMORY_BUCKETS
+)
+ANALYTICS_MEMORY_PEAK = Histogram(
+    'analytics_memory_peak_bytes', 'Peak Python allocation per analytics stage (tracemalloc)',
+    ['stage'], buckets=MEMORY_BUCKETS
+)
+ANALYTICS_DEGRADED = Counter(
+    'analytics_degraded_total', 'Analytics computations reduced to fewer draws by the memory budget',
+    ['kind']
+)
+
+
+def _labels():
+    """(blueprint, route) for the current request; unmatched URLs share one label"""
+    rule = request.url_rule.rule if request.url_rule else '<unmatched>'
+    return request.blueprint or 'app', rule
+
+
+def _observe_query(sql, params, seconds, connection=None):
+    words = sql.split(None, 1)
+    DB_QUERY_LATENCY.labels(words[0].upper() if words else 'UNKNOWN').observe(seconds)
+
+
+def _before_request():
+    g.metrics_start = time.perf_counter()
+    g.metrics_labels = _labels()
+    IN_FLIGHT.labels(*g.metrics_labels).inc()
+
+
+def _after_request(response):
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return response
+    blueprint, route = g.metrics_labels
+    REQUEST_LATENCY.labels(request.method, blueprint, route).observe(time.perf_counter() - start)
+    REQUESTS.labels(request.method, blueprint, route, str(response.status_code)).inc()
+    if not response.is_streamed:
+        RESPONSE_SIZE.labels(blueprint, route).observe(response.calculate_content_length() or 0)
+    return response
+
+
+def _teardown_request(exc):
+    labels = g.pop('metrics_labels', None)
+    if labels is not None:
+        IN_FLIGHT.labels(*labels).dec()
+
+
+def render_metrics():
+    """Prometheus text exposition; aggregates all workers when PROMETHEUS_MULTIPROC_DIR is set"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+
+def init_metrics(app):
+    """Install request hooks, DB query timing and the /metrics endpoint"""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    add_query_listener(_observe_query)
+
+    token = app.config.get('METRICS_TOKEN')
+
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus metrics (bearer METRICS_TOKEN required when configured)"""
+        if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+        return Response(render_metrics(), content_type=CONTENT_TYPE_LATEST)
+
+    if not token:
+        logger.warning("Prometheus metrics enabled at /metrics without METRICS_TOKEN (restrict access upstream)")
+    else:
+        logger.info("Prometheus metrics enabled at /metrics")
@@ -0,0 +1,235 @@
+"""
+Opt-in per-request CPU profiling
+
+A request is profiled when it carries `X-Profile: 1` together with a valid
+admin JWT, or when it is picked by PROFILE_SAMPLE_RATE. Only paths starting
+with one of PROFILE_PATHS are eligible. Two modes:
+
+- sample (default): a background thread samples the request thread's stack
+  every PROFILE_INTERVAL_MS and writes folded stacks (`<id>.folded`), the
+  input format of flamegraph.pl and speedscope.
+- cprofile: deterministic cProfile, written as a pstats file (`<id>.pstats`).
+
+Each profile gets a `<id>.json` metadata file; only the newest PROFILE_KEEP
+are kept. Profiled responses carry an X-Profile-Id header.
+"""
+
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from flask import g, request
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ID_RE = re.compile(r'^[0-9]{8}T[0-9]{6}-[0-9a-f]{12}$')
+EXTENSIONS = {'sample': 'folded', 'cprofile': 'pstats'}
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _frame_label(code):
+    """function (file:line) with repo files relative and library files shortened"""
+    filename = code.co_filename
+    if filename.startswith(_REPO_ROOT):
+        filename = os.path.relpath(filename, _REPO_ROOT)
+    else:
+        parts = filename.replace('\\', '/').split('/')
+        filename = '/'.join(parts[-2:])
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'.replace(';', ',')
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval into folded-stack counts"""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    @property
+    def samples(self):
+        return sum(self.stacks.values())
+
+    def folded(self):
+        """Folded stacks, one 'frame;frame;frame count' line per distinct stack"""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """Profiles on disk: <dir>/<id>.<folded|pstats> plus <id>.json metadata"""
+
+    def __init__(self, directory, keep=50):
+        self.directory = directory
+        self.keep = keep
+
+    def new_id(self):
+        return f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:12]}"
+
+    def save(self, profile_id, mode, writer, metadata):
+        """writer(path) writes the profile data; metadata is stored alongside"""
+        os.makedirs(self.directory, exist_ok=True)
+        filename = f'{profile_id}.{EXTENSIONS[mode]}'
+        writer(os.path.join(self.directory, filename))
+        meta = dict(metadata, id=profile_id, mode=mode, file=filename)
+        tmp = os.path.join(self.directory, f'.{profile_id}.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.directory, f'{profile_id}.json'))
+        self.prune()
+        return meta
+
+    def list(self, limit=50):
+        """Newest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted((n for n in os.listdir(self.directory) if n.endswith('.json')), reverse=True)
+        profiles = []
+        for name in names[:limit]:
+            try:
+                with open(os.path.join(self.directory, name), encoding='utf-8') as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    def get(self, profile_id):
+        """(metadata, data path) or None; ids are validated so paths stay inside the directory"""
+        if not PROFILE_ID_RE.match(profile_id or ''):
+            return None
+        meta_path = os.path.join(self.directory, f'{profile_id}.json')
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        data_path = os.path.join(self.directory, meta['file'])
+        return (meta, data_path) if os.path.exists(data_path) else None
+
+    def prune(self):
+        names = sorted((n for n in os.listdir(self.directory) if n.endswith('.json')), reverse=True)
+        for name in names[self.keep:]:
+            profile_id = name[:-len('.json')]
+            for ext in ('json', *EXTENSIONS.values()):
+                try:
+                    os.remove(os.path.join(self.directory, f'{profile_id}.{ext}'))
+                except FileNotFoundError:
+                    pass
+
+
+def _requested_by_admin():
+    """Identity of a valid admin JWT on a request asking for X-Profile, else None"""
+    if request.headers.get('X-Profile', '').lower() not in ('1', 'true', 'yes'):
+        return None
+    try:
+        verify_jwt_in_request(optional=True)
+        # The role claim comes from admin_users.role (set at /api/admin/login)
+        if get_jwt().get('role') != 'admin':
+            return None
+        return get_jwt_identity()
+    except Exception:
+        return None
+
+
+def init_profiling(app):
+    """Install the profiling request hooks and the app's ProfileStore"""
+    store = ProfileStore(app.config['PROFILE_DIR'], keep=app.config['PROFILE_KEEP'])
+    app.extensions['profile_store'] = store
+    paths = tuple(p.strip() for p in app.config['PROFILE_PATHS'].split(',') if p.strip())
+    sample_rate = app.config['PROFILE_SAMPLE_RATE']
+    mode = app.config['PROFILE_MODE']
+    interval = app.config['PROFILE_INTERVAL_MS'] / 1000.0
+    if mode not in EXTENSIONS:
+        raise ValueError(f"PROFILE_MODE must be one of {', '.join(EXTENSIONS)}")
+
+    @app.before_request
+    def _start_profile():
+        if not request.path.startswith(paths):
+            return
+        requested_by = _requested_by_admin()
+        if requested_by is None and not (sample_rate and random.random() < sample_rate):
+            return
+        if mode == 'cprofile':
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            profiler = StackSampler(threading.get_ident(), interval).start()
+        g.profile = {'profiler': profiler, 'started': time.perf_counter(),
+                     'requested_by': requested_by or 'sampled'}
+
+    @app.after_request
+    def _finish_profile(response):
+        state = g.pop('profile', None)
+        if state is None:
+            return response
+        profiler = state['profiler']
+        duration = time.perf_counter() - state['started']
+        if mode == 'cprofile':
+            profiler.disable()
+            writer = profiler.dump_stats
+            samples = None
+        else:
+            profiler.stop()
+            folded = profiler.folded()
+            samples = profiler.samples
+
+            def writer(path):
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(folded)
+        profile_id = store.new_id()
+        try:
+            store.save(profile_id, mode, writer, {
+                'method': request.method,
+                'path': request.full_path.rstrip('?'),
+                'status': response.status_code,
+                'duration_ms': round(duration * 1000, 2),
+                'samples': samples,
+                'requested_by': state['requested_by'],
+                'pid': os.getpid(),
+                'created_at': datetime.utcnow().isoformat(timespec='seconds')
+            })
+            response.headers['X-Profile-Id'] = profile_id
+        except OSError as e:
+            logger.warning(f"Could not save profile for {request.path}: {e}")
+        return response
+
+    @app.teardown_request
+    def _discard_profile(exc):
+        # Requests that never reached after_request still must stop their profiler
+        state = g.pop('profile', None)
+        if state is not None:
+            if mode == 'cprofile':
+                state['profiler'].disable()
+            else:
+                state['profiler'].stop()
+
+    logger.info(f"Request profiling enabled ({mode}) for {', '.join(paths)}")
@@ -1,15 +1,28 @@
 """Main API routes"""
 
-from flask import Blueprint, jsonify, request
-from models.database import Database
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from api.extensions import db
+from api.memory import current_budget, track_memory
+from api.singleflight import SingleFlight
 from models.games import get_all_games, get_game
-from analytics.statistics import StatisticsEngine
-from analytics.recommendations import RecommendationEngine
+import csv
+import io
+import json
 import logging
+import zlib
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 api_bp = Blueprint('api', __name__)
-db = Database()
+analytics_flight = SingleFlight()
+
+# Draws analyzed by /stats and /recommendations (fewer under a memory budget)
+ANALYTICS_DRAWS = 1000
+
+def _single_flight(key, fn):
+    """Coalesce concurrent identical analytics computations"""
+    analytics_flight.lock_dir = current_app.config.get('SINGLEFLIGHT_LOCK_DIR') or None
+    return analytics_flight.do(key, fn)
 
 @api_bp.route('/games', methods=['GET'])
 def list_games():
@@ -45,27 +58,135 @@ def get_game_details(game_id):
         logger.error(f"Error getting game {game_id}: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def _compact_draws(draws):
+    """Columnar representation of draws (one array per field)"""
+    compact = {'draw_numbers': [], 'dates': [], 'numbers': [], 'bonus': []}
+    for draw in draws:
+        results = draw['results']
+        if isinstance(results, dict):
+            numbers = results.get('main_numbers', [])
+            bonus = results.get('bonus_numbers', results.get('bonus'))
+        else:
+            numbers, bonus = results, None
+        compact['draw_numbers'].append(draw['draw_number'])
+        compact['dates'].append(draw['draw_date'])
+        compact['numbers'].append(numbers)
+        compact['bonus'].append(bonus)
+    return compact
+
 @api_bp.route('/draws/<game_id>', methods=['GET'])
 def get_draws(game_id):
-    """Get draw results for a game"""
+    """Get draw results for a game (format=rows|compact)"""
     try:
         limit = min(int(request.args.get('limit', 100)), 1000)
         offset = int(request.args.get('offset', 0))
+        response_format = request.args.get('format', 'rows').lower()
+        if response_format not in ('rows', 'compact'):
+            return jsonify({'success': False, 'error': f"Unsupported format '{response_format}'"}), 400
         
         draws = db.get_draws(game_id, limit=limit, offset=offset)
         
-        return jsonify({
+        payload = {
             'success': True,
             'game_id': game_id,
             'count': len(draws),
             'limit': limit,
             'offset': offset,
-            'draws': draws
-        }), 200
+            'format': response_format
+        }
+        if response_format == 'compact':
+            payload['draws'] = _compact_draws(draws)
+        else:
+            payload['draws'] = draws
+        return jsonify(payload), 200
     except Exception as e:
         logger.error(f"Error getting draws for {game_id}: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+EXPORT_CSV_FIELDS = ['game_id', 'draw_number', 'draw_date', 'results', 'extra_data', 'source_url', 'verified']
+
+def _export_ndjson(rows):
+    """Serialize draw rows as NDJSON lines"""
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+def _export_csv(rows):
+    """Serialize draw rows as CSV lines (results/extra_data stay JSON text)"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_CSV_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    for row in rows:
+        row['results'] = json.dumps(row['results'], ensure_ascii=False)
+        row['extra_data'] = json.dumps(row['extra_data'], ensure_ascii=False)
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    yield buffer.getvalue()
+
+def _gzip_stream(chunks, flush_bytes=64 * 1024):
+    """Gzip a text stream on the fly, sync-flushing so clients receive data progressively"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    pending = 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        pending += len(data)
+        out = compressor.compress(data)
+        if pending >= flush_bytes:
+            out += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if out:
+            yield out
+    yield compressor.flush()
+
+def _parse_export_day(name):
+    """Validate an optional YYYY-MM-DD export bound"""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        raise ValueError(f"Invalid {name} '{value}' (expected YYYY-MM-DD)")
+
+@api_bp.route('/draws/<game_id>/export', methods=['GET'])
+def export_draws(game_id):
+    """Stream the full draw history of a game as NDJSON or CSV"""
+    if not get_game(game_id):
+        return jsonify({'success': False, 'error': 'Game not found'}), 404
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({
+            'success': False,
+            'error': f"Unsupported format '{export_format}' (expected one of: {', '.join(EXPORT_FORMATS)})"
+        }), 400
+    try:
+        date_from = _parse_export_day('from')
+        date_to = _parse_export_day('to')
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    rows = db.iter_draws(game_id, date_from=date_from, date_to=date_to)
+    body = _export_ndjson(rows) if export_format == 'ndjson' else _export_csv(rows)
+
+    headers = {
+        'Content-Disposition': f'attachment; filename="{game_id}.{export_format}"'
+    }
+    if 'gzip' in request.accept_encodings:
+        body = _gzip_stream(body)
+        headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+
+    return Response(
+        stream_with_context(body),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers=headers
+    )
+
 @api_bp.route('/draws/<game_id>/latest', methods=['GET'])
 def get_latest_draw(game_id):
     """Get the latest draw for a game"""
@@ -83,6 +204,32 @@ def get_latest_draw(game_id):
         logger.error(f"Error getting latest draw for {game_id}: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def _load_analytics_draws(game_id, kind):
+    """Recent draws for an analytics computation, limited by the memory budget"""
+    limit, degraded = current_budget().plan(kind, ANALYTICS_DRAWS)
+    with track_memory('get_draws'):
+        draws = db.get_draws(game_id, limit=limit)
+    if degraded:
+        return draws, {'reason': 'memory_budget', 'sample_size': len(draws), 'requested': ANALYTICS_DRAWS}
+    return draws, None
+
+def _compute_statistics(game_id, game):
+    # Imported on first use: scipy/numpy add seconds to worker startup
+    from analytics.statistics import StatisticsEngine
+    with track_memory() as used:
+        draws, degraded = _load_analytics_draws(game_id, 'statistics')
+        if not draws:
+            return None
+        with track_memory('statistics'):
+            statistics = StatisticsEngine(game, draws).analyze()
+    current_budget().record('statistics', used['peak_bytes'], len(draws))
+    return {
+        'statistics': statistics,
+        'sample_size': len(draws),
+        'last_updated': draws[0]['draw_date'],
+        'degraded': degraded
+    }
+
 @api_bp.route('/stats/<game_id>', methods=['GET'])
 def get_statistics(game_id):
     """Get statistical analysis for a game"""
@@ -91,24 +238,33 @@ def get_statistics(game_id):
         if not game:
             return jsonify({'success': False, 'error': 'Game not found'}), 404
         
-        draws = db.get_draws(game_id, limit=1000)
-        if not draws:
+        result = _single_flight(f'stats:{game_id}', lambda: _compute_statistics(game_id, game))
+        if not result:
             return jsonify({'success': False, 'error': 'No data available'}), 404
         
-        stats_engine = StatisticsEngine(game, draws)
-        stats = stats_engine.analyze()
-        
         return jsonify({
             'success': True,
             'game_id': game_id,
-            'statistics': stats,
-            'sample_size': len(draws),
-            'last_updated': draws[0]['draw_date'] if draws else None
+            'statistics': result['statistics'],
+            'sample_size': result['sample_size'],
+            'last_updated': result['last_updated'],
+            'degraded': result.get('degraded')
         }), 200
     except Exception as e:
         logger.error(f"Error calculating stats for {game_id}: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def _compute_recommendations(game_id, game):
+    from analytics.recommendations import RecommendationEngine
+    with track_memory() as used:
+        draws, degraded = _load_analytics_draws(game_id, 'recommendations')
+        if not draws:
+            return None
+        with track_memory('recommendations'):
+            recommendations = RecommendationEngine(game, draws).generate()
+    current_budget().record('recommendations', used['peak_bytes'], len(draws))
+    return {'recommendations': recommendations, 'degraded': degraded}
+
 @api_bp.route('/recommendations/<game_id>', methods=['GET'])
 def get_recommendations(game_id):
     """Get recommendations based on analysis"""
@@ -117,17 +273,16 @@ def get_recommendations(game_id):
         if not game:
             return jsonify({'success': False, 'error': 'Game not found'}), 404
         
-        draws = db.get_draws(game_id, limit=1000)
-        if not draws:
+        result = _single_flight(f'recommendations:{game_id}',
+                                lambda: _compute_recommendations(game_id, game))
+        if not result:
             return jsonify({'success': False, 'error': 'No data available'}), 404
         
-        rec_engine = RecommendationEngine(game, draws)
-        recommendations = rec_engine.generate()
-        
         return jsonify({
             'success': True,
             'game_id': game_id,
-            'recommendations': recommendations,
+            'recommendations': result['recommendations'],
+            'degraded': result['degraded'],
             'disclaimer': 'המלצות אלו מבוססות על ניתוח סטטיסטי ואינן מבטיחות זכייה'
         }), 200
     except Exception as e:
@@ -0,0 +1,120 @@
+"""Single-flight coalescing for expensive computations"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows - cross-worker locking is unavailable
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(obj):
+    """Serialize numpy scalars and other stragglers in shared results"""
+    if hasattr(obj, 'item'):
+        return obj.item()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    return str(obj)
+
+
+class _Call:
+    """An in-flight computation that followers wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Share one in-flight result between concurrent identical calls.
+
+    Within a process, callers with the same key wait for the first caller
+    (the leader) instead of running the computation again. When lock_dir is
+    given, leaders in different worker processes also serialize on a lock
+    file, and a worker that waited on the lock picks up the result written
+    by the worker that held it rather than recomputing.
+    """
+
+    def __init__(self, lock_dir=None):
+        self.lock_dir = lock_dir
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """Run fn() once per key for all concurrent callers and return its result"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run_leader(key, fn)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def _run_leader(self, key, fn):
+        if not self.lock_dir or fcntl is None:
+            return fn()
+
+        os.makedirs(self.lock_dir, exist_ok=True)
+        name = hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+        lock_path = os.path.join(self.lock_dir, f'{name}.lock')
+        result_path = os.path.join(self.lock_dir, f'{name}.json')
+
+        started = time.time()
+        with open(lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                shared = self._read_shared(result_path, started)
+                if shared is not None:
+                    logger.debug(f"Single-flight {key}: reused result from another worker")
+                    return shared['result']
+
+                result = fn()
+                self._write_shared(result_path, result)
+                return result
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _read_shared(path, not_before):
+        """Return a result written by another worker after we started waiting"""
+        try:
+            if os.path.getmtime(path) < not_before:
+                return None
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_shared(path, result):
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'result': result}, f, ensure_ascii=False, default=_json_default)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Could not share single-flight result: {e}")
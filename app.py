@@ -2,66 +2,163 @@
 """Main Flask application for Israeli Lottery Platform"""
 
 import os
+import sys
+import time
 import logging
 from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from config import config
 
-# Initialize Flask app
-app = Flask(__name__)
-env = os.getenv('FLASK_ENV', 'development')
-app.config.from_object(config[env])
-
-# Initialize extensions
-CORS(app, resources={r"/api/*": {"origins": app.config['CORS_ORIGINS']}})
-jwt = JWTManager(app)
-
-# Setup logging
-logging.basicConfig(
-    level=app.config['LOG_LEVEL'],
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(app.config['LOG_FILE']),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
-# Import routes
-from api.routes import api_bp
-from api.admin import admin_bp
-
-app.register_blueprint(api_bp, url_prefix='/api')
-app.register_blueprint(admin_bp, url_prefix='/api/admin')
-
-@app.route('/')
-def index():
-    """API root endpoint"""
-    return jsonify({
-        'name': 'Israeli Lottery Platform API',
-        'version': '1.0.0',
-        'status': 'running',
-        'endpoints': {
-            'games': '/api/games',
-            'draws': '/api/draws/<game_id>',
-            'stats': '/api/stats/<game_id>',
-            'recommendations': '/api/recommendations/<game_id>',
-            'admin': '/api/admin/*'
-        }
-    })
-
-@app.route('/health')
-def health():
-    """Health check endpoint"""
-    return jsonify({'status': 'healthy'}), 200
+# Heavy analytics dependencies; the startup report shows whether any got imported
+HEAVY_MODULES = ('numpy', 'scipy', 'sklearn', 'pandas', 'pyarrow')
 
+def _setup_logging(app):
+    """Configure root logging once per process (later apps reuse the handlers)"""
+    if logging.getLogger().handlers:
+        return
+    log_dir = os.path.dirname(app.config['LOG_FILE'])
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+    logging.basicConfig(
+        level=app.config['LOG_LEVEL'],
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(app.config['LOG_FILE']),
+            logging.StreamHandler()
+        ]
+    )
+
+def create_app(config_name=None, overrides=None):
+    """
+    Application factory.
+    Analytics libraries (numpy/scipy/sklearn) are imported by the endpoints
+    that need them, and the database schema is initialized once per path
+    (models.database.get_database). The per-step timings are logged and kept
+    in app.extensions['startup_report'].
+    """
+    started = time.perf_counter()
+    steps = {}
+
+    def step(name, since):
+        now = time.perf_counter()
+        steps[name] = round((now - since) * 1000, 2)
+        return now
+
+    t = started
+    app = Flask(__name__)
+    app.config.from_object(config[config_name or os.getenv('FLASK_ENV', 'development')])
+    app.config.update(overrides or {})
+    CORS(app, resources={r"/api/*": {"origins": app.config['CORS_ORIGINS']}})
+    JWTManager(app)
+    t = step('config', t)
+
+    _setup_logging(app)
+    t = step('logging', t)
+
+    from models.database import get_database
+    from scripts.etl_queue import ETLJobQueue
+    from api.memory import MemoryBudget
+    from api.auth import PasswordVerifier, hash_password
+    db_dir = os.path.dirname(app.config['DATABASE_PATH'])
+    if db_dir:
+        os.makedirs(db_dir, exist_ok=True)
+    db = get_database(app.config['DATABASE_PATH'])
+    app.extensions['lottery_db'] = db
+    app.extensions['etl_queue'] = ETLJobQueue(
+        db,
+        stale_after=app.config['ETL_JOB_STALE_SECONDS'],
+        heartbeat_interval=app.config['ETL_JOB_HEARTBEAT_SECONDS']
+    )
+    # Jobs queued before a restart would otherwise wait for the next trigger
+    app.extensions['etl_queue'].resume(workers=app.config['ETL_JOB_WORKERS'])
+    if app.config['ADMIN_USERNAME'] and app.config['ADMIN_PASSWORD'] and not db.count_admin_users():
+        db.create_admin_user(app.config['ADMIN_USERNAME'], hash_password(app.config['ADMIN_PASSWORD']))
+        logger.info(f"Seeded admin user '{app.config['ADMIN_USERNAME']}' from config")
+    app.extensions['password_verifier'] = PasswordVerifier(
+        workers=app.config['AUTH_HASH_WORKERS'],
+        max_pending=app.config['AUTH_HASH_QUEUE'],
+        timeout=app.config['AUTH_HASH_TIMEOUT']
+    )
+    app.extensions['memory_budget'] = MemoryBudget(
+        budget_bytes=int(app.config['ANALYTICS_MEMORY_BUDGET_MB'] * 1024 * 1024),
+        bytes_per_draw=app.config['ANALYTICS_BYTES_PER_DRAW'],
+        min_draws=app.config['ANALYTICS_MIN_DRAWS']
+    )
+    t = step('database', t)
+
+    from api.routes import api_bp
+    from api.admin import admin_bp
+    app.register_blueprint(api_bp, url_prefix='/api')
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    _register_core_routes(app)
+    t = step('blueprints', t)
+
+    if app.config['METRICS_ENABLED']:
+        from api.metrics import init_metrics
+        init_metrics(app)
+    if app.config['QUERY_PROFILER_ENABLED']:
+        from models.query_profiler import install_profiler
+        install_profiler(slow_ms=app.config['QUERY_SLOW_MS'])
+    if app.config['MEMORY_TRACKING_ENABLED']:
+        from api.memory import init_memory_tracking
+        init_memory_tracking(app)
+    if app.config['PROFILING_ENABLED']:
+        from api.profiling import init_profiling
+        init_profiling(app)
+    t = step('instrumentation', t)
+
+    # Start the ETL scheduler in a single worker (the one that gets the lock)
+    if app.config['ETL_SCHEDULER_ENABLED']:
+        from scripts.scheduler import acquire_scheduler_lock, create_scheduler
+        app.extensions['scheduler_lock'] = acquire_scheduler_lock(app.config['ETL_SCHEDULER_LOCK_FILE'])
+        if app.extensions['scheduler_lock']:
+            create_scheduler(db, app.config).start()
+        t = step('scheduler', t)
+
+    report = {
+        'total_ms': round((time.perf_counter() - started) * 1000, 2),
+        'steps_ms': steps,
+        'heavy_modules_loaded': [m for m in HEAVY_MODULES if m in sys.modules],
+        'pid': os.getpid()
+    }
+    app.extensions['startup_report'] = report
+    logger.info(
+        f"App created in {report['total_ms']:.1f} ms "
+        f"({', '.join(f'{k} {v:.1f}' for k, v in steps.items())}); "
+        f"heavy modules loaded: {', '.join(report['heavy_modules_loaded']) or 'none'}"
+    )
+    return app
+
+def _register_core_routes(app):
+    @app.route('/')
+    def index():
+        """API root endpoint"""
+        return jsonify({
+            'name': 'Israeli Lottery Platform API',
+            'version': '1.0.0',
+            'status': 'running',
+            'endpoints': {
+                'games': '/api/games',
+                'draws': '/api/draws/<game_id>',
+                'export': '/api/draws/<game_id>/export',
+                'stats': '/api/stats/<game_id>',
+                'recommendations': '/api/recommendations/<game_id>',
+                'admin': '/api/admin/*'
+            }
+        })
+
+    @app.route('/health')
+    def health():
+        """Health check endpoint"""
+        return jsonify({'status': 'healthy'}), 200
+
+# No module-level app: importing this module must not open the database or
+# start workers. Serve with `gunicorn "app:create_app()"` (see gunicorn.conf.py).
 if __name__ == '__main__':
-    # Create necessary directories
-    os.makedirs('logs', exist_ok=True)
-    os.makedirs('data', exist_ok=True)
-    
-    # Run app
+    app = create_app()
     app.run(
         host='0.0.0.0',
         port=int(os.getenv('PORT', 5000)),
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark parse_pais_archive_html backends (rows parsed per second)
+
+Runs every available backend over recorded archive pages (--pages) or, by
+default, over a synthetic Pais-style archive page, and checks that all
+backends return identical draws.
+
+    python -m benchmarks.bench_parser
+    python -m benchmarks.bench_parser --pages 'recorded/*.html' --repeat 5
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import glob
+import time
+
+from etl.parsers.pais_heuristic import BACKENDS, parse_pais_archive_html
+from etl.testing import LOTTO_ARGS, make_archive_page
+
+def available_backends():
+    names = []
+    for name in BACKENDS:
+        try:
+            parse_pais_archive_html('<table><tr><td>1</td></tr></table>', backend=name, **LOTTO_ARGS)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+def bench(pages, repeat=3, backends=None):
+    """Return {backend: {'rows_per_sec', 'seconds', 'draws'}} (best of `repeat`)"""
+    backends = backends or available_backends()
+    results = {}
+    reference = None
+    for name in backends:
+        best = None
+        draws = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            draws = [d for html in pages for d in parse_pais_archive_html(html, backend=name, **LOTTO_ARGS)]
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        if reference is None:
+            reference = draws
+        elif draws != reference:
+            raise AssertionError(f"Backend {name} produced different draws than {backends[0]}")
+        results[name] = {
+            'rows_per_sec': len(draws) / best if best else float('inf'),
+            'seconds': best,
+            'draws': len(draws),
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Pais archive parser backends')
+    parser.add_argument('--pages', help='Glob of recorded archive HTML pages')
+    parser.add_argument('--rows', type=int, default=2000, help='Rows in the synthetic page')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.pages:
+        paths = sorted(glob.glob(args.pages))
+        pages = [open(p, encoding='utf-8').read() for p in paths]
+        print(f"{len(pages)} recorded page(s)")
+    else:
+        pages = [make_archive_page(args.rows)]
+        print(f"synthetic page, {args.rows} rows")
+
+    results = bench(pages, repeat=args.repeat)
+    baseline = results.get('bs4', {}).get('seconds')
+    for name, r in results.items():
+        speedup = f"  x{baseline / r['seconds']:.1f} vs bs4" if baseline and name != 'bs4' else ''
+        print(f"{name:>8}: {r['rows_per_sec']:>12,.0f} rows/s  ({r['draws']} draws, {r['seconds'] * 1000:.1f} ms){speedup}")
+
+if __name__ == '__main__':
+    main()
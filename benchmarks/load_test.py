@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+HTTP load test: the API under gunicorn against a synthetic database
+
+For each workers x threads configuration the app is started with gunicorn
+(cwd = a temp dir holding data/lottery.db seeded from models.synthetic),
+warmed up, then driven open-loop at --rate requests/s with a weighted mix
+of endpoints. Latency is measured from each request's scheduled send time,
+so a saturated server shows up as growing latency instead of a silently
+lower send rate.
+
+    python -m benchmarks.load_test --configs 1x1,4x1,2x4 --rate 200 --duration 30
+    python -m benchmarks.load_test --mix draws=5,latest=3,stats=1 --output load.json
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from models.synthetic import generate_draws
+from models.database import Database
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_GAMES = ('lotto', 'chance', '777', '123')
+
+# Endpoint name -> URL template ({game} is picked per request)
+ENDPOINTS = {
+    'draws': '/api/draws/{game}?limit=100',
+    'latest': '/api/draws/{game}/latest',
+    'stats': '/api/stats/{game}',
+    'recommendations': '/api/recommendations/{game}',
+    'coverage': '/api/coverage',
+}
+DEFAULT_MIX = {'draws': 40, 'latest': 30, 'stats': 10, 'recommendations': 10, 'coverage': 10}
+
+def parse_mix(value):
+    """'draws=5,latest=3' -> {'draws': 5.0, 'latest': 3.0}"""
+    mix = {}
+    for part in value.split(','):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}' (expected one of {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError('Endpoint mix needs at least one positive weight')
+    return mix
+
+def parse_configs(value):
+    """'1x1,2x4' -> [(1, 1), (2, 4)] (workers x threads)"""
+    configs = []
+    for part in value.split(','):
+        if part.strip():
+            workers, _, threads = part.strip().lower().partition('x')
+            configs.append((int(workers), int(threads or 1)))
+    return configs
+
+def build_database(workdir, games=DEFAULT_GAMES, years=30, seed=0):
+    """Create <workdir>/data/lottery.db (and logs/) with synthetic history; returns draw counts"""
+    os.makedirs(os.path.join(workdir, 'logs'), exist_ok=True)
+    os.makedirs(os.path.join(workdir, 'data'), exist_ok=True)
+    db = Database(os.path.join(workdir, 'data', 'lottery.db'))
+    counts = {}
+    for game_id in games:
+        draws = generate_draws(game_id, years=years, seed=seed)
+        db.upsert_draws(draws)
+        counts[game_id] = len(draws)
+    return counts
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def start_server(workdir, port, workers, threads, extra_env=None):
+    """Start gunicorn for app:create_app() with cwd=workdir; returns the Popen"""
+    cmd = [
+        sys.executable, '-m', 'gunicorn',
+        '-c', os.path.join(REPO_ROOT, 'gunicorn.conf.py'),
+        '--chdir', workdir,
+        '--pythonpath', REPO_ROOT,
+        '--bind', f'127.0.0.1:{port}',
+        '--workers', str(workers),
+        '--threads', str(threads),
+        '--log-level', 'warning',
+        'app:create_app()',
+    ]
+    if threads > 1:
+        cmd[cmd.index('--threads'):cmd.index('--threads')] = ['--worker-class', 'gthread']
+    env = dict(os.environ, ETL_SCHEDULER_ENABLED='false', FLASK_ENV='production', **(extra_env or {}))
+    env.pop('PROMETHEUS_MULTIPROC_DIR', None)
+    return subprocess.Popen(cmd, cwd=workdir, env=env)
+
+def wait_ready(base_url, proc, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f'gunicorn exited with code {proc.returncode}')
+        try:
+            if requests.get(f'{base_url}/health', timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f'{base_url} not ready after {timeout}s')
+
+def stop_server(proc, timeout=30):
+    if proc.poll() is None:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def summarize(samples, elapsed):
+    """Per-endpoint (and 'all') throughput, latency percentiles (ms) and error rate"""
+    groups = {'all': samples}
+    for sample in samples:
+        groups.setdefault(sample['endpoint'], []).append(sample)
+
+    report = {}
+    for name, group in groups.items():
+        latencies = sorted(s['latency'] for s in group)
+        errors = sum(1 for s in group if s['error'] or s['status'] >= 500)
+        report[name] = {
+            'requests': len(group),
+            'rps': round(len(group) / elapsed, 2) if elapsed else None,
+            'errors': errors,
+            'error_rate': round(errors / len(group), 4) if group else 0.0,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+            'p90_ms': round(percentile(latencies, 90) * 1000, 2) if latencies else None,
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+            'max_ms': round(latencies[-1] * 1000, 2) if latencies else None,
+        }
+    return report
+
+def run_load(base_url, mix, rate, duration, games=DEFAULT_GAMES, concurrency=64, timeout=30, seed=0):
+    """
+    Open-loop load: requests are scheduled every 1/rate seconds and sent
+    from a pool of `concurrency` threads. Returns summarize() output.
+    """
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    local = threading.local()
+    samples = []
+    lock = threading.Lock()
+
+    def send(endpoint, path, scheduled):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        status, error = 0, None
+        try:
+            status = session.get(base_url + path, timeout=timeout).status_code
+        except requests.RequestException as e:
+            error = type(e).__name__
+        latency = time.perf_counter() - scheduled
+        with lock:
+            samples.append({'endpoint': endpoint, 'status': status, 'error': error, 'latency': latency})
+
+    total = int(rate * duration)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(total):
+            scheduled = started + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            endpoint = rng.choices(names, weights)[0]
+            path = ENDPOINTS[endpoint].format(game=rng.choice(games))
+            pool.submit(send, endpoint, path, scheduled)
+    elapsed = time.perf_counter() - started
+    return summarize(samples, elapsed)
+
+def run_config(workdir, workers, threads, mix, rate, duration, warmup, games, concurrency):
+    """Start a server with this configuration, warm it up, drive load and stop it"""
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    proc = start_server(workdir, port, workers, threads)
+    try:
+        wait_ready(base_url, proc)
+        if warmup:
+            run_load(base_url, mix, rate, warmup, games, concurrency, seed=1)
+        return run_load(base_url, mix, rate, duration, games, concurrency)
+    finally:
+        stop_server(proc)
+
+def print_report(label, report):
+    print(f"\n=== {label} ===")
+    print(f"{'endpoint':<16}{'reqs':>8}{'rps':>9}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'errors':>9}")
+    for name, r in sorted(report.items(), key=lambda item: item[0] == 'all'):
+        print(f"{name:<16}{r['requests']:>8}{r['rps']:>9}{r['p50_ms']:>10}{r['p90_ms']:>10}"
+              f"{r['p99_ms']:>10}{r['max_ms']:>10}{r['error_rate']:>9.2%}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the API under gunicorn with a synthetic database')
+    parser.add_argument('--configs', default='1x1,2x1,4x1,2x4', help='Comma-separated WORKERSxTHREADS')
+    parser.add_argument('--rate', type=float, default=100, help='Target requests per second')
+    parser.add_argument('--duration', type=float, default=30, help='Measured seconds per configuration')
+    parser.add_argument('--warmup', type=float, default=5, help='Unmeasured warm-up seconds per configuration')
+    parser.add_argument('--mix', default=','.join(f'{k}={v}' for k, v in DEFAULT_MIX.items()),
+                        help='Weighted endpoint mix, e.g. draws=40,latest=30,stats=10')
+    parser.add_argument('--games', default=','.join(DEFAULT_GAMES), help='Games to seed and request')
+    parser.add_argument('--years', type=int, default=30, help='Years of synthetic history per game')
+    parser.add_argument('--concurrency', type=int, default=64, help='Client threads')
+    parser.add_argument('--workdir', help='Keep the server directory here instead of a temp dir')
+    parser.add_argument('--output', help='Write the full report to a JSON file')
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+        configs = parse_configs(args.configs)
+    except ValueError as e:
+        parser.error(str(e))
+    games = [g.strip() for g in args.games.split(',') if g.strip()]
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='lottery-load-')
+    try:
+        counts = build_database(workdir, games, args.years)
+        print(f"Synthetic database in {workdir}: {counts}")
+        results = {}
+        for workers, threads in configs:
+            label = f'{workers}x{threads}'
+            report = run_config(workdir, workers, threads, mix, args.rate, args.duration,
+                                args.warmup, games, args.concurrency)
+            results[label] = report
+            print_report(f'{workers} worker(s) x {threads} thread(s) @ {args.rate:g} req/s', report)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'rate': args.rate, 'duration': args.duration, 'mix': mix, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: analytics engines, database access and the archive parser
+at several history sizes, on seeded synthetic draws (models.synthetic)
+
+Results are compared against a JSON baseline; a case is a regression when
+its best time exceeds the baseline by more than --tolerance (and by more
+than --min-delta seconds, to ignore timer noise on tiny cases). Baselines
+are machine-specific: record them on the machine that runs the comparison.
+
+    python -m benchmarks.run_benchmarks --save-baseline
+    python -m benchmarks.run_benchmarks                      # exit 1 on regression
+    python -m benchmarks.run_benchmarks --sizes 100,1000 --cases statistics,db
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import logging
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from analytics.patterns import PatternDetector
+from analytics.recommendations import RecommendationEngine
+from analytics.statistics import StatisticsEngine
+from etl.testing import LOTTO_ARGS, make_archive_page
+from models.synthetic import generate_draws
+from etl.parsers.pais_heuristic import parse_pais_archive_html
+from models.database import Database
+from models.games import get_game
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'baseline.json')
+DEFAULT_SIZES = (100, 1000, 10000)
+# One game per rule set: 6-of-37 + bonus, 7 and 3 digit games, 1X2 rounds
+DEFAULT_GAMES = ('lotto', '777', '123', 'winner16')
+CASES = ('statistics', 'patterns', 'recommendations', 'db', 'parser')
+
+def time_call(fn, setup=None, repeat=3):
+    """Best and median wall time of fn(setup()) over `repeat` runs (setup is not timed)"""
+    timings = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        started = time.perf_counter()
+        fn(arg) if setup else fn()
+        timings.append(time.perf_counter() - started)
+    return {'seconds': min(timings), 'median_seconds': statistics.median(timings)}
+
+def _analytics_cases(cases, games, size):
+    engines = {
+        'statistics': lambda game, draws: StatisticsEngine(game, draws).analyze(),
+        'patterns': lambda game, draws: PatternDetector(game, draws).detect_all(),
+        'recommendations': lambda game, draws: RecommendationEngine(game, draws).generate(),
+    }
+    for game_id in games:
+        game = get_game(game_id)
+        draws = generate_draws(game_id, n_draws=size)
+        for case in cases:
+            if case in engines:
+                run = engines[case]
+                yield f'{case}[{game_id}:{size}]', lambda run=run, game=game, draws=draws: run(game, draws), None
+
+def _db_cases(size, workdir):
+    draws = generate_draws('lotto', n_draws=size)
+    counter = iter(range(1 << 30))
+
+    def fresh_db():
+        return Database(os.path.join(workdir, f'insert-{size}-{next(counter)}.db'))
+
+    def insert_all(db):
+        for draw in draws:
+            db.insert_draw(draw)
+
+    read_db = fresh_db()
+    read_db.upsert_draws(draws)
+    yield f'db.insert_draw[lotto:{size}]', insert_all, fresh_db
+    yield f'db.get_draws[lotto:{size}]', lambda: read_db.get_draws('lotto', limit=size), None
+
+def _parser_case(size):
+    html = make_archive_page(size)
+    yield f'parser[pais_lotto:{size}]', lambda: parse_pais_archive_html(html, **LOTTO_ARGS), None
+
+def run_suite(sizes=DEFAULT_SIZES, cases=CASES, games=DEFAULT_GAMES, repeat=3):
+    """Run the selected cases at every size; returns {case_name: {'size', 'seconds', 'median_seconds'}}"""
+    results = {}
+    workdir = tempfile.mkdtemp(prefix='lottery-bench-')
+    try:
+        for size in sizes:
+            selected = list(_analytics_cases(cases, games, size))
+            if 'db' in cases:
+                selected.extend(_db_cases(size, workdir))
+            if 'parser' in cases:
+                selected.extend(_parser_case(size))
+            for name, fn, setup in selected:
+                np.random.seed(0)
+                results[name] = {'size': size, **time_call(fn, setup, repeat)}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+def load_baseline(path):
+    """Baseline results dict, or None if the file does not exist"""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['results']
+
+def save_baseline(path, results, repeat):
+    """Write results plus the environment they were measured on"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    payload = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results
+    }
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+def compare(results, baseline, tolerance=0.25, min_delta=0.002):
+    """Cases slower than baseline * (1 + tolerance) by at least min_delta seconds"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        delta = current['seconds'] - previous['seconds']
+        if delta > min_delta and current['seconds'] > previous['seconds'] * (1 + tolerance):
+            regressions.append({
+                'case': name,
+                'baseline_seconds': previous['seconds'],
+                'seconds': current['seconds'],
+                'ratio': current['seconds'] / previous['seconds'] if previous['seconds'] else float('inf')
+            })
+    return regressions
+
+def _split(value):
+    return [v.strip() for v in value.split(',') if v.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the benchmark suite and compare against a JSON baseline')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help='Comma-separated draw counts')
+    parser.add_argument('--cases', default=','.join(CASES), help=f"Comma-separated subset of {', '.join(CASES)}")
+    parser.add_argument('--games', default=','.join(DEFAULT_GAMES), help='Games for the analytics cases')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON path')
+    parser.add_argument('--save-baseline', action='store_true', help='Write this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown ratio before flagging')
+    parser.add_argument('--min-delta', type=float, default=0.002, help='Ignore slowdowns smaller than this (seconds)')
+    parser.add_argument('--output', help='Also write this run\'s results to a JSON file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    cases = _split(args.cases)
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"Unknown cases: {', '.join(sorted(unknown))}")
+
+    results = run_suite([int(s) for s in _split(args.sizes)], cases, _split(args.games), args.repeat)
+    baseline = load_baseline(args.baseline)
+
+    for name, r in results.items():
+        previous = (baseline or {}).get(name)
+        change = f"  ({r['seconds'] / previous['seconds']:.2f}x baseline)" if previous and previous['seconds'] else ''
+        print(f"{name:<40} {r['seconds'] * 1000:>10.2f} ms  (median {r['median_seconds'] * 1000:.2f} ms){change}")
+
+    if args.output:
+        save_baseline(args.output, results, args.repeat)
+    if args.save_baseline:
+        save_baseline(args.baseline, results, args.repeat)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline} (run with --save-baseline)")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance, args.min_delta)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.tolerance:.0%} tolerance:")
+        for r in regressions:
+            print(f"  {r['case']}: {r['baseline_seconds'] * 1000:.2f} ms -> {r['seconds'] * 1000:.2f} ms ({r['ratio']:.2f}x)")
+        return 1
+    print('\nNo regressions')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
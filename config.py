@@ -19,15 +19,76 @@ class Config:
     
     # Database
     DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///lottery.db')
+    # SQLite file used by the API (relative to the working directory)
+    DATABASE_PATH = os.getenv('DATABASE_PATH', 'data/lottery.db')
     
-    # Admin
+    # Admin (seeds admin_users when the table is empty; logins are checked against admin_users)
     ADMIN_USERNAME = os.getenv('ADMIN_USERNAME', 'admin')
     ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD', 'admin123')
+    # PBKDF2 verification pool: concurrent hashes and waiting logins (beyond that: 503)
+    AUTH_HASH_WORKERS = int(os.getenv('AUTH_HASH_WORKERS', 2))
+    AUTH_HASH_QUEUE = int(os.getenv('AUTH_HASH_QUEUE', 16))
+    AUTH_HASH_TIMEOUT = float(os.getenv('AUTH_HASH_TIMEOUT', 10))
     
     # ETL Configuration
     ETL_SCHEDULE_CRON = os.getenv('ETL_SCHEDULE_CRON', '0 3 * * *')
     ETL_MAX_RETRIES = int(os.getenv('ETL_MAX_RETRIES', 3))
     ETL_TIMEOUT = int(os.getenv('ETL_TIMEOUT', 300))
+    ETL_CONCURRENCY = int(os.getenv('ETL_CONCURRENCY', 4))
+    ETL_PER_HOST_CONCURRENCY = int(os.getenv('ETL_PER_HOST_CONCURRENCY', 2))
+    ETL_POLITENESS_DELAY = float(os.getenv('ETL_POLITENESS_DELAY', 1.0))
+    ETL_JOB_WORKERS = int(os.getenv('ETL_JOB_WORKERS', 1))
+    # Running jobs refresh etl_jobs.heartbeat_at; a job without one for
+    # ETL_JOB_STALE_SECONDS is taken to have lost its worker and marked failed
+    ETL_JOB_HEARTBEAT_SECONDS = float(os.getenv('ETL_JOB_HEARTBEAT_SECONDS', 30))
+    ETL_JOB_STALE_SECONDS = int(os.getenv('ETL_JOB_STALE_SECONDS', 4 * ETL_JOB_HEARTBEAT_SECONDS))
+    
+    # In-process ETL scheduler (reads etl_schedules; ETL_SCHEDULE_CRON is the default)
+    ETL_SCHEDULER_ENABLED = os.getenv('ETL_SCHEDULER_ENABLED', 'false').lower() == 'true'
+    ETL_SCHEDULER_MAX_CONCURRENCY = int(os.getenv('ETL_SCHEDULER_MAX_CONCURRENCY', 2))
+    ETL_SCHEDULER_MISFIRE_GRACE = int(os.getenv('ETL_SCHEDULER_MISFIRE_GRACE', 3600))
+    ETL_SCHEDULER_JITTER = int(os.getenv('ETL_SCHEDULER_JITTER', 120))
+    ETL_SCHEDULER_SYNC_INTERVAL = int(os.getenv('ETL_SCHEDULER_SYNC_INTERVAL', 60))
+    ETL_SCHEDULER_LOCK_FILE = os.getenv('ETL_SCHEDULER_LOCK_FILE', 'data/scheduler.lock')
+    
+    # Ingestion log retention: runs older than this are rolled into daily summaries
+    # (scripts/rollup_ingestion_logs.py, or by the scheduler on INGESTION_LOG_ROLLUP_CRON)
+    INGESTION_LOG_RETENTION_DAYS = int(os.getenv('INGESTION_LOG_RETENTION_DAYS', 90))
+    INGESTION_LOG_ROLLUP_CRON = os.getenv('INGESTION_LOG_ROLLUP_CRON', '30 4 * * *')
+    
+    # Analytics
+    # Directory for cross-worker single-flight lock files (empty = per-process only)
+    SINGLEFLIGHT_LOCK_DIR = os.getenv('SINGLEFLIGHT_LOCK_DIR', '')
+    # Memory budget per analytics computation (0 = unlimited); over budget, fewer
+    # recent draws are analyzed (never below ANALYTICS_MIN_DRAWS) and the response says so
+    ANALYTICS_MEMORY_BUDGET_MB = float(os.getenv('ANALYTICS_MEMORY_BUDGET_MB', 0))
+    ANALYTICS_MIN_DRAWS = int(os.getenv('ANALYTICS_MIN_DRAWS', 100))
+    ANALYTICS_BYTES_PER_DRAW = int(os.getenv('ANALYTICS_BYTES_PER_DRAW', 2048))
+    
+    # tracemalloc peaks per request/analytics stage in /metrics (adds allocation overhead)
+    MEMORY_TRACKING_ENABLED = os.getenv('MEMORY_TRACKING_ENABLED', 'false').lower() == 'true'
+    MEMORY_TRACKING_PATHS = os.getenv('MEMORY_TRACKING_PATHS', '/api/stats,/api/recommendations')
+    
+    # Metrics (/metrics in Prometheus format, off by default: it exposes per-route
+    # traffic). METRICS_TOKEN, when set, must be sent as `Authorization: Bearer <token>`.
+    # With gunicorn, also set PROMETHEUS_MULTIPROC_DIR so all workers are aggregated
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'false').lower() == 'true'
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+    
+    # Query profiler (GET /api/admin/stats/queries); statements slower than
+    # QUERY_SLOW_MS are logged and get their EXPLAIN QUERY PLAN captured
+    QUERY_PROFILER_ENABLED = os.getenv('QUERY_PROFILER_ENABLED', 'false').lower() == 'true'
+    QUERY_SLOW_MS = float(os.getenv('QUERY_SLOW_MS', 50))
+    
+    # Request profiling (GET /api/admin/profiles): requests to PROFILE_PATHS are
+    # profiled when sent with `X-Profile: 1` and an admin JWT, or at PROFILE_SAMPLE_RATE
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'true').lower() == 'true'
+    PROFILE_MODE = os.getenv('PROFILE_MODE', 'sample')  # sample (folded stacks) | cprofile (pstats)
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+    PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', 5))
+    PROFILE_PATHS = os.getenv('PROFILE_PATHS', '/api/stats,/api/recommendations,/api/draws')
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'data/profiles')
+    PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', 50))
     
     # Official Data Sources
     DATA_SOURCES = {
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List
+
+from etl.connectors.base_connector import BaseConnector, DrawResult
+from etl.orchestrator import HostThrottle, run_concurrently
+from etl.parsers.pais_heuristic import iter_pais_archive_html
+from etl.run_ingest import GAMES, _configure_logging, parse_game_ids, raw_store_dir, update_coverage, write_draws
+from etl.utils.jsonio import load_json
+from etl.utils.ndjson import utc_now_iso
+from etl.utils.raw_store import RawPageStore
+
+
+LOGGER = logging.getLogger("etl.backfill")
+
+# Pais archive search: the results page is filtered by a DD/MM/YYYY range.
+DEFAULT_URL_TEMPLATE = "{source_url}?fromDate={start:%d/%m/%Y}&toDate={end:%d/%m/%Y}"
+
+
+@dataclass(frozen=True)
+class Shard:
+    """One period of the archive, fetched as a single results page."""
+    start: date
+    end: date
+
+    @property
+    def key(self) -> str:
+        return f"{self.start.isoformat()}_{self.end.isoformat()}"
+
+
+def make_shards(start: date, end: date, months: int = 1) -> List[Shard]:
+    """Split ``[start, end]`` into consecutive calendar periods of ``months`` months."""
+    months = max(1, months)
+    shards: List[Shard] = []
+    cur = start
+    while cur <= end:
+        idx = cur.year * 12 + (cur.month - 1) + months
+        nxt = date(idx // 12, idx % 12 + 1, 1)
+        shard_end = min(end, date.fromordinal(nxt.toordinal() - 1))
+        shards.append(Shard(cur, shard_end))
+        cur = nxt
+    return shards
+
+
+class Checkpoint:
+    """Completed shards for one game, persisted after every shard.
+
+    Only shards whose draws were fully written are recorded, so rerunning
+    after an interruption or failure refetches exactly the missing periods.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.done: Dict[str, dict] = load_json(self.path, default={}).get("done", {})
+
+    def is_done(self, shard: Shard) -> bool:
+        return shard.key in self.done
+
+    def mark_done(self, shard: Shard, fetched: int, added: int) -> None:
+        self.done[shard.key] = {"fetched": fetched, "added": added, "utc": utc_now_iso()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"done": self.done}, indent=2) + "\n", encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def checkpoint_path(data_repo: Path, game_id: str) -> Path:
+    return data_repo / "datasets/_meta/backfill" / f"{game_id}.json"
+
+
+def fetch_shard(
+    game_id: str,
+    shard: Shard,
+    throttle: HostThrottle | None = None,
+    url_template: str = DEFAULT_URL_TEMPLATE,
+    max_retries: int = 3,
+    raw_store: RawPageStore | None = None,
+) -> List[DrawResult]:
+    """Fetch and parse one shard's page; returns only draws inside the shard."""
+    cfg = GAMES[game_id]
+    connector: BaseConnector = cfg["connector"]()
+    connector.throttle = throttle
+
+    url = url_template.format(source_url=cfg["source_url"], start=shard.start, end=shard.end)
+    page = connector.fetch_page(url, max_retries=max_retries)
+    if not page:
+        raise RuntimeError(f"Failed to fetch {url}")
+    if raw_store is not None:
+        raw_store.put(url, page.text.encode("utf-8"), game_id=game_id)
+
+    draws: List[DrawResult] = []
+    for d in iter_pais_archive_html(
+        page.text,
+        game_id=game_id,
+        source_url=cfg["source_url"],
+        numbers_count=cfg["numbers_count"],
+        bonus_count=cfg["bonus_count"],
+        min_num=cfg["min_num"],
+        max_num=cfg["max_num"],
+    ):
+        if shard.start <= d.draw_date.date() <= shard.end:
+            d.checksum = connector.calculate_checksum(d)
+            draws.append(d)
+    return draws
+
+
+def backfill_game(
+    data_repo: Path,
+    game_id: str,
+    start: date,
+    end: date,
+    *,
+    shard_months: int = 1,
+    workers: int = 4,
+    per_host: int = 2,
+    delay: float = 1.0,
+    url_template: str = DEFAULT_URL_TEMPLATE,
+    max_retries: int = 3,
+    checkpoint: Checkpoint | None = None,
+    raw_store: RawPageStore | None = None,
+) -> dict:
+    """Crawl ``[start, end]`` for one game on a bounded pool, resuming from the checkpoint.
+
+    Shards are fetched/parsed concurrently and written one at a time through
+    ``write_draws`` (which batches per year file and dedups by draw_id).
+    Failed shards are logged and left out of the checkpoint.
+    """
+    checkpoint = checkpoint or Checkpoint(checkpoint_path(data_repo, game_id))
+    shards = make_shards(start, end, shard_months)
+    todo = [s for s in shards if not checkpoint.is_done(s)]
+    LOGGER.info(f"Backfill {game_id}: {len(shards)} shards, {len(shards) - len(todo)} already done")
+
+    throttle = HostThrottle(max_per_host=per_host, delay=delay)
+    totals = {"fetched": 0, "added": 0, "failed": 0}
+    newest: dict | None = None
+
+    def extract(shard: Shard) -> List[DrawResult]:
+        return fetch_shard(game_id, shard, throttle, url_template=url_template, max_retries=max_retries,
+                           raw_store=raw_store)
+
+    def load(shard: Shard, fut: Future) -> None:
+        nonlocal newest
+        try:
+            draws = fut.result()
+            r = write_draws(data_repo, game_id, draws)
+        except Exception as e:
+            LOGGER.error(f"Backfill {game_id} shard {shard.key} failed: {e}")
+            totals["failed"] += 1
+            return
+        checkpoint.mark_done(shard, r["fetched"], r["added"])
+        totals["fetched"] += r["fetched"]
+        totals["added"] += r["added"]
+        if r["last_draw_date"] and (newest is None or r["last_draw_date"] >= newest["last_draw_date"]):
+            newest = r
+
+    run_concurrently(todo, extract, load, max_workers=workers)
+
+    LOGGER.info(
+        f"Backfill {game_id} complete: fetched={totals['fetched']} added={totals['added']} "
+        f"failed_shards={totals['failed']}"
+    )
+    return {
+        "game_id": game_id,
+        "shards": len(shards),
+        "skipped_shards": len(shards) - len(todo),
+        "failed_shards": totals["failed"],
+        "fetched": totals["fetched"],
+        "added": totals["added"],
+        "last_draw_date": newest["last_draw_date"] if newest else None,
+        "last_draw_id": newest["last_draw_id"] if newest else None,
+        "source": GAMES[game_id]["source_url"],
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Resumable historical backfill of official lottery archives")
+    ap.add_argument("--data-repo-path", required=True, help="Path to checked-out lottery-data-archive repo")
+    ap.add_argument("--games", default="all", help="Comma-separated game ids or 'all'")
+    ap.add_argument("--from", dest="date_from", required=True, help="First date to backfill (YYYY-MM-DD)")
+    ap.add_argument("--to", dest="date_to", default=None, help="Last date to backfill (default: today)")
+    ap.add_argument("--shard-months", type=int, default=1, help="Months of archive per fetched page")
+    ap.add_argument("--workers", type=int, default=4, help="Shards fetched/parsed concurrently")
+    ap.add_argument("--per-host", type=int, default=2, help="Max concurrent requests per host")
+    ap.add_argument("--delay", type=float, default=1.0, help="Min seconds between requests to the same host")
+    ap.add_argument("--url-template", default=DEFAULT_URL_TEMPLATE,
+                    help="Shard URL; placeholders {source_url}, {start}, {end} (dates accept strftime specs)")
+    ap.add_argument("--raw-store-dir", default=None, help="Raw page archive (default: <data-repo>/datasets/_raw)")
+    ap.add_argument("--no-raw-store", action="store_true", help="Do not archive fetched pages")
+    ap.add_argument("--restart", action="store_true", help="Ignore the checkpoint and refetch every shard")
+    ap.add_argument("--log-path", default=None, help="Optional log file path")
+    args = ap.parse_args()
+
+    data_repo = Path(args.data_repo_path).resolve()
+    _configure_logging(Path(args.log_path).resolve() if args.log_path else None)
+
+    start = date.fromisoformat(args.date_from)
+    end = date.fromisoformat(args.date_to) if args.date_to else datetime.now().date()
+
+    game_ids = parse_game_ids(ap, args.games)
+
+    raw_store = None if args.no_raw_store else RawPageStore(raw_store_dir(data_repo, args.raw_store_dir))
+
+    results = []
+    for gid in game_ids:
+        cp_path = checkpoint_path(data_repo, gid)
+        if args.restart and cp_path.exists():
+            cp_path.unlink()
+        results.append(
+            backfill_game(
+                data_repo,
+                gid,
+                start,
+                end,
+                shard_months=args.shard_months,
+                workers=args.workers,
+                per_host=args.per_host,
+                delay=args.delay,
+                url_template=args.url_template,
+                checkpoint=Checkpoint(cp_path),
+                raw_store=raw_store,
+            )
+        )
+
+    update_coverage(data_repo, results)
+    LOGGER.info("Backfill complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,14 @@
 """Base ETL class"""
 
 from abc import ABC, abstractmethod
+import contextlib
 import requests
 from bs4 import BeautifulSoup
 import logging
 from datetime import datetime
 import time
+from etl.utils.checksum import results_checksum
+from etl.utils.timing import StageTimer
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +24,10 @@ class BaseETL(ABC):
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
+        # Optional etl.orchestrator.HostThrottle shared between ETL instances
+        self.throttle = None
+        # Per-run stage timings (reset by extract)
+        self.timer = StageTimer()
     
     @abstractmethod
     def fetch_data(self, mode='incremental'):
@@ -40,48 +47,67 @@ class BaseETL(ABC):
         required_fields = ['draw_number', 'draw_date', 'results']
         return all(field in draw_data for field in required_fields)
     
-    def run(self, mode='incremental'):
-        """Execute full ETL pipeline"""
+    def extract(self, mode='incremental'):
+        """
+        Fetch and parse (no database access, safe to run concurrently)
+        Returns (raw_data, parsed_draws)
+        """
+        self.timer = StageTimer()
+        with self.timer.stage('fetch'):
+            raw_data = self.fetch_data(mode=mode)
+        with self.timer.stage('parse'):
+            return raw_data, self.parse_data(raw_data)
+    
+    def run(self, mode='incremental', extracted=None):
+        """
+        Execute full ETL pipeline
+        extracted: optional callable returning extract() output, used when
+        fetch/parse already ran elsewhere (e.g. concurrently)
+        """
         start_time = time.time()
         run_data = {
             'game_id': self.game_id,
             'status': 'started'
         }
+        rows = 0
         
         try:
             logger.info(f"Starting ETL for {self.game_id} in {mode} mode")
             
-            # Fetch
-            raw_data = self.fetch_data(mode=mode)
+            # Fetch + parse
+            raw_data, parsed_draws = extracted() if extracted else self.extract(mode=mode)
             run_data['records_fetched'] = len(raw_data) if isinstance(raw_data, list) else 0
+            rows = len(parsed_draws)
             
-            # Parse
-            parsed_draws = self.parse_data(raw_data)
-            
-            # Load
-            inserted = 0
-            updated = 0
             errors = []
+            valid_draws = []
+            
+            with self.timer.stage('validate'):
+                for draw in parsed_draws:
+                    if not self.validate_draw(draw):
+                        errors.append(f"Invalid draw: {draw}")
+                        continue
+                    
+                    draw['game_id'] = self.game_id
+                    valid_draws.append(draw)
+            
+            with self.timer.stage('checksum'):
+                for draw in valid_draws:
+                    if not draw.get('checksum'):
+                        draw['checksum'] = results_checksum(draw['draw_number'], draw['draw_date'], draw['results'])
             
-            for draw in parsed_draws:
-                if not self.validate_draw(draw):
-                    errors.append(f"Invalid draw: {draw}")
-                    continue
-                
-                draw['game_id'] = self.game_id
-                result = self.db.insert_draw(draw)
-                
-                if result is not None:
-                    inserted += 1
-                else:
-                    updated += 1
+            # Load (draws whose checksum is unchanged are not rewritten)
+            with self.timer.stage('load'):
+                counts = self.db.upsert_draws(valid_draws)
             
             run_data['status'] = 'success'
-            run_data['records_inserted'] = inserted
-            run_data['records_updated'] = updated
+            run_data['records_inserted'] = counts['inserted']
+            run_data['records_updated'] = counts['updated']
+            run_data['records_unchanged'] = counts['unchanged']
             run_data['errors'] = errors
             
-            logger.info(f"ETL completed for {self.game_id}: {inserted} inserted, {updated} updated")
+            logger.info(f"ETL completed for {self.game_id}: {counts['inserted']} inserted, "
+                        f"{counts['updated']} updated, {counts['unchanged']} unchanged")
             
         except Exception as e:
             logger.error(f"ETL failed for {self.game_id}: {e}")
@@ -90,6 +116,7 @@ class BaseETL(ABC):
         
         finally:
             run_data['duration_seconds'] = time.time() - start_time
+            run_data.update(self.timer.as_dict(rows=rows))
             self.db.log_ingestion_run(run_data)
         
         return run_data
@@ -97,8 +124,10 @@ class BaseETL(ABC):
     def fetch_url(self, url, params=None, timeout=30):
         """Fetch URL with error handling"""
         try:
-            response = self.session.get(url, params=params, timeout=timeout)
+            with self.throttle.slot(url) if self.throttle else contextlib.nullcontext():
+                response = self.session.get(url, params=params, timeout=timeout)
             response.raise_for_status()
+            self.timer.bytes_downloaded += len(response.content)
             return response
         except requests.RequestException as e:
             logger.error(f"Error fetching {url}: {e}")
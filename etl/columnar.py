@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+from datetime import date
+from pathlib import Path
+from typing import List, Sequence
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from etl.run_ingest import GAMES, _configure_logging, parse_game_ids
+
+
+LOGGER = logging.getLogger("etl.columnar")
+
+SOURCE_KEY = b"lottery.sources"
+
+
+def parquet_path(data_repo: Path, game_id: str) -> Path:
+    """``datasets/pais/lotto/ndjson`` -> ``datasets/pais/lotto/parquet/pais_lotto.parquet``."""
+    return (data_repo / GAMES[game_id]["data_subdir"]).parent / "parquet" / f"{game_id}.parquet"
+
+
+def game_schema(game_id: str) -> pa.Schema:
+    """Typed columns: date, draw_id, n1..nN, bonus1..bonusB (null when missing), checksum."""
+    cfg = GAMES[game_id]
+    fields = [pa.field("date", pa.date32(), nullable=False), pa.field("draw_id", pa.string(), nullable=False)]
+    fields += [pa.field(f"n{i + 1}", pa.int16(), nullable=False) for i in range(cfg["numbers_count"])]
+    fields += [pa.field(f"bonus{i + 1}", pa.int16()) for i in range(cfg["bonus_count"])]
+    fields.append(pa.field("checksum", pa.string()))
+    return pa.schema(fields)
+
+
+def _year_files(data_repo: Path, game_id: str) -> List[Path]:
+    base = data_repo / GAMES[game_id]["data_subdir"]
+    return sorted(base.glob("[0-9][0-9][0-9][0-9].ndjson"))
+
+
+def _source_fingerprint(files: Sequence[Path]) -> bytes:
+    return json.dumps(
+        [[f.name, f.stat().st_size, f.stat().st_mtime_ns] for f in files], separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _year_table(path: Path, schema: pa.Schema, numbers_count: int, bonus_count: int) -> pa.Table:
+    rows = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                rows.append(json.loads(line))
+    rows.sort(key=lambda r: (r["date"], r["draw_id"]))
+
+    cols = {
+        "date": [date.fromisoformat(r["date"]) for r in rows],
+        "draw_id": [str(r["draw_id"]) for r in rows],
+    }
+    for i in range(numbers_count):
+        cols[f"n{i + 1}"] = [r["numbers"][i] for r in rows]
+    for i in range(bonus_count):
+        cols[f"bonus{i + 1}"] = [(r.get("bonus") or [None] * bonus_count)[i] for r in rows]
+    cols["checksum"] = [r.get("checksum") for r in rows]
+    return pa.Table.from_pydict(cols, schema=schema)
+
+
+def compact_game(data_repo: Path, game_id: str, force: bool = False) -> Path | None:
+    """Rewrite a game's NDJSON year files as one Parquet file, one row group per year.
+
+    Skipped when the year files are unchanged since the last compaction
+    (their names/sizes/mtimes are stored in the file's schema metadata).
+    """
+    cfg = GAMES[game_id]
+    files = _year_files(data_repo, game_id)
+    if not files:
+        return None
+
+    out = parquet_path(data_repo, game_id)
+    fingerprint = _source_fingerprint(files)
+    if not force and out.exists():
+        meta = pq.read_schema(out).metadata or {}
+        if meta.get(SOURCE_KEY) == fingerprint:
+            LOGGER.info(f"Parquet for {game_id} is up to date")
+            return out
+
+    schema = game_schema(game_id).with_metadata({SOURCE_KEY: fingerprint})
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(out.name + f".{os.getpid()}.tmp")
+    rows = 0
+    with pq.ParquetWriter(tmp, schema, compression="zstd") as writer:
+        for path in files:
+            table = _year_table(path, schema, cfg["numbers_count"], cfg["bonus_count"])
+            if table.num_rows:
+                writer.write_table(table, row_group_size=table.num_rows)
+                rows += table.num_rows
+    os.replace(tmp, out)
+    LOGGER.info(f"Compacted {game_id}: {rows} draws from {len(files)} year files -> {out}")
+    return out
+
+
+def read_draws(
+    data_repo: Path,
+    game_id: str,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    columns: Sequence[str] | None = None,
+) -> pa.Table:
+    """Read a game's compacted draws as an Arrow table.
+
+    Date bounds are pushed down as Parquet filters, so row groups (years)
+    outside the range are skipped using their min/max statistics. The file
+    is memory-mapped; call ``.to_pandas()`` or ``.to_pydict()`` as needed.
+    """
+    filters = []
+    if date_from:
+        filters.append(("date", ">=", date_from))
+    if date_to:
+        filters.append(("date", "<=", date_to))
+    return pq.read_table(
+        parquet_path(data_repo, game_id),
+        columns=list(columns) if columns else None,
+        filters=filters or None,
+        memory_map=True,
+    )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Compact NDJSON year files into per-game Parquet")
+    ap.add_argument("--data-repo-path", required=True, help="Path to checked-out lottery-data-archive repo")
+    ap.add_argument("--games", default="all", help="Comma-separated game ids or 'all'")
+    ap.add_argument("--force", action="store_true", help="Rewrite even if the year files are unchanged")
+    ap.add_argument("--log-path", default=None, help="Optional log file path")
+    args = ap.parse_args()
+
+    data_repo = Path(args.data_repo_path).resolve()
+    _configure_logging(Path(args.log_path).resolve() if args.log_path else None)
+
+    for gid in parse_game_ids(ap, args.games):
+        compact_game(data_repo, gid, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
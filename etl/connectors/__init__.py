@@ -1,13 +1,14 @@
 """
 ETL Connectors - מחברים למקורות רשמיים בלבד
 """
-from .base_connector import BaseConnector, DrawResult
+from .base_connector import BaseConnector, DrawResult, FetchResult
 from .pais_lotto import PaisLottoConnector
 from .pais_chance import PaisChanceConnector
 
 __all__ = [
     'BaseConnector',
     'DrawResult',
+    'FetchResult',
     'PaisLottoConnector',
     'PaisChanceConnector',
 ]
@@ -6,10 +6,12 @@ from datetime import datetime
 from typing import List, Dict, Optional
 from dataclasses import dataclass
 import logging
-import hashlib
+import contextlib
 import requests
 import time
 
+from etl.utils.checksum import draw_checksum
+
 @dataclass
 class DrawResult:
     """Draw result structure"""
@@ -22,6 +24,15 @@ class DrawResult:
     source_url: str
     checksum: str
 
+@dataclass
+class FetchResult:
+    """Outcome of a (possibly conditional) page fetch"""
+    url: str
+    text: Optional[str]
+    status_code: int
+    unchanged: bool = False  # 304, or body identical to the cached hash
+    cache_entry: Optional[object] = None  # HttpCache entry to commit once processed
+
 class BaseConnector(ABC):
     """מחבר בסיס לכל מקורות הנתונים"""
     
@@ -33,6 +44,12 @@ class BaseConnector(ABC):
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Lottery Data Platform/1.0; +https://github.com/ubriga/lottery-platform-backend)'
         })
+        # Optional etl.orchestrator.HostThrottle shared between connectors
+        self.throttle = None
+        # Optional etl.utils.http_cache.HttpCache for conditional requests
+        self.http_cache = None
+        # Optional etl.utils.timing.StageTimer receiving bytes downloaded / retries
+        self.timer = None
     
     @abstractmethod
     def fetch_latest(self, days: int = 7) -> List[DrawResult]:
@@ -50,17 +67,37 @@ class BaseConnector(ABC):
     
     def calculate_checksum(self, draw: DrawResult) -> str:
         """חישוב checksum לזיהוי שינויים"""
-        data = f"{draw.draw_id}|{draw.draw_date.isoformat()}|{sorted(draw.numbers)}"
-        if draw.bonus_numbers:
-            data += f"|{sorted(draw.bonus_numbers)}"
-        return hashlib.sha256(data.encode()).hexdigest()[:16]
+        return draw_checksum(draw.draw_id, draw.draw_date, draw.numbers, draw.bonus_numbers)
+    
+    def _request_slot(self, url: str):
+        """Per-host concurrency/politeness slot (no-op without a throttle)"""
+        return self.throttle.slot(url) if self.throttle else contextlib.nullcontext()
     
     def fetch_with_retry(self, url: str, max_retries: int = 3, timeout: int = 30) -> Optional[str]:
         """משיכת נתונים עם retry logic"""
+        result = self.fetch_page(url, max_retries=max_retries, timeout=timeout)
+        return result.text if result else None
+    
+    def fetch_page(self, url: str, max_retries: int = 3, timeout: int = 30,
+                   conditional: bool = False) -> Optional[FetchResult]:
+        """
+        משיכת דף עם retry logic
+        conditional=True (with http_cache set) sends If-None-Match/If-Modified-Since
+        and marks the result unchanged on 304 or when the body hash matches.
+        """
+        cache = self.http_cache
+        conditional = conditional and cache is not None
+        headers = cache.conditional_headers(url) if conditional else {}
+        
         for attempt in range(max_retries):
             try:
                 self.logger.info(f"Fetching {url} (attempt {attempt + 1}/{max_retries})")
-                response = self.session.get(url, timeout=timeout)
+                with self._request_slot(url):
+                    response = self.session.get(url, timeout=timeout, headers=headers)
+                
+                if conditional and response.status_code == 304:
+                    self.logger.info(f"Not modified: {url}")
+                    return FetchResult(url=url, text=None, status_code=304, unchanged=True)
                 response.raise_for_status()
                 
                 # אימות שלא היה redirect למקור לא רשמי
@@ -68,11 +105,21 @@ class BaseConnector(ABC):
                     self.logger.error(f"Redirected to non-official source: {response.url}")
                     return None
                 
-                return response.text
+                if self.timer is not None:
+                    self.timer.bytes_downloaded += len(response.content)
+                result = FetchResult(url=url, text=response.text, status_code=response.status_code)
+                if cache is not None:
+                    result.cache_entry = cache.entry_for(url, response.headers, response.content)
+                    result.unchanged = conditional and cache.is_unchanged(url, response.content)
+                    if result.unchanged:
+                        self.logger.info(f"Content unchanged (hash match): {url}")
+                return result
                 
             except requests.RequestException as e:
                 self.logger.warning(f"Attempt {attempt + 1} failed: {e}")
                 if attempt < max_retries - 1:
+                    if self.timer is not None:
+                        self.timer.retries += 1
                     time.sleep(2 ** attempt)  # Exponential backoff
                 else:
                     self.logger.error(f"Failed to fetch {url} after {max_retries} attempts")
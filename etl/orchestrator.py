@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, TypeVar
+from urllib.parse import urlsplit
+
+
+LOGGER = logging.getLogger("etl.orchestrator")
+
+K = TypeVar("K")
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class HostThrottle:
+    """Caps concurrent requests per host and spaces out their start times.
+
+    Shared by all connectors in a run so that fetching several games from the
+    same site in parallel stays polite.
+    """
+
+    def __init__(self, max_per_host: int = 2, delay: float = 1.0) -> None:
+        self.max_per_host = max(1, max_per_host)
+        self.delay = max(0.0, delay)
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    def _semaphore(self, host: str) -> threading.Semaphore:
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.Semaphore(self.max_per_host)
+            return self._semaphores[host]
+
+    def _reserve_start(self, host: str) -> float:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + self.delay
+            return start - now
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        host = urlsplit(url).netloc.lower()
+        sem = self._semaphore(host)
+        sem.acquire()
+        try:
+            wait = self._reserve_start(host)
+            if wait > 0:
+                time.sleep(wait)
+            yield
+        finally:
+            sem.release()
+
+
+def run_concurrently(
+    items: Iterable[K],
+    extract: Callable[[K], T],
+    load: Callable[[K, Future], R],
+    max_workers: int,
+) -> List[Tuple[K, R]]:
+    """Run ``extract`` for all items on a thread pool, then ``load`` serially.
+
+    ``load`` is called from the calling thread as each extraction completes and
+    receives the finished future, so extraction errors surface via
+    ``future.result()`` inside ``load``. Wall-clock time is bounded by the
+    slowest extraction plus the (serial) load phase.
+    """
+
+    items = list(items)
+    results: List[Tuple[K, R]] = []
+    if not items:
+        return results
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items))), thread_name_prefix="etl-extract") as pool:
+        futures = {pool.submit(extract, item): item for item in items}
+        for fut in as_completed(futures):
+            item = futures[fut]
+            results.append((item, load(item, fut)))
+    return results
@@ -1,23 +1,227 @@
 from __future__ import annotations
 
+import os
 import re
-from dataclasses import asdict
+from collections import deque
 from datetime import datetime
-from typing import Iterable, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional
 
 from bs4 import BeautifulSoup
+from bs4.dammit import EntitySubstitution
 
 from etl.connectors.base_connector import DrawResult
 
 DATE_RE = re.compile(r"(\d{1,2}/\d{1,2}/\d{4})")
+INT_RE = re.compile(r"\d+")
+
+DEFAULT_BACKEND = os.getenv("PAIS_PARSER_BACKEND", "bs4")
 
 
 def _extract_ints(text: str) -> List[int]:
-    return [int(x) for x in re.findall(r"\d+", text)]
+    return [int(x) for x in INT_RE.findall(text)]
 
 
-def parse_pais_archive_html(
-    html: str,
+# ---------------------------------------------------------------------------
+# Row-text backends: each yields " ".join(tr.stripped_strings) for every <tr>
+# in document order, exactly as BeautifulSoup(html, 'html.parser') would.
+# ---------------------------------------------------------------------------
+
+def _iter_rows_bs4(html: str) -> Iterator[str]:
+    soup = BeautifulSoup(html, 'html.parser')
+    for tr in soup.find_all('tr'):
+        yield " ".join(tr.stripped_strings)
+
+
+def _lxml_strings(el, hidden: bool = False) -> Iterator[str]:
+    if not isinstance(el.tag, str):  # comment / processing instruction
+        return
+    hidden = hidden or el.tag in _HIDDEN_TEXT_TAGS
+    if el.text and not hidden:
+        yield el.text
+    for child in el:
+        yield from _lxml_strings(child, hidden)
+        if child.tail and not hidden:
+            yield child.tail
+
+
+def _iter_rows_lxml(html: str) -> Iterator[str]:
+    """lxml backend. Matches bs4 on well-formed tables; libxml2 repairs
+    malformed markup (e.g. unclosed <tr>, stray end tags) differently from
+    html.parser, so row text can differ on broken pages."""
+    from lxml import html as lxml_html
+
+    root = lxml_html.fromstring(html)
+    for tr in root.iter('tr'):
+        yield " ".join(s for s in (t.strip() for t in _lxml_strings(tr)) if s)
+
+
+# Elements html.parser closes immediately (bs4's empty_element_tags).
+_VOID_TAGS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem',
+    'meta', 'param', 'source', 'track', 'wbr', 'basefont', 'bgsound', 'command', 'frame',
+    'image', 'isindex', 'nextid', 'spacer',
+})
+# Strings inside these are not NavigableString in bs4, so stripped_strings skips them.
+_HIDDEN_TEXT_TAGS = frozenset({'script', 'style', 'template', 'rt', 'rp'})
+_RAW_TEXT_TAGS = frozenset({'script', 'style'})
+
+# One alternative per html.parser event. Markup html.parser cannot finish
+# (unterminated comment/CDATA/declaration) becomes undecoded text up to the
+# next '>' (else up to the next '<', else just the '<'), the way
+# HTMLParser.goahead() falls back at close().
+_TOKEN_RE = re.compile(
+    r"<!--.*?--\s*>"                                            # comment
+    r"|<!\[(?i:cdata)\[(?P<cdata>.*?)\]\s*\]\s*>"               # CDATA section
+    r"|<(?!!--)(?!!\[(?i:cdata)\[)[!?][^>]*>"                   # doctype / declaration / PI
+    r"|</(?:\s*(?P<end>[a-zA-Z][-.a-zA-Z0-9:_]*)\s*"            # end tag
+    r"|(?P<end_tolerant>[a-zA-Z][^\t\n\r\f />\x00]*)[^>]*)>"
+    r"|(?P<empty_end></>)"                                      # ignored entirely
+    r"|</[^>]*>"                                                # bogus comment
+    r"|<(?P<start>[a-zA-Z][^\s/>]*)(?P<attrs>(?:[^>\"']|\"[^\"]*\"|'[^']*')*)>"  # start tag
+    r"|(?P<text><(?:[!?/](?:[^>]*>|[^<]*(?=<)))?)",             # unterminated markup / lone '<'
+    re.S,
+)
+
+_REF_RE = re.compile(
+    r"&(?:#(?:(?P<dec>[0-9]+)|[xX](?P<hex>[0-9a-fA-F]+))(?![0-9a-fA-F])"
+    r"|(?P<name>[a-zA-Z][-.a-zA-Z0-9]*)(?![a-zA-Z0-9]));?"
+)
+
+
+def _replace_ref(m) -> str:
+    """Character/entity reference as BeautifulSoupHTMLParser decodes it."""
+    name = m.group('name')
+    if name is not None:
+        return EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name, '&' + name)
+    code = int(m.group('dec')) if m.group('dec') is not None else int(m.group('hex'), 16)
+    if code < 256:
+        try:
+            return bytes([code]).decode('windows-1252')
+        except UnicodeDecodeError:
+            pass
+    try:
+        return chr(code)
+    except (ValueError, OverflowError):
+        return "\N{REPLACEMENT CHARACTER}"
+
+
+def _iter_rows_stream(html: str) -> Iterator[str]:
+    """Streaming tokenizer: scans tags with one regex and keeps only an open
+    element stack and the text of open <tr> rows; no DOM is built. Rows are
+    yielded as soon as they (and every row opened before them) are closed.
+
+    Text is cut into strings where bs4 cuts it (at every parser event), so a
+    redundant end tag for a void element such as the ``</br>`` in
+    ``1<br>2</br>3`` joins "2" and "3" exactly like bs4 does."""
+    stack: List[str] = []          # open element names
+    open_rows: List[list] = []     # [stack_depth, strings] for rows still open
+    pending: deque = deque()       # rows in start order, yielded once closed
+    hidden = 0                     # open elements whose text bs4 hides
+    data: List[str] = []           # text since the last event (one bs4 string)
+    closed_voids: List[str] = []   # bs4's already_closed_empty_element
+    pos = 0
+    skip_until = 0                 # end of a <script>/<style> body
+
+    def add_string(text: str) -> None:
+        text = text.strip()
+        if text:
+            for row in open_rows:
+                row[1].append(text)
+
+    def add_data(text: str) -> None:
+        data.append(_REF_RE.sub(_replace_ref, text) if '&' in text else text)
+
+    def flush() -> None:
+        if data:
+            text = "".join(data)
+            data.clear()
+            if open_rows and not hidden:
+                add_string(text)
+
+    def close_to(depth: int) -> None:
+        nonlocal hidden
+        while len(stack) > depth:
+            name = stack.pop()
+            if name in _HIDDEN_TEXT_TAGS:
+                hidden -= 1
+        while open_rows and open_rows[-1][0] >= depth:
+            open_rows.pop()[2] = True
+
+    for m in _TOKEN_RE.finditer(html):
+        start = m.start()
+        if start < skip_until:
+            continue
+        if start > pos:
+            add_data(html[pos:start])
+        pos = m.end()
+
+        kind = m.lastgroup
+        if kind == 'text':
+            data.append(m.group())  # html.parser passes it on undecoded
+            continue
+        if kind == 'empty_end':
+            continue
+        end_name = m.group('end') or m.group('end_tolerant')
+        if end_name and end_name.lower() in closed_voids:
+            closed_voids.remove(end_name.lower())
+            continue
+
+        flush()
+        if kind == 'cdata':
+            if open_rows and not hidden:
+                add_string(m.group('cdata'))
+        elif end_name:
+            name = end_name.lower()
+            for depth in range(len(stack) - 1, -1, -1):
+                if stack[depth] == name:
+                    close_to(depth)
+                    break
+        elif kind == 'attrs':
+            name = m.group('start').lower()
+            self_closing = m.group('attrs').rstrip().endswith('/')
+            if name in _VOID_TAGS or self_closing:
+                if self_closing:
+                    if name in closed_voids:
+                        # bs4 swallows this end event, so the element stays open
+                        closed_voids.remove(name)
+                        stack.append(name)
+                else:
+                    closed_voids.append(name)
+                if name == 'tr':
+                    pending.append([len(stack), [], True])
+                continue
+            if name == 'tr':
+                row = [len(stack), [], False]
+                open_rows.append(row)
+                pending.append(row)
+            stack.append(name)
+            if name in _HIDDEN_TEXT_TAGS:
+                hidden += 1
+            if name in _RAW_TEXT_TAGS:
+                close = re.compile(rf"</\s*{name}\s*>", re.I).search(html, pos)
+                skip_until = pos = close.start() if close else len(html)
+        else:
+            continue
+        while pending and pending[0][2]:
+            yield " ".join(pending.popleft()[1])
+
+    if pos < len(html):
+        add_data(html[pos:])
+    flush()
+    close_to(0)
+    while pending:
+        yield " ".join(pending.popleft()[1])
+
+
+BACKENDS: Dict[str, Callable[[str], Iterator[str]]] = {
+    "bs4": _iter_rows_bs4,
+    "lxml": _iter_rows_lxml,
+    "stream": _iter_rows_stream,
+}
+
+
+def _row_to_draw(
+    row_text: str,
     *,
     game_id: str,
     source_url: str,
@@ -25,68 +229,126 @@ def parse_pais_archive_html(
     bonus_count: int,
     min_num: int,
     max_num: int,
-) -> List[DrawResult]:
-    """Heuristic parser for Pais archive pages.
+) -> Optional[DrawResult]:
+    m = DATE_RE.search(row_text)
+    if not m:
+        return None
 
-    It searches all table rows, looks for a DD/MM/YYYY date, and then extracts numbers
-    in the allowed range. This is resilient to minor HTML changes.
-    """
+    date_text = m.group(1)
+    day, month, year = date_text.split('/')
+    try:
+        # Same result as strptime(date_text, '%d/%m/%Y') for DATE_RE matches, much cheaper.
+        draw_date = datetime(int(year), int(month), int(day))
+    except ValueError:
+        return None
 
-    soup = BeautifulSoup(html, 'html.parser')
-    draws: List[DrawResult] = []
+    # Remove date portion before extracting ints, so day/month/year don't pollute.
+    text_wo_date = row_text.replace(date_text, " ")
+    ints = _extract_ints(text_wo_date)
 
-    for tr in soup.find_all('tr'):
-        row_text = " ".join(tr.stripped_strings)
-        m = DATE_RE.search(row_text)
-        if not m:
-            continue
+    # Candidates in legal range are likely the draw numbers.
+    candidates = [x for x in ints if min_num <= x <= max_num]
+    needed = numbers_count + bonus_count
+    if len(candidates) < needed:
+        return None
 
-        date_text = m.group(1)
-        try:
-            draw_date = datetime.strptime(date_text, '%d/%m/%Y')
-        except ValueError:
-            continue
+    selected = candidates[-needed:]
+    numbers = sorted(selected[:numbers_count])
+    bonus: Optional[List[int]] = None
+    if bonus_count:
+        bonus = selected[numbers_count:numbers_count + bonus_count]
 
-        # Remove date portion before extracting ints, so day/month/year don't pollute.
-        text_wo_date = row_text.replace(date_text, " ")
-        ints = _extract_ints(text_wo_date)
+    # draw id: try to find an int that is NOT in number range (often the draw number)
+    draw_id = None
+    for x in ints:
+        if x < min_num or x > max_num:
+            # avoid picking odds like 2026 etc (already removed date, but just in case)
+            if 1 <= x <= 999999:
+                draw_id = str(x)
+                break
+    if not draw_id:
+        # deterministic fallback: date + numbers
+        draw_id = f"{draw_date.date().isoformat()}-" + "-".join(map(str, selected))
 
-        # Candidates in legal range are likely the draw numbers.
-        candidates = [x for x in ints if min_num <= x <= max_num]
-        needed = numbers_count + bonus_count
-        if len(candidates) < needed:
-            continue
+    # checksum will be set by the caller via BaseConnector.calculate_checksum
+    return DrawResult(
+        game_id=game_id,
+        draw_id=draw_id,
+        draw_date=draw_date,
+        numbers=numbers,
+        bonus_numbers=bonus,
+        metadata={"parser": "heuristic_v1"},
+        source_url=source_url,
+        checksum="",
+    )
 
-        selected = candidates[-needed:]
-        numbers = sorted(selected[:numbers_count])
-        bonus: Optional[List[int]] = None
-        if bonus_count:
-            bonus = selected[numbers_count:numbers_count + bonus_count]
-
-        # draw id: try to find an int that is NOT in number range (often the draw number)
-        draw_id = None
-        for x in ints:
-            if x < min_num or x > max_num:
-                # avoid picking odds like 2026 etc (already removed date, but just in case)
-                if 1 <= x <= 999999:
-                    draw_id = str(x)
-                    break
-        if not draw_id:
-            # deterministic fallback: date + numbers
-            draw_id = f"{draw_date.date().isoformat()}-" + "-".join(map(str, selected))
 
-        draw = DrawResult(
+def iter_pais_archive_html(
+    html: str,
+    *,
+    game_id: str,
+    source_url: str,
+    numbers_count: int,
+    bonus_count: int,
+    min_num: int,
+    max_num: int,
+    backend: str | None = None,
+) -> Iterator[DrawResult]:
+    """Lazily yield draws in page order (the Pais archive lists newest first).
+
+    With the "stream" backend rows are tokenized on demand, so a caller that
+    stops iterating early (incremental ingest reaching a draw it already has)
+    never scans the rest of the page.
+    """
+
+    iter_rows = BACKENDS[backend or DEFAULT_BACKEND]
+    for row_text in iter_rows(html):
+        draw = _row_to_draw(
+            row_text,
             game_id=game_id,
-            draw_id=draw_id,
-            draw_date=draw_date,
-            numbers=numbers,
-            bonus_numbers=bonus,
-            metadata={"parser": "heuristic_v1"},
             source_url=source_url,
-            checksum="",
+            numbers_count=numbers_count,
+            bonus_count=bonus_count,
+            min_num=min_num,
+            max_num=max_num,
         )
-        # checksum will be set by caller connector base; but we can mimic
-        # caller will call BaseConnector.calculate_checksum
-        draws.append(draw)
+        if draw is not None:
+            yield draw
+
 
-    return draws
+def parse_pais_archive_html(
+    html: str,
+    *,
+    game_id: str,
+    source_url: str,
+    numbers_count: int,
+    bonus_count: int,
+    min_num: int,
+    max_num: int,
+    backend: str | None = None,
+) -> List[DrawResult]:
+    """Heuristic parser for Pais archive pages.
+
+    It searches all table rows, looks for a DD/MM/YYYY date, and then extracts numbers
+    in the allowed range. This is resilient to minor HTML changes.
+
+    ``backend`` selects how row text is extracted: "bs4" (reference
+    implementation, default unless PAIS_PARSER_BACKEND says otherwise),
+    "stream" (regex tokenizer without a DOM, checked against bs4 by
+    tests/test_parsers.py) or "lxml" (requires the optional lxml package;
+    libxml2 drops CDATA and repairs stray end tags differently, so draws can
+    differ on malformed pages).
+    """
+
+    return list(
+        iter_pais_archive_html(
+            html,
+            game_id=game_id,
+            source_url=source_url,
+            numbers_count=numbers_count,
+            bonus_count=bonus_count,
+            min_num=min_num,
+            max_num=max_num,
+            backend=backend,
+        )
+    )
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from etl.connectors.base_connector import DrawResult
+from etl.parsers.pais_heuristic import parse_pais_archive_html
+from etl.run_ingest import GAMES, _configure_logging, draw_payload, parse_game_ids, raw_store_dir, update_coverage
+from etl.utils.ndjson import write_ndjson
+from etl.utils.raw_store import RawPageStore
+
+
+LOGGER = logging.getLogger("etl.reparse")
+
+
+def _parse_object(root: str, sha: str, parse_args: dict) -> List[DrawResult]:
+    """Process-pool worker: decompress one stored page and run the current parser."""
+    html = RawPageStore(Path(root)).get(sha).decode("utf-8")
+    return parse_pais_archive_html(html, **parse_args)
+
+
+def _pages_by_game(store: RawPageStore, game_ids: List[str]) -> Dict[str, List[str]]:
+    """Unique page hashes per game, in the order they were first fetched."""
+    pages: Dict[str, Dict[str, None]] = {gid: {} for gid in game_ids}
+    for entry in store.iter_manifest():
+        gid = entry.get("game_id")
+        if gid in pages:
+            pages[gid].pop(entry["sha256"], None)
+            pages[gid][entry["sha256"]] = None  # move to the end: latest fetch wins
+    return {gid: list(shas) for gid, shas in pages.items()}
+
+
+def _load_dataset(base_dir: Path) -> Dict[str, Tuple[str, dict]]:
+    """Current NDJSON records of one game: draw_id -> (year file stem, record)."""
+    records: Dict[str, Tuple[str, dict]] = {}
+    for path in sorted(base_dir.glob("*.ndjson")):
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    obj = json.loads(line)
+                except ValueError:
+                    continue
+                if "draw_id" in obj:
+                    records[str(obj["draw_id"])] = (path.stem, obj)
+    return records
+
+
+def _swap_dir(staged: Path, target: Path) -> None:
+    """Replace ``target`` with ``staged``; the old tree is removed only after the swap."""
+    backup = target.with_name(target.name + ".reparse-old")
+    if backup.exists():
+        shutil.rmtree(backup)
+    if target.exists():
+        os.replace(target, backup)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(staged, target)
+    if backup.exists():
+        shutil.rmtree(backup)
+
+
+def reparse_game(data_repo: Path, store: RawPageStore, game_id: str, shas: List[str],
+                 pool: ProcessPoolExecutor) -> dict:
+    """Re-run the parser over one game's archived pages and merge the result
+    into its NDJSON dataset.
+
+    Pages are parsed in the pool; when several pages contain the same
+    draw_id the most recently fetched page wins. Reparsed draws replace
+    stored records whose checksum differs and are added when missing;
+    stored draws that no archived page contains (history scraped before the
+    raw store existed, other parsers) are kept as they are. The merged
+    dataset is written to a staging directory next to the real one and
+    swapped in at the end.
+    """
+    cfg = GAMES[game_id]
+    parse_args = {
+        "game_id": game_id,
+        "source_url": cfg["source_url"],
+        "numbers_count": cfg["numbers_count"],
+        "bonus_count": cfg["bonus_count"],
+        "min_num": cfg["min_num"],
+        "max_num": cfg["max_num"],
+    }
+    connector = cfg["connector"]()
+
+    by_id: Dict[str, DrawResult] = {}
+    for draws in pool.map(_parse_object, [str(store.root)] * len(shas), shas, [parse_args] * len(shas)):
+        for d in draws:
+            by_id[d.draw_id] = d
+
+    target = data_repo / cfg["data_subdir"]
+    records = _load_dataset(target)
+    added = updated = 0
+    for d in by_id.values():
+        d.checksum = connector.calculate_checksum(d)
+        old = records.get(d.draw_id)
+        if old is not None and old[1].get("checksum") == d.checksum:
+            continue
+        if old is None:
+            added += 1
+        else:
+            updated += 1
+        records[d.draw_id] = (str(d.draw_date.year), draw_payload(d))
+
+    kept = sorted(set(records) - set(by_id))
+    if kept:
+        LOGGER.warning(
+            f"{game_id}: {len(kept)} stored draws are not in any archived page and were kept: "
+            f"{', '.join(kept[:20])}{' ...' if len(kept) > 20 else ''}"
+        )
+
+    by_year: Dict[str, List[dict]] = {}
+    for year, rec in records.values():
+        by_year.setdefault(year, []).append(rec)
+
+    staging_root = target.parent / f".{target.name}.reparse"
+    if staging_root.exists():
+        shutil.rmtree(staging_root)
+    staged = staging_root / target.name
+    for year, recs in by_year.items():
+        recs.sort(key=lambda r: (str(r.get("date") or ""), str(r["draw_id"])))
+        write_ndjson(staged / f"{year}.ndjson", recs)
+    if staged.exists():
+        _swap_dir(staged, target)
+    shutil.rmtree(staging_root, ignore_errors=True)
+
+    newest = max((rec for _, rec in records.values()),
+                 key=lambda r: (str(r.get("date") or ""), str(r["draw_id"])), default=None)
+    LOGGER.info(
+        f"Reparsed {game_id}: pages={len(shas)} draws={len(by_id)} added={added} "
+        f"updated={updated} unchanged={len(by_id) - added - updated} kept={len(kept)}"
+    )
+    return {
+        "game_id": game_id,
+        "fetched": len(by_id),
+        "added": added,
+        "updated": updated,
+        "kept": len(kept),
+        "last_draw_date": newest.get("date") if newest else None,
+        "last_draw_id": newest["draw_id"] if newest else None,
+        "source": cfg["source_url"],
+        "pages": len(shas),
+    }
+
+
+def reparse(data_repo: Path, store: RawPageStore, game_ids: List[str], workers: int | None = None,
+            compact: bool = True) -> List[dict]:
+    """Reparse each game's archived pages; with ``compact`` the Parquet copy of
+    every reparsed game is rebuilt (forced: the swapped-in year files can keep
+    the sizes the compaction fingerprint recorded)."""
+    pages = _pages_by_game(store, game_ids)
+    results = []
+    with ProcessPoolExecutor(max_workers=workers or None) as pool:
+        for gid in game_ids:
+            if not pages[gid]:
+                LOGGER.warning(f"No archived pages for {gid} (skipping)")
+                continue
+            results.append(reparse_game(data_repo, store, gid, pages[gid], pool))
+
+    if compact:
+        from etl.columnar import compact_game
+
+        for r in results:
+            try:
+                compact_game(data_repo, r["game_id"], force=True)
+            except Exception as e:
+                LOGGER.warning(f"{r['game_id']}: Parquet compaction failed: {e}")
+    return results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Re-run the current parser over archived raw pages (no network)")
+    ap.add_argument("--data-repo-path", required=True, help="Path to checked-out lottery-data-archive repo")
+    ap.add_argument("--games", default="all", help="Comma-separated game ids or 'all'")
+    ap.add_argument("--raw-store-dir", default=None, help="Raw page archive (default: <data-repo>/datasets/_raw)")
+    ap.add_argument("--workers", type=int, default=0, help="Parser processes (default: CPU count)")
+    ap.add_argument("--no-compact", action="store_true", help="Skip rebuilding the Parquet files")
+    ap.add_argument("--log-path", default=None, help="Optional log file path")
+    args = ap.parse_args()
+
+    data_repo = Path(args.data_repo_path).resolve()
+    _configure_logging(Path(args.log_path).resolve() if args.log_path else None)
+
+    game_ids = parse_game_ids(ap, args.games)
+
+    store = RawPageStore(raw_store_dir(data_repo, args.raw_store_dir))
+    results = reparse(data_repo, store, game_ids, workers=args.workers or None, compact=not args.no_compact)
+    update_coverage(data_repo, results)
+    LOGGER.info("Reparse complete")
+
+
+if __name__ == "__main__":
+    main()
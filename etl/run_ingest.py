@@ -2,16 +2,21 @@ from __future__ import annotations
 
 import argparse
 import logging
-from datetime import datetime, timedelta, timezone
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from etl.connectors.base_connector import BaseConnector, DrawResult
+from etl.connectors.base_connector import BaseConnector, DrawResult, FetchResult
 from etl.connectors.pais_lotto import PaisLottoConnector
 from etl.connectors.pais_chance import PaisChanceConnector
-from etl.parsers.pais_heuristic import parse_pais_archive_html
+from etl.orchestrator import HostThrottle, run_concurrently
+from etl.parsers.pais_heuristic import iter_pais_archive_html
+from etl.utils.http_cache import HttpCache
 from etl.utils.jsonio import dump_json, load_json
-from etl.utils.ndjson import utc_now_iso, write_ndjson
+from etl.utils.ndjson import load_draw_ids, utc_now_iso, write_ndjson
+from etl.utils.raw_store import RawPageStore
+from etl.utils.timing import StageTimer
 
 
 LOGGER = logging.getLogger("etl.run_ingest")
@@ -56,53 +61,144 @@ def _year_file(base: Path, d: datetime) -> Path:
     return base / f"{d.year}.ndjson"
 
 
-def _load_existing_ids(year_path: Path) -> set[str]:
-    if not year_path.exists():
-        return set()
-    ids = set()
-    # For safety, read all for now; can be optimized later.
-    for line in year_path.read_text(encoding='utf-8').splitlines():
-        if not line.strip():
-            continue
-        try:
-            # minimal parse to avoid json module overhead is possible later
-            import json
-
-            obj = json.loads(line)
-            if "draw_id" in obj:
-                ids.add(str(obj["draw_id"]))
-        except Exception:
-            continue
-    return ids
-
-
-def ingest_game(data_repo: Path, game_id: str) -> dict:
+def load_stop_markers(data_repo: Path) -> Dict[str, dict]:
+    """Per-game ``{"last_draw_date", "last_draw_id"}`` recorded in coverage.json."""
+    cov = load_json(data_repo / "datasets/_meta/coverage.json", default={})
+    markers: Dict[str, dict] = {}
+    for gid, g in (cov.get("games") or {}).items():
+        if g.get("last_draw_date") or g.get("last_draw_id"):
+            markers[gid] = {"last_draw_date": g.get("last_draw_date"), "last_draw_id": g.get("last_draw_id")}
+    return markers
+
+
+def take_new_draws(draws: Iterable[DrawResult], stop_at: dict | None) -> List[DrawResult]:
+    """Consume newest-first draws until reaching one already ingested.
+
+    Stops at the recorded draw_id or at the first draw older than the
+    recorded date. Draws on the same date are kept (write_draws dedups them)
+    so a second draw on the last known day is not lost.
+
+    The newest-first order is checked as draws are consumed and against the
+    draw after the stop point; if a date goes up (an oldest-first page or a
+    reordering parser) the rest of the page is consumed and every draw is
+    returned, leaving dedup to write_draws.
+    """
+    if not stop_at:
+        return list(draws)
+
+    last_id = stop_at.get("last_draw_id")
+    last_date: Optional[date] = None
+    if stop_at.get("last_draw_date"):
+        last_date = date.fromisoformat(stop_at["last_draw_date"])
+
+    it = iter(draws)
+    new: List[DrawResult] = []
+    for d in it:
+        if new and d.draw_date > new[-1].draw_date:
+            return _take_all_draws(new + [d], it, new[-1], d)
+        if (last_id and d.draw_id == last_id) or (last_date and d.draw_date.date() < last_date):
+            following = next(it, None)
+            if following is not None and following.draw_date > d.draw_date:
+                return _take_all_draws(new + [d, following], it, d, following)
+            break
+        new.append(d)
+    return new
+
+
+def _take_all_draws(
+    taken: List[DrawResult], rest: Iterable[DrawResult], earlier: DrawResult, later: DrawResult
+) -> List[DrawResult]:
+    LOGGER.warning(
+        "%s: archive is not newest-first (draw %s on %s follows draw %s on %s); parsing the whole page",
+        later.game_id,
+        later.draw_id,
+        later.draw_date.date().isoformat(),
+        earlier.draw_id,
+        earlier.draw_date.date().isoformat(),
+    )
+    taken.extend(rest)
+    return taken
+
+
+def fetch_and_parse(
+    game_id: str,
+    throttle: HostThrottle | None = None,
+    http_cache: HttpCache | None = None,
+    conditional: bool = False,
+    stop_at: dict | None = None,
+    raw_store: RawPageStore | None = None,
+    timer: StageTimer | None = None,
+) -> Tuple[List[DrawResult] | None, FetchResult]:
+    """Fetch and parse one game's archive page (no writes; safe to run concurrently).
+
+    Returns ``(None, page)`` when a conditional fetch finds the page unchanged,
+    in which case parsing is skipped. With ``stop_at`` (see
+    ``load_stop_markers``) the page is tokenized with the "stream" backend,
+    whatever PAIS_PARSER_BACKEND says, and parsing stops at the first
+    already-ingested draw; the DOM backends parse the whole page up front.
+    Downloaded pages are archived in ``raw_store`` for offline re-parsing.
+    Stage durations, bytes and retries are accumulated in ``timer``.
+    """
     cfg = GAMES[game_id]
+    timer = timer or StageTimer()
     connector: BaseConnector = cfg["connector"]()
+    connector.throttle = throttle
+    connector.http_cache = http_cache
+    connector.timer = timer
 
-    html = connector.fetch_with_retry(cfg["source_url"], max_retries=3)
-    if not html:
+    with timer.stage("fetch"):
+        page = connector.fetch_page(cfg["source_url"], max_retries=3, conditional=conditional)
+    if not page:
         raise RuntimeError(f"Failed to fetch {cfg['source_url']}")
+    if page.unchanged:
+        return None, page
+    html = page.text
+    if raw_store is not None:
+        raw_store.put(cfg["source_url"], html.encode("utf-8"), game_id=game_id)
 
     # Use heuristic parser to avoid brittle selectors.
-    draws: List[DrawResult] = parse_pais_archive_html(
-        html,
-        game_id=game_id,
-        source_url=cfg["source_url"],
-        numbers_count=cfg["numbers_count"],
-        bonus_count=cfg["bonus_count"],
-        min_num=cfg["min_num"],
-        max_num=cfg["max_num"],
-    )
+    with timer.stage("parse"):
+        draws = take_new_draws(
+            iter_pais_archive_html(
+                html,
+                game_id=game_id,
+                source_url=cfg["source_url"],
+                numbers_count=cfg["numbers_count"],
+                bonus_count=cfg["bonus_count"],
+                min_num=cfg["min_num"],
+                max_num=cfg["max_num"],
+                backend="stream" if stop_at else None,
+            ),
+            stop_at,
+        )
 
     # Compute checksum using connector helper
-    for d in draws:
-        d.checksum = connector.calculate_checksum(d)
+    with timer.stage("checksum"):
+        for d in draws:
+            d.checksum = connector.calculate_checksum(d)
+    return draws, page
+
+
+def draw_payload(d: DrawResult) -> dict:
+    """NDJSON record for one draw."""
+    return {
+        "game_id": d.game_id,
+        "draw_id": d.draw_id,
+        "date": d.draw_date.date().isoformat(),
+        "numbers": d.numbers,
+        "bonus": d.bonus_numbers,
+        "source": d.source_url,
+        "checksum": d.checksum,
+        "metadata": d.metadata,
+    }
 
-    # Write per-year NDJSON with dedup by draw_id
+
+def write_draws(data_repo: Path, game_id: str, draws: List[DrawResult]) -> dict:
+    """Append new draws to the per-year NDJSON files (dedup by draw_id)."""
+    cfg = GAMES[game_id]
     base_dir = data_repo / cfg["data_subdir"]
     added = 0
-    last_date = None
+    newest: DrawResult | None = None
 
     # Group by year
     by_year: Dict[int, List[DrawResult]] = {}
@@ -111,40 +207,114 @@ def ingest_game(data_repo: Path, game_id: str) -> dict:
 
     for year, year_draws in by_year.items():
         year_path = base_dir / f"{year}.ndjson"
-        existing = _load_existing_ids(year_path)
+        existing = load_draw_ids(year_path)
 
         payloads = []
         for d in sorted(year_draws, key=lambda x: (x.draw_date, x.draw_id)):
             if d.draw_id in existing:
                 continue
-            payloads.append(
-                {
-                    "game_id": d.game_id,
-                    "draw_id": d.draw_id,
-                    "date": d.draw_date.date().isoformat(),
-                    "numbers": d.numbers,
-                    "bonus": d.bonus_numbers,
-                    "source": d.source_url,
-                    "checksum": d.checksum,
-                    "metadata": d.metadata,
-                }
-            )
+            payloads.append(draw_payload(d))
             existing.add(d.draw_id)
             added += 1
-            last_date = d.draw_date
+            if newest is None or d.draw_date >= newest.draw_date:
+                newest = d
 
         if payloads:
-            write_ndjson(year_path, payloads)
+            write_ndjson(year_path, payloads, ids=existing)
 
     return {
         "game_id": game_id,
         "fetched": len(draws),
         "added": added,
-        "last_draw_date": last_date.date().isoformat() if last_date else None,
+        "last_draw_date": newest.draw_date.date().isoformat() if newest else None,
+        "last_draw_id": newest.draw_id if newest else None,
         "source": cfg["source_url"],
     }
 
 
+def _unchanged_result(game_id: str) -> dict:
+    return {
+        "game_id": game_id,
+        "fetched": 0,
+        "added": 0,
+        "last_draw_date": None,
+        "last_draw_id": None,
+        "source": GAMES[game_id]["source_url"],
+        "unchanged": True,
+    }
+
+
+def _write_page(data_repo: Path, game_id: str, draws: List[DrawResult] | None, page: FetchResult,
+                http_cache: HttpCache | None, timer: StageTimer | None = None) -> dict:
+    timer = timer or StageTimer()
+    if draws is None:
+        r = _unchanged_result(game_id)
+    else:
+        with timer.stage("load"):
+            r = write_draws(data_repo, game_id, draws)
+        # Remember validators only after the page was fully written.
+        if http_cache is not None and page.cache_entry is not None:
+            http_cache.put(page.cache_entry)
+    r["timings"] = timer.as_dict(rows=len(draws or []))
+    return r
+
+
+def ingest_game(data_repo: Path, game_id: str, http_cache: HttpCache | None = None,
+                conditional: bool = False, mode: str = "full", raw_store: RawPageStore | None = None) -> dict:
+    stop_at = load_stop_markers(data_repo).get(game_id) if mode == "incremental" else None
+    timer = StageTimer()
+    draws, page = fetch_and_parse(game_id, http_cache=http_cache, conditional=conditional, stop_at=stop_at,
+                                  raw_store=raw_store, timer=timer)
+    return _write_page(data_repo, game_id, draws, page, http_cache, timer)
+
+
+def ingest_games(
+    data_repo: Path,
+    game_ids: List[str],
+    *,
+    workers: int = 4,
+    per_host: int = 2,
+    delay: float = 1.0,
+    http_cache: HttpCache | None = None,
+    conditional: bool = False,
+    mode: str = "full",
+    raw_store: RawPageStore | None = None,
+) -> List[dict]:
+    """Fetch/parse games concurrently, then write them one at a time.
+
+    In ``incremental`` mode each page is parsed only down to the last draw
+    recorded in coverage.json.
+    """
+    throttle = HostThrottle(max_per_host=per_host, delay=delay)
+    markers = load_stop_markers(data_repo) if mode == "incremental" else {}
+    timers = {gid: StageTimer() for gid in game_ids}
+
+    def extract(gid: str):
+        return fetch_and_parse(gid, throttle, http_cache=http_cache, conditional=conditional,
+                               stop_at=markers.get(gid), raw_store=raw_store, timer=timers[gid])
+
+    def write(gid: str, fut: Future) -> dict | None:
+        try:
+            draws, page = fut.result()
+            r = _write_page(data_repo, gid, draws, page, http_cache, timers[gid])
+        except Exception as e:
+            LOGGER.exception(f"Failed ingest for {gid}: {e}")
+            return None
+        t = r["timings"]
+        stages = " ".join(f"{k[:-8]}={v:.3f}s" for k, v in t.items() if k.endswith("_seconds"))
+        if r.get("unchanged"):
+            LOGGER.info(f"Skipped {gid}: source page unchanged since last run ({stages})")
+        else:
+            LOGGER.info(
+                f"Ingested {gid}: fetched={r['fetched']} added={r['added']} last={r['last_draw_date']} "
+                f"{stages} bytes={t['bytes_downloaded']} retries={t['retries']} rows/s={t['rows_per_second']}"
+            )
+        return r
+
+    done = run_concurrently(game_ids, extract, write, max_workers=workers)
+    return [r for _, r in done if r is not None]
+
+
 def update_coverage(data_repo: Path, game_results: List[dict]) -> None:
     cov_path = data_repo / "datasets/_meta/coverage.json"
     cov = load_json(cov_path, default={"last_updated": None, "games": {}})
@@ -155,50 +325,102 @@ def update_coverage(data_repo: Path, game_results: List[dict]) -> None:
         gid = r["game_id"]
         cov.setdefault("games", {}).setdefault(gid, {})
         g = cov["games"][gid]
-        g["last_draw_date"] = r["last_draw_date"]
+        # Never move the marker backwards (e.g. when a run only filled older gaps).
+        if r["last_draw_date"] and r["last_draw_date"] >= (g.get("last_draw_date") or ""):
+            g["last_draw_date"] = r["last_draw_date"]
+            g["last_draw_id"] = r.get("last_draw_id")
         g["coverage_status"] = "incremental" if r["added"] else g.get("coverage_status", "initial")
         g["last_ingest"] = {
             "utc": utc_now_iso(),
             "fetched": r["fetched"],
             "added": r["added"],
             "source": r["source"],
+            "timings": r.get("timings"),
         }
 
     dump_json(cov_path, cov)
 
 
+def raw_store_dir(data_repo: Path, override: str | None = None) -> Path:
+    return (Path(override) if override else data_repo / "datasets/_raw").resolve()
+
+
+def parse_game_ids(ap: argparse.ArgumentParser, games: str) -> List[str]:
+    """Game ids from a ``--games`` value ("all" or comma-separated); unknown ids are a usage error."""
+    if games.strip().lower() == "all":
+        return list(GAMES.keys())
+    game_ids = [g.strip() for g in games.split(",") if g.strip()]
+    unknown = [g for g in game_ids if g not in GAMES]
+    if unknown:
+        ap.error(f"unknown game id(s): {', '.join(unknown)} (known: {', '.join(GAMES)})")
+    return game_ids
+
+
 def main() -> None:
     ap = argparse.ArgumentParser(description="Ingest official Israeli lottery archives into the data repo")
     ap.add_argument("--data-repo-path", required=True, help="Path to checked-out lottery-data-archive repo")
     ap.add_argument("--games", default="all", help="Comma-separated game ids or 'all'")
     ap.add_argument("--mode", default="incremental", choices=["incremental", "full"], help="Ingestion mode")
     ap.add_argument("--log-path", default=None, help="Optional log file path")
+    ap.add_argument("--workers", type=int, default=0, help="Games fetched/parsed concurrently (default: all)")
+    ap.add_argument("--per-host", type=int, default=2, help="Max concurrent requests per host")
+    ap.add_argument("--delay", type=float, default=1.0, help="Min seconds between requests to the same host")
+    ap.add_argument(
+        "--http-cache-dir",
+        default=None,
+        help="ETag/Last-Modified cache dir (default: <data-repo>/datasets/_meta/http_cache)",
+    )
+    ap.add_argument("--no-http-cache", action="store_true", help="Always download and re-parse pages")
+    ap.add_argument(
+        "--raw-store-dir",
+        default=None,
+        help="Content-addressed archive of fetched pages (default: <data-repo>/datasets/_raw)",
+    )
+    ap.add_argument("--no-raw-store", action="store_true", help="Do not archive fetched pages")
+    ap.add_argument("--no-compact", action="store_true", help="Skip the Parquet compaction stage")
     args = ap.parse_args()
 
     data_repo = Path(args.data_repo_path).resolve()
     log_path = Path(args.log_path).resolve() if args.log_path else None
     _configure_logging(log_path)
 
-    if args.games.strip().lower() == "all":
-        game_ids = list(GAMES.keys())
-    else:
-        game_ids = [g.strip() for g in args.games.split(",") if g.strip()]
+    game_ids = parse_game_ids(ap, args.games)
 
     LOGGER.info(f"Starting ingestion: games={game_ids}, mode={args.mode}, data_repo={data_repo}")
 
-    results: List[dict] = []
-    for gid in game_ids:
-        if gid not in GAMES:
-            LOGGER.warning(f"Unknown game id: {gid} (skipping)")
-            continue
-        try:
-            r = ingest_game(data_repo, gid)
-            LOGGER.info(f"Ingested {gid}: fetched={r['fetched']} added={r['added']} last={r['last_draw_date']}")
-            results.append(r)
-        except Exception as e:
-            LOGGER.exception(f"Failed ingest for {gid}: {e}")
+    http_cache = None
+    if not args.no_http_cache:
+        cache_dir = Path(args.http_cache_dir) if args.http_cache_dir else data_repo / "datasets/_meta/http_cache"
+        http_cache = HttpCache(cache_dir.resolve())
+
+    raw_store = None if args.no_raw_store else RawPageStore(raw_store_dir(data_repo, args.raw_store_dir))
+
+    results = ingest_games(
+        data_repo,
+        game_ids,
+        workers=args.workers or len(game_ids),
+        per_host=args.per_host,
+        delay=args.delay,
+        http_cache=http_cache,
+        # Full mode always re-parses, but still refreshes the cached validators.
+        conditional=args.mode == "incremental",
+        mode=args.mode,
+        raw_store=raw_store,
+    )
 
     update_coverage(data_repo, results)
+
+    if not args.no_compact:
+        from etl.columnar import compact_game
+
+        for r in results:
+            if r["added"]:
+                # The NDJSON files are already written; a stale Parquet copy is rebuilt next run
+                try:
+                    compact_game(data_repo, r["game_id"])
+                except Exception as e:
+                    LOGGER.warning(f"{r['game_id']}: Parquet compaction failed: {e}")
+
     LOGGER.info("Ingestion complete")
 
 
@@ -0,0 +1,45 @@
+"""Synthetic Pais archive pages for parser tests and benchmarks."""
+
+from __future__ import annotations
+
+import random
+from datetime import date, timedelta
+
+# parse_pais_archive_html keyword arguments for the lotto archive
+LOTTO_ARGS = {
+    "game_id": "pais_lotto",
+    "source_url": "https://www.pais.co.il/lotto/archive.aspx",
+    "numbers_count": 6,
+    "bonus_count": 1,
+    "min_num": 1,
+    "max_num": 37,
+}
+
+
+def make_archive_page(n_rows: int, seed: int = 42, newest_first: bool = True) -> str:
+    """Seeded archive page shaped like the Pais lotto archive table.
+
+    Draw ids start at 1000 and dates at 1990-01-02, three or four days
+    apart. Rows are listed newest first, like the real archive, unless
+    ``newest_first`` is false.
+    """
+    rng = random.Random(seed)
+    day = date(1990, 1, 2)
+    rows = []
+    for draw_id in range(1000, 1000 + n_rows):
+        numbers = sorted(rng.sample(range(1, 38), 6))
+        cells = "".join(f'<td class="num">{n}</td>' for n in numbers)
+        rows.append(
+            f'<tr class="archive_row"><td><a href="/lotto/draw.aspx?id={draw_id}">{draw_id}</a></td>'
+            f'<td><span>{day.strftime("%d/%m/%Y")}</span></td>{cells}'
+            f'<td class="strong">{rng.randint(1, 7)}</td><!-- row --></tr>'
+        )
+        day += timedelta(days=rng.choice((3, 4)))
+    if newest_first:
+        rows.reverse()
+    return (
+        "<!DOCTYPE html><html><head><title>ארכיון לוטו</title>"
+        '<script>var x = "<tr><td>01/01/2000</td></tr>";</script></head><body>'
+        '<table class="archive"><thead><tr><th>הגרלה</th><th>תאריך</th><th>מספרים</th></tr></thead>'
+        f'<tbody>{"".join(rows)}</tbody></table></body></html>'
+    )
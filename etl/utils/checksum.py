@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, Optional
+
+
+def _iso(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day).isoformat()
+    try:
+        return datetime.fromisoformat(str(value)).isoformat()
+    except ValueError:
+        return str(value)
+
+
+def draw_checksum(draw_id: Any, draw_date: Any, numbers: Iterable[int],
+                  bonus_numbers: Optional[Iterable[int]] = None) -> str:
+    """Content checksum of a draw (the BaseConnector.calculate_checksum scheme).
+
+    ``draw_date`` may be a datetime, a date or an ISO string; dates are
+    normalized to midnight datetimes so archive records, connector draws and
+    database rows of the same draw hash identically.
+    """
+    data = f"{draw_id}|{_iso(draw_date)}|{sorted(numbers)}"
+    if bonus_numbers:
+        data += f"|{sorted(bonus_numbers)}"
+    return hashlib.sha256(data.encode()).hexdigest()[:16]
+
+
+def results_checksum(draw_number: Any, draw_date: Any, results: Any) -> str:
+    """Checksum for a database draw's ``results`` payload.
+
+    Number draws (``{'main_numbers', 'bonus_numbers'}`` or a plain list) use
+    ``draw_checksum``; other result shapes hash their canonical JSON.
+    """
+    if isinstance(results, dict) and isinstance(results.get("main_numbers"), list):
+        return draw_checksum(draw_number, draw_date, results["main_numbers"], results.get("bonus_numbers"))
+    if isinstance(results, list) and all(isinstance(x, int) for x in results):
+        return draw_checksum(draw_number, draw_date, results)
+    data = f"{draw_number}|{_iso(draw_date)}|{json.dumps(results, sort_keys=True)}"
+    return hashlib.sha256(data.encode()).hexdigest()[:16]
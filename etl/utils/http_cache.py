@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from etl.utils.jsonio import dump_json, load_json
+from etl.utils.ndjson import utc_now_iso
+
+
+def content_hash(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    """Validators remembered for a URL from its last successfully processed fetch."""
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_hash: str
+    fetched_at: str
+
+
+class HttpCache:
+    """On-disk store of ETag/Last-Modified and body hash per URL.
+
+    Entries are only written via ``put`` once the caller has finished
+    processing a page, so a run that fails after fetching does not cause the
+    next run to skip the page.
+    """
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = Path(cache_dir)
+
+    def _path(self, url: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]}.json"
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        data = load_json(self._path(url), default=None)
+        if not data or data.get("url") != url:
+            return None
+        return CacheEntry(**data)
+
+    def put(self, entry: CacheEntry) -> None:
+        dump_json(self._path(entry.url), asdict(entry))
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        entry = self.get(url)
+        headers: Dict[str, str] = {}
+        if entry and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def entry_for(self, url: str, headers, body: bytes) -> CacheEntry:
+        return CacheEntry(
+            url=url,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+            content_hash=content_hash(body),
+            fetched_at=utc_now_iso(),
+        )
+
+    def is_unchanged(self, url: str, body: bytes) -> bool:
+        entry = self.get(url)
+        return entry is not None and entry.content_hash == content_hash(body)
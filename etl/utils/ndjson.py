@@ -1,23 +1,131 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
 from dataclasses import asdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Set, Tuple
+
+INDEX_VERSION = 1
+TAIL_BYTES = 4096
 
 
 def ensure_dir(p: Path) -> None:
     p.mkdir(parents=True, exist_ok=True)
 
 
-def write_ndjson(path: Path, items: Iterable[dict]) -> int:
+def index_path(path: Path) -> Path:
+    """Sidecar index for a year file: ``2024.ndjson`` -> ``2024.ndjson.idx.json``."""
+    return path.with_name(path.name + ".idx.json")
+
+
+def _tail_hash(f, offset: int) -> str:
+    """Hash of the last TAIL_BYTES before ``offset`` (cheap content fingerprint)."""
+    start = max(0, offset - TAIL_BYTES)
+    f.seek(start)
+    return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+
+def _scan_ids(f, start: int) -> Tuple[Set[str], int]:
+    """Collect draw_ids from complete lines starting at ``start``; returns (ids, end offset)."""
+    ids: Set[str] = set()
+    f.seek(start)
+    offset = start
+    for line in f:
+        if not line.endswith(b"\n"):
+            break  # partial trailing line (interrupted write) - not indexed yet
+        offset += len(line)
+        if not line.strip():
+            continue
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            continue
+        if "draw_id" in obj:
+            ids.add(str(obj["draw_id"]))
+    return ids, offset
+
+
+def _write_index(path: Path, ids: Set[str], offset: int, tail_sha256: str) -> None:
+    idx = index_path(path)
+    tmp = idx.with_name(idx.name + f".{os.getpid()}.tmp")
+    tmp.write_text(
+        json.dumps(
+            {
+                "version": INDEX_VERSION,
+                "offset": offset,
+                "tail_sha256": tail_sha256,
+                "draw_ids": sorted(ids),
+            },
+            separators=(",", ":"),
+        ),
+        encoding="utf-8",
+    )
+    os.replace(tmp, idx)
+
+
+def load_draw_ids(path: Path) -> Set[str]:
+    """Return the set of draw_ids in an NDJSON year file using its sidecar index.
+
+    The index records how many bytes it covers and a hash of the bytes just
+    before that offset. If both still match, only lines appended since then
+    are scanned; otherwise (missing/corrupt index, rewritten file) the whole
+    file is rescanned and the index rebuilt.
+    """
+    if not path.exists():
+        return set()
+
+    try:
+        idx = json.loads(index_path(path).read_text(encoding="utf-8"))
+        if idx.get("version") != INDEX_VERSION or not isinstance(idx.get("offset"), int):
+            idx = None
+    except (OSError, ValueError, AttributeError):
+        idx = None
+
+    with path.open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if idx and idx["offset"] <= size and _tail_hash(f, idx["offset"]) == idx.get("tail_sha256"):
+            ids = set(idx.get("draw_ids", []))
+            if idx["offset"] == size:
+                return ids
+            new_ids, offset = _scan_ids(f, idx["offset"])
+            ids |= new_ids
+        else:
+            ids, offset = _scan_ids(f, 0)
+        tail = _tail_hash(f, offset)
+
+    _write_index(path, ids, offset, tail)
+    return ids
+
+
+def write_ndjson(path: Path, items: Iterable[dict], ids: Set[str] | None = None) -> int:
+    """Append items to an NDJSON file and update its draw_id sidecar index.
+
+    ``ids`` is the file's current draw_id set when the caller already has it
+    from ``load_draw_ids`` (it is updated in place); otherwise it is loaded
+    here. A partial last line left by an interrupted write is terminated
+    first so the new records start on a line of their own.
+    """
     ensure_dir(path.parent)
+    if ids is None:
+        ids = load_draw_ids(path)
     n = 0
-    with path.open('a', encoding='utf-8') as f:
+    with path.open("ab+") as f:
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
         for item in items:
-            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            f.write((json.dumps(item, ensure_ascii=False) + "\n").encode("utf-8"))
+            if "draw_id" in item:
+                ids.add(str(item["draw_id"]))
             n += 1
+        f.flush()
+        offset = f.tell()
+        tail = _tail_hash(f, offset)
+    _write_index(path, ids, offset, tail)
     return n
 
 
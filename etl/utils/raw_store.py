@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Iterator, Optional
+
+from etl.utils.ndjson import utc_now_iso
+
+try:
+    import zstandard
+except ImportError:  # optional; gzip is used instead
+    zstandard = None
+
+
+CODEC_SUFFIX = {"zstd": ".zst", "gzip": ".gz"}
+
+
+class RawPageStore:
+    """Content-addressed archive of fetched pages.
+
+    Bodies are stored once per SHA-256 under ``objects/<aa>/<sha>.html.<zst|gz>``
+    (zstd when the optional ``zstandard`` package is installed, gzip otherwise)
+    and every fetch is appended to ``manifest.ndjson`` with its URL, game and
+    timestamp, so history can be re-parsed offline (see ``etl.reparse``).
+    """
+
+    def __init__(self, root: Path, codec: str | None = None) -> None:
+        self.root = Path(root)
+        self.codec = codec or ("zstd" if zstandard is not None else "gzip")
+        if self.codec not in CODEC_SUFFIX:
+            raise ValueError(f"Unknown codec: {self.codec}")
+        if self.codec == "zstd" and zstandard is None:
+            raise RuntimeError("zstd codec requires the zstandard package")
+        self.manifest_path = self.root / "manifest.ndjson"
+        self._lock = threading.Lock()
+
+    def _object_path(self, sha: str, codec: str) -> Path:
+        return self.root / "objects" / sha[:2] / f"{sha}.html{CODEC_SUFFIX[codec]}"
+
+    def find(self, sha: str) -> Optional[Path]:
+        for codec in CODEC_SUFFIX:
+            path = self._object_path(sha, codec)
+            if path.exists():
+                return path
+        return None
+
+    def put(self, url: str, body: bytes, game_id: str | None = None, fetched_at: str | None = None) -> str:
+        """Store ``body`` (if new) and record the fetch in the manifest; returns its SHA-256."""
+        sha = hashlib.sha256(body).hexdigest()
+        if self.find(sha) is None:
+            path = self._object_path(sha, self.codec)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if self.codec == "zstd":
+                data = zstandard.ZstdCompressor(level=10).compress(body)
+            else:
+                data = gzip.compress(body, compresslevel=9, mtime=0)
+            tmp = path.with_name(path.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+
+        entry = {
+            "url": url,
+            "game_id": game_id,
+            "fetched_at": fetched_at or utc_now_iso(),
+            "sha256": sha,
+            "size": len(body),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with self.manifest_path.open("a", encoding="utf-8") as f:
+                f.write(line)
+        return sha
+
+    def get(self, sha: str) -> bytes:
+        path = self.find(sha)
+        if path is None:
+            raise KeyError(sha)
+        data = path.read_bytes()
+        if path.suffix == CODEC_SUFFIX["zstd"]:
+            if zstandard is None:
+                raise RuntimeError(f"{path} is zstd-compressed; install zstandard to read it")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def iter_manifest(self) -> Iterator[dict]:
+        if not self.manifest_path.exists():
+            return
+        with self.manifest_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
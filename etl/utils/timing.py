@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+# Stages recorded per ingestion run (each maps to an ingestion_runs.<stage>_seconds column)
+STAGES = ("fetch", "parse", "validate", "checksum", "load")
+
+
+class StageTimer:
+    """Accumulates per-stage wall time plus download/retry counters for one run."""
+
+    def __init__(self) -> None:
+        self.seconds: Dict[str, float] = {}
+        self.bytes_downloaded = 0
+        self.retries = 0
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.seconds.values())
+
+    def rows_per_second(self, rows: int) -> Optional[float]:
+        total = self.total_seconds
+        return rows / total if rows and total > 0 else None
+
+    def as_dict(self, rows: int = 0) -> dict:
+        """Flat dict matching the ingestion_runs timing columns."""
+        out = {f"{name}_seconds": round(self.seconds[name], 6) for name in STAGES if name in self.seconds}
+        rate = self.rows_per_second(rows)
+        out["bytes_downloaded"] = self.bytes_downloaded
+        out["retries"] = self.retries
+        out["rows_per_second"] = round(rate, 2) if rate is not None else None
+        return out
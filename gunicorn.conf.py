@@ -0,0 +1,25 @@
+"""Gunicorn configuration (gunicorn -c gunicorn.conf.py; each worker builds its app with create_app())"""
+
+import os
+import shutil
+
+# Imported here, not in child_exit: that hook runs in a SIGCHLD handler and
+# nested imports there fail when several workers exit at once
+from prometheus_client import multiprocess
+
+wsgi_app = 'app:create_app()'
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', 4))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+
+def on_starting(server):
+    """Start with an empty Prometheus multiprocess dir (stale files would skew counters)"""
+    metrics_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir, exist_ok=True)
+
+def child_exit(server, worker):
+    """Drop live gauges (in-flight requests) of exited workers"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(worker.pid)
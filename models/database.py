@@ -1,13 +1,96 @@
 """Database models and schema"""
 
+import os
 import sqlite3
 import json
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timedelta
 from contextlib import contextmanager
 import logging
+from etl.utils.checksum import results_checksum
 
 logger = logging.getLogger(__name__)
 
+# Callables listener(sql, params, seconds, connection) notified after each statement
+_query_listeners = []
+
+def add_query_listener(listener):
+    """
+    Register a callable(sql, params, seconds, connection) run after every
+    statement executed via Database (params is None for executemany)
+    """
+    if listener not in _query_listeners:
+        _query_listeners.append(listener)
+
+def remove_query_listener(listener):
+    """Unregister a query listener"""
+    if listener in _query_listeners:
+        _query_listeners.remove(listener)
+
+def _notify_query(sql, params, seconds, connection):
+    for listener in list(_query_listeners):
+        try:
+            listener(sql, params, seconds, connection)
+        except Exception as e:
+            logger.warning(f"Query listener failed: {e}")
+
+class TracingCursor(sqlite3.Cursor):
+    """Cursor that times execute/executemany for the registered query listeners"""
+
+    def execute(self, sql, parameters=()):
+        if not _query_listeners:
+            return super().execute(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _notify_query(sql, parameters, time.perf_counter() - start, self.connection)
+
+    def executemany(self, sql, seq_of_parameters):
+        if not _query_listeners:
+            return super().executemany(sql, seq_of_parameters)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _notify_query(sql, None, time.perf_counter() - start, self.connection)
+
+class TracingConnection(sqlite3.Connection):
+    """Connection whose cursors are TracingCursors"""
+
+    def cursor(self, factory=TracingCursor):
+        return super().cursor(factory)
+
+def _decode_draw(row):
+    """Convert a draws row to a dict with its JSON columns decoded"""
+    draw = dict(row)
+    for field in ('results', 'extra_data'):
+        if isinstance(draw.get(field), str):
+            draw[field] = json.loads(draw[field])
+    return draw
+
+def _decode_job(row):
+    """Convert an etl_jobs row to a dict with its JSON columns decoded"""
+    job = dict(row)
+    for field in ('progress', 'result'):
+        if isinstance(job.get(field), str):
+            job[field] = json.loads(job[field])
+    return job
+
+# Shared Database per path (see get_database)
+_databases = {}
+_databases_lock = threading.Lock()
+
+def get_database(db_path='data/lottery.db'):
+    """Shared Database for db_path; its schema is initialized once per process"""
+    key = os.path.abspath(db_path)
+    with _databases_lock:
+        db = _databases.get(key)
+        if db is None:
+            db = _databases[key] = Database(db_path)
+        return db
+
 class Database:
     """SQLite database manager"""
     
@@ -18,7 +101,7 @@ class Database:
     @contextmanager
     def get_connection(self):
         """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self.db_path, factory=TracingConnection)
         conn.row_factory = sqlite3.Row
         try:
             yield conn
@@ -63,11 +146,16 @@ class Database:
                     extra_data JSON,
                     source_url TEXT,
                     verified BOOLEAN DEFAULT 0,
+                    checksum TEXT,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (game_id) REFERENCES games(id),
                     UNIQUE(game_id, draw_number)
                 )
             ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_draws_game_date
+                ON draws(game_id, draw_date)
+            ''')
             
             # Ingestion runs table
             cursor.execute('''
@@ -79,9 +167,57 @@ class Database:
                     records_fetched INTEGER DEFAULT 0,
                     records_inserted INTEGER DEFAULT 0,
                     records_updated INTEGER DEFAULT 0,
+                    records_unchanged INTEGER DEFAULT 0,
                     errors JSON,
                     duration_seconds REAL,
-                    checksum TEXT
+                    checksum TEXT,
+                    fetch_seconds REAL,
+                    parse_seconds REAL,
+                    validate_seconds REAL,
+                    checksum_seconds REAL,
+                    load_seconds REAL,
+                    bytes_downloaded INTEGER,
+                    rows_per_second REAL,
+                    retries INTEGER DEFAULT 0
+                )
+            ''')
+            
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_ingestion_runs_date
+                ON ingestion_runs(run_date, id)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_ingestion_runs_game_date
+                ON ingestion_runs(game_id, run_date, id)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_ingestion_runs_status_date
+                ON ingestion_runs(status, run_date, id)
+            ''')
+            
+            # Daily per-game rollups of ingestion runs past retention (see rollup_ingestion_runs)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS ingestion_daily_summary (
+                    day DATE NOT NULL,
+                    game_id TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    runs INTEGER NOT NULL,
+                    records_fetched INTEGER DEFAULT 0,
+                    records_inserted INTEGER DEFAULT 0,
+                    records_updated INTEGER DEFAULT 0,
+                    records_unchanged INTEGER DEFAULT 0,
+                    total_duration_seconds REAL,
+                    max_duration_seconds REAL,
+                    fetch_seconds REAL,
+                    parse_seconds REAL,
+                    validate_seconds REAL,
+                    checksum_seconds REAL,
+                    load_seconds REAL,
+                    bytes_downloaded INTEGER,
+                    retries INTEGER DEFAULT 0,
+                    runs_with_errors INTEGER DEFAULT 0,
+                    last_error TEXT,
+                    PRIMARY KEY (day, game_id, status)
                 )
             ''')
             
@@ -129,8 +265,67 @@ class Database:
                 )
             ''')
             
+            # ETL jobs table (background runs requested through the admin API)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS etl_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    game_id TEXT NOT NULL,
+                    mode TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    requested_by TEXT,
+                    progress JSON,
+                    result JSON,
+                    error TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    started_at TIMESTAMP,
+                    heartbeat_at TIMESTAMP,
+                    finished_at TIMESTAMP
+                )
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_etl_jobs_status
+                ON etl_jobs(status, id)
+            ''')
+            
+            # NDJSON archive files already synced into draws (see scripts/sync_archive.py)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS archive_sync_files (
+                    path TEXT PRIMARY KEY,
+                    game_id TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    size INTEGER,
+                    draws INTEGER,
+                    synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Columns added after the first release (databases created earlier lack them)
+            self._add_missing_columns(cursor, 'draws', {'checksum': 'TEXT'})
+            self._add_missing_columns(cursor, 'ingestion_runs', {
+                'records_unchanged': 'INTEGER DEFAULT 0',
+                'fetch_seconds': 'REAL',
+                'parse_seconds': 'REAL',
+                'validate_seconds': 'REAL',
+                'checksum_seconds': 'REAL',
+                'load_seconds': 'REAL',
+                'bytes_downloaded': 'INTEGER',
+                'rows_per_second': 'REAL',
+                'retries': 'INTEGER DEFAULT 0'
+            })
+            self._add_missing_columns(cursor, 'etl_jobs', {'heartbeat_at': 'TIMESTAMP'})
+            
             logger.info("Database initialized successfully")
     
+    @staticmethod
+    def _add_missing_columns(cursor, table, columns):
+        """ALTER TABLE ADD COLUMN for each column not yet present"""
+        cursor.execute(f'PRAGMA table_info({table})')
+        existing = {row['name'] for row in cursor.fetchall()}
+        for name, definition in columns.items():
+            if name not in existing:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+                logger.info(f"Added column {table}.{name}")
+    
     def insert_game(self, game_data):
         """Insert or update game"""
         with self.get_connection() as conn:
@@ -152,45 +347,139 @@ class Database:
             return cursor.lastrowid
     
     def insert_draw(self, draw_data):
-        """Insert draw result (with duplicate prevention)"""
+        """
+        Insert draw result (with duplicate prevention)
+        Returns the new row id, or None if the draw already existed
+        (it is only rewritten when its checksum changed)
+        """
+        counts = self.upsert_draws([draw_data])
+        if not counts['inserted']:
+            return None
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            try:
-                cursor.execute('''
-                    INSERT INTO draws 
-                    (game_id, draw_number, draw_date, results, extra_data, source_url, verified)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    draw_data['game_id'],
-                    draw_data['draw_number'],
-                    draw_data['draw_date'],
-                    json.dumps(draw_data['results']),
-                    json.dumps(draw_data.get('extra_data', {})),
-                    draw_data.get('source_url'),
-                    draw_data.get('verified', False)
-                ))
-                return cursor.lastrowid
-            except sqlite3.IntegrityError:
-                # Already exists - update instead
-                cursor.execute('''
-                    UPDATE draws SET
-                        results = ?,
-                        extra_data = ?,
-                        source_url = ?,
-                        verified = ?
-                    WHERE game_id = ? AND draw_number = ?
-                ''', (
-                    json.dumps(draw_data['results']),
-                    json.dumps(draw_data.get('extra_data', {})),
-                    draw_data.get('source_url'),
-                    draw_data.get('verified', False),
-                    draw_data['game_id'],
-                    draw_data['draw_number']
-                ))
-                return None
+            cursor.execute(
+                'SELECT id FROM draws WHERE game_id = ? AND draw_number = ?',
+                (draw_data['game_id'], draw_data['draw_number'])
+            )
+            return cursor.fetchone()['id']
     
+    def upsert_draws(self, draws):
+        """
+        Insert or update a batch of draws in a single transaction.
+        Existing rows are only rewritten when their checksum differs (the
+        draw's 'checksum', or one computed from its results with the
+        BaseConnector.calculate_checksum scheme).
+        Returns counts of inserted/updated/unchanged draws.
+        """
+        rows = {}
+        for d in draws:
+            checksum = d.get('checksum') or results_checksum(d['draw_number'], d['draw_date'], d['results'])
+            rows[(d['game_id'], d['draw_number'])] = (
+                d['game_id'],
+                d['draw_number'],
+                d['draw_date'],
+                json.dumps(d['results']),
+                json.dumps(d.get('extra_data', {})),
+                d.get('source_url'),
+                d.get('verified', False),
+                checksum
+            )
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        if not rows:
+            return counts
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            numbers_by_game = {}
+            for game_id, draw_number in rows:
+                numbers_by_game.setdefault(game_id, []).append(draw_number)
+            existing = set()
+            for game_id, numbers in numbers_by_game.items():
+                for i in range(0, len(numbers), 500):
+                    chunk = numbers[i:i + 500]
+                    cursor.execute(
+                        f'SELECT draw_number FROM draws WHERE game_id = ? '
+                        f'AND draw_number IN ({", ".join("?" * len(chunk))})',
+                        [game_id, *chunk]
+                    )
+                    existing.update((game_id, row['draw_number']) for row in cursor.fetchall())
+
+            before = conn.total_changes
+            cursor.executemany('''
+                INSERT INTO draws
+                (game_id, draw_number, draw_date, results, extra_data, source_url, verified, checksum)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(game_id, draw_number) DO UPDATE SET
+                    draw_date = excluded.draw_date,
+                    results = excluded.results,
+                    extra_data = excluded.extra_data,
+                    source_url = excluded.source_url,
+                    verified = excluded.verified,
+                    checksum = excluded.checksum
+                WHERE draws.checksum IS NOT excluded.checksum
+            ''', list(rows.values()))
+            changed = conn.total_changes - before
+
+        counts['inserted'] = len(rows) - len(existing)
+        counts['updated'] = changed - counts['inserted']
+        counts['unchanged'] = len(rows) - changed
+        return counts
+
+    def get_archive_sync_files(self, game_id):
+        """Get {path: sha256} of archive files already synced for a game"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT path, sha256 FROM archive_sync_files WHERE game_id = ?', (game_id,))
+            return {row['path']: row['sha256'] for row in cursor.fetchall()}
+
+    def mark_archive_file_synced(self, path, game_id, sha256, size, draws):
+        """Record that an archive file was fully synced"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO archive_sync_files (path, game_id, sha256, size, draws, synced_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    game_id = excluded.game_id,
+                    sha256 = excluded.sha256,
+                    size = excluded.size,
+                    draws = excluded.draws,
+                    synced_at = excluded.synced_at
+            ''', (path, game_id, sha256, size, draws, datetime.now()))
+
+    def get_admin_user(self, username):
+        """Get an admin user row by username (None if missing)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM admin_users WHERE username = ?', (username,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
+    def create_admin_user(self, username, password_hash, email=None, role='admin'):
+        """Insert an admin user; returns False if the username already exists"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR IGNORE INTO admin_users (username, password_hash, email, role)
+                VALUES (?, ?, ?, ?)
+            ''', (username, password_hash, email, role))
+            return cursor.rowcount == 1
+
+    def count_admin_users(self):
+        """Number of admin users"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COUNT(*) FROM admin_users')
+            return cursor.fetchone()[0]
+
+    def update_admin_last_login(self, user_id):
+        """Stamp a successful login"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('UPDATE admin_users SET last_login = ? WHERE id = ?', (datetime.now(), user_id))
+
     def get_draws(self, game_id, limit=100, offset=0):
-        """Get draws for a game"""
+        """Get draws for a game (results/extra_data decoded)"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
@@ -200,24 +489,366 @@ class Database:
                 LIMIT ? OFFSET ?
             ''', (game_id, limit, offset))
             rows = cursor.fetchall()
-            return [dict(row) for row in rows]
-    
+            return [_decode_draw(row) for row in rows]
+
+    def iter_draws(self, game_id, date_from=None, date_to=None, batch_size=1000):
+        """
+        Stream draws for a game in chronological order.
+        Rows are read in keyset batches of batch_size, each with its own
+        short-lived statement, so memory use does not grow with the archive
+        and no read lock is held while the caller consumes a batch (a slow
+        export client never blocks ETL writers).
+        """
+        query = 'SELECT * FROM draws WHERE game_id = ?'
+        params = [game_id]
+        if date_from:
+            query += ' AND draw_date >= ?'
+            params.append(date_from)
+        if date_to:
+            query += ' AND draw_date <= ?'
+            params.append(date_to)
+
+        after = None
+        while True:
+            batch_query, batch_params = query, list(params)
+            if after:
+                batch_query += ' AND (draw_date, draw_number) > (?, ?)'
+                batch_params.extend(after)
+            batch_query += ' ORDER BY draw_date ASC, draw_number ASC LIMIT ?'
+            batch_params.append(batch_size)
+            with self.get_connection() as conn:
+                rows = conn.execute(batch_query, batch_params).fetchall()
+            for row in rows:
+                yield _decode_draw(row)
+            if len(rows) < batch_size:
+                break
+            after = (rows[-1]['draw_date'], rows[-1]['draw_number'])
+
     def log_ingestion_run(self, run_data):
         """Log an ingestion run"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO ingestion_runs
-                (game_id, status, records_fetched, records_inserted, records_updated, errors, duration_seconds, checksum)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                (game_id, status, records_fetched, records_inserted, records_updated, records_unchanged,
+                 errors, duration_seconds, checksum, fetch_seconds, parse_seconds, validate_seconds,
+                 checksum_seconds, load_seconds, bytes_downloaded, rows_per_second, retries)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 run_data.get('game_id'),
                 run_data['status'],
                 run_data.get('records_fetched', 0),
                 run_data.get('records_inserted', 0),
                 run_data.get('records_updated', 0),
+                run_data.get('records_unchanged', 0),
                 json.dumps(run_data.get('errors', [])),
                 run_data.get('duration_seconds'),
-                run_data.get('checksum')
+                run_data.get('checksum'),
+                run_data.get('fetch_seconds'),
+                run_data.get('parse_seconds'),
+                run_data.get('validate_seconds'),
+                run_data.get('checksum_seconds'),
+                run_data.get('load_seconds'),
+                run_data.get('bytes_downloaded'),
+                run_data.get('rows_per_second'),
+                run_data.get('retries', 0)
             ))
             return cursor.lastrowid
+
+    def get_ingestion_runs(self, game_id=None, status=None, date_from=None, date_to=None,
+                           limit=50, before=None):
+        """
+        Ingestion runs newest first, filtered by game/status/date range
+        (dates are 'YYYY-MM-DD', date_to inclusive). Keyset pagination:
+        pass the returned next cursor, a (run_date, id) pair, as before.
+        Returns (runs, next_cursor or None).
+        """
+        conditions = []
+        params = []
+        if game_id:
+            conditions.append('game_id = ?')
+            params.append(game_id)
+        if status:
+            conditions.append('status = ?')
+            params.append(status)
+        if date_from:
+            conditions.append('run_date >= ?')
+            params.append(date_from)
+        if date_to:
+            conditions.append('run_date < ?')
+            params.append((datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d'))
+        if before:
+            conditions.append('(run_date, id) < (?, ?)')
+            params.extend(before)
+        
+        query = 'SELECT * FROM ingestion_runs'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY run_date DESC, id DESC LIMIT ?'
+        params.append(limit + 1)
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            runs = [dict(row) for row in cursor.fetchall()]
+        if len(runs) <= limit:
+            return runs, None
+        runs = runs[:limit]
+        return runs, (runs[-1]['run_date'], runs[-1]['id'])
+
+    def rollup_ingestion_runs(self, older_than_days=90):
+        """
+        Fold ingestion runs from days before the retention window into
+        ingestion_daily_summary (one row per day, game and status) and delete
+        them, in one transaction. Re-running merges into existing rows.
+        """
+        cutoff = (datetime.utcnow().date() - timedelta(days=older_than_days)).isoformat()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('''
+                INSERT INTO ingestion_daily_summary
+                (day, game_id, status, runs, records_fetched, records_inserted, records_updated,
+                 records_unchanged, total_duration_seconds, max_duration_seconds, fetch_seconds,
+                 parse_seconds, validate_seconds, checksum_seconds, load_seconds, bytes_downloaded,
+                 retries, runs_with_errors, last_error)
+                SELECT date(run_date), COALESCE(game_id, ''), status, COUNT(*),
+                       SUM(records_fetched), SUM(records_inserted), SUM(records_updated),
+                       SUM(records_unchanged), SUM(duration_seconds), MAX(duration_seconds),
+                       SUM(fetch_seconds), SUM(parse_seconds), SUM(validate_seconds),
+                       SUM(checksum_seconds), SUM(load_seconds), SUM(bytes_downloaded), SUM(retries),
+                       SUM(CASE WHEN errors IS NOT NULL AND errors NOT IN ('[]', 'null') THEN 1 ELSE 0 END),
+                       (SELECT substr(e.errors, 1, 1000) FROM ingestion_runs e
+                        WHERE date(e.run_date) = date(r.run_date)
+                          AND COALESCE(e.game_id, '') = COALESCE(r.game_id, '')
+                          AND e.status = r.status AND e.run_date < ?
+                          AND e.errors IS NOT NULL AND e.errors NOT IN ('[]', 'null')
+                        ORDER BY e.run_date DESC, e.id DESC LIMIT 1)
+                FROM ingestion_runs r
+                WHERE run_date < ?
+                GROUP BY date(run_date), COALESCE(game_id, ''), status
+                ON CONFLICT(day, game_id, status) DO UPDATE SET
+                    runs = runs + excluded.runs,
+                    records_fetched = COALESCE(records_fetched, 0) + COALESCE(excluded.records_fetched, 0),
+                    records_inserted = COALESCE(records_inserted, 0) + COALESCE(excluded.records_inserted, 0),
+                    records_updated = COALESCE(records_updated, 0) + COALESCE(excluded.records_updated, 0),
+                    records_unchanged = COALESCE(records_unchanged, 0) + COALESCE(excluded.records_unchanged, 0),
+                    total_duration_seconds = COALESCE(total_duration_seconds, 0) + COALESCE(excluded.total_duration_seconds, 0),
+                    max_duration_seconds = MAX(COALESCE(max_duration_seconds, 0), COALESCE(excluded.max_duration_seconds, 0)),
+                    fetch_seconds = COALESCE(fetch_seconds, 0) + COALESCE(excluded.fetch_seconds, 0),
+                    parse_seconds = COALESCE(parse_seconds, 0) + COALESCE(excluded.parse_seconds, 0),
+                    validate_seconds = COALESCE(validate_seconds, 0) + COALESCE(excluded.validate_seconds, 0),
+                    checksum_seconds = COALESCE(checksum_seconds, 0) + COALESCE(excluded.checksum_seconds, 0),
+                    load_seconds = COALESCE(load_seconds, 0) + COALESCE(excluded.load_seconds, 0),
+                    bytes_downloaded = COALESCE(bytes_downloaded, 0) + COALESCE(excluded.bytes_downloaded, 0),
+                    retries = COALESCE(retries, 0) + COALESCE(excluded.retries, 0),
+                    runs_with_errors = runs_with_errors + excluded.runs_with_errors,
+                    last_error = COALESCE(excluded.last_error, last_error)
+            ''', (cutoff, cutoff))
+            summary_rows = cursor.rowcount
+            cursor.execute('DELETE FROM ingestion_runs WHERE run_date < ?', (cutoff,))
+            deleted = cursor.rowcount
+        if deleted:
+            logger.info(f"Rolled up {deleted} ingestion runs before {cutoff} into {summary_rows} daily summary rows")
+        return {'cutoff': cutoff, 'runs_rolled_up': deleted, 'summary_rows': summary_rows}
+
+    def get_ingestion_summary(self, game_id=None, date_from=None, date_to=None, limit=366):
+        """Daily rollup rows (newest first) for runs past retention"""
+        conditions = []
+        params = []
+        if game_id:
+            conditions.append('game_id = ?')
+            params.append(game_id)
+        if date_from:
+            conditions.append('day >= ?')
+            params.append(date_from)
+        if date_to:
+            conditions.append('day <= ?')
+            params.append(date_to)
+        query = 'SELECT * FROM ingestion_daily_summary'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY day DESC, game_id, status LIMIT ?'
+        params.append(limit)
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
+
+    def get_ingestion_trends(self, days=30, game_id=None):
+        """Per-game, per-day averages of run durations, stage timings and throughput"""
+        query = '''
+            SELECT game_id, date(run_date) AS day,
+                   COUNT(*) AS runs,
+                   SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END) AS failed_runs,
+                   AVG(duration_seconds) AS avg_duration_seconds,
+                   MAX(duration_seconds) AS max_duration_seconds,
+                   AVG(fetch_seconds) AS avg_fetch_seconds,
+                   AVG(parse_seconds) AS avg_parse_seconds,
+                   AVG(validate_seconds) AS avg_validate_seconds,
+                   AVG(checksum_seconds) AS avg_checksum_seconds,
+                   AVG(load_seconds) AS avg_load_seconds,
+                   SUM(bytes_downloaded) AS bytes_downloaded,
+                   AVG(rows_per_second) AS avg_rows_per_second,
+                   SUM(retries) AS retries
+            FROM ingestion_runs
+            WHERE run_date >= datetime('now', ?)
+        '''
+        params = [f'-{int(days)} days']
+        if game_id:
+            query += ' AND game_id = ?'
+            params.append(game_id)
+        query += ' GROUP BY game_id, day ORDER BY game_id, day'
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            trends = {}
+            for row in cursor.fetchall():
+                trends.setdefault(row['game_id'], []).append(dict(row))
+            return trends
+
+    def create_etl_job(self, game_id, mode, requested_by=None):
+        """
+        Queue an ETL job, reusing an identical pending job if one exists.
+        Returns (job_id, created).
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('''
+                SELECT id FROM etl_jobs
+                WHERE game_id = ? AND mode = ? AND status = 'pending'
+                ORDER BY id LIMIT 1
+            ''', (game_id, mode))
+            existing = cursor.fetchone()
+            if existing:
+                return existing['id'], False
+            
+            cursor.execute('''
+                INSERT INTO etl_jobs (game_id, mode, status, requested_by, progress)
+                VALUES (?, ?, 'pending', ?, ?)
+            ''', (game_id, mode, requested_by, json.dumps({})))
+            return cursor.lastrowid, True
+    
+    def claim_etl_job(self):
+        """Atomically take the oldest pending ETL job and mark it running"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('''
+                SELECT * FROM etl_jobs
+                WHERE status = 'pending'
+                ORDER BY id LIMIT 1
+            ''')
+            row = cursor.fetchone()
+            if not row:
+                return None
+            
+            started_at = datetime.now()
+            cursor.execute('''
+                UPDATE etl_jobs SET status = 'running', started_at = ?, heartbeat_at = ?
+                WHERE id = ?
+            ''', (started_at, started_at, row['id']))
+            job = _decode_job(row)
+            job['status'] = 'running'
+            job['started_at'] = job['heartbeat_at'] = str(started_at)
+            return job
+    
+    def update_etl_job(self, job_id, **fields):
+        """Update ETL job fields (progress/result are stored as JSON)"""
+        if not fields:
+            return
+        for field in ('progress', 'result'):
+            if field in fields:
+                fields[field] = json.dumps(fields[field])
+        assignments = ', '.join(f'{field} = ?' for field in fields)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f'UPDATE etl_jobs SET {assignments} WHERE id = ?',
+                (*fields.values(), job_id)
+            )
+    
+    def fail_stale_etl_jobs(self, max_age_seconds):
+        """
+        Mark jobs left 'running' by a dead worker as failed. A job is stale
+        when its worker has not sent a heartbeat for max_age_seconds, so long
+        jobs still running in another process are left alone.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE etl_jobs SET status = 'failed', error = 'interrupted', finished_at = ?
+                WHERE status = 'running' AND COALESCE(heartbeat_at, started_at) < ?
+            ''', (datetime.now(), datetime.now() - timedelta(seconds=max_age_seconds)))
+            return cursor.rowcount
+    
+    def count_pending_etl_jobs(self):
+        """Number of ETL jobs waiting for a worker"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM etl_jobs WHERE status = 'pending'")
+            return cursor.fetchone()[0]
+    
+    def get_etl_job(self, job_id):
+        """Get a single ETL job"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM etl_jobs WHERE id = ?', (job_id,))
+            row = cursor.fetchone()
+            return _decode_job(row) if row else None
+    
+    def list_etl_jobs(self, limit=50):
+        """Get most recent ETL jobs"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM etl_jobs ORDER BY id DESC LIMIT ?', (limit,))
+            return [_decode_job(row) for row in cursor.fetchall()]
+
+    def get_etl_schedules(self):
+        """Get the current schedule row per game (latest update wins)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT * FROM etl_schedules
+                WHERE id IN (SELECT MAX(id) FROM etl_schedules GROUP BY game_id)
+                ORDER BY game_id
+            ''')
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def upsert_etl_schedule(self, game_id, cron_expression, is_enabled=True, schedule_type='cron'):
+        """Create or update the schedule for a game"""
+        now = datetime.now()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE etl_schedules
+                SET schedule_type = ?, cron_expression = ?, is_enabled = ?, updated_at = ?
+                WHERE game_id = ?
+            ''', (schedule_type, cron_expression, is_enabled, now, game_id))
+            if cursor.rowcount == 0:
+                cursor.execute('''
+                    INSERT INTO etl_schedules
+                    (game_id, schedule_type, cron_expression, is_enabled, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (game_id, schedule_type, cron_expression, is_enabled, now))
+    
+    def ensure_etl_schedule(self, game_id):
+        """Create a default schedule row (no cron expression) if the game has none"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO etl_schedules (game_id, schedule_type, cron_expression, is_enabled)
+                SELECT ?, 'default', NULL, 1
+                WHERE NOT EXISTS (SELECT 1 FROM etl_schedules WHERE game_id = ?)
+            ''', (game_id, game_id))
+    
+    def update_schedule_runs(self, game_id, last_run=None, next_run=None):
+        """Record last/next run times for a game's schedule"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if last_run is not None:
+                cursor.execute('UPDATE etl_schedules SET last_run = ? WHERE game_id = ?', (last_run, game_id))
+            cursor.execute('UPDATE etl_schedules SET next_run = ? WHERE game_id = ?', (next_run, game_id))
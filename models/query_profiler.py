@@ -0,0 +1,144 @@
+"""SQL query profiler: per-fingerprint timings and query plans of slow statements"""
+
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+import logging
+
+logger = logging.getLogger(__name__)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+def fingerprint(sql):
+    """Normalize a statement so queries differing only in literals/IN-list length group together"""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('(?+)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+class _QueryStats:
+    """Aggregates for one fingerprint"""
+
+    def __init__(self, sql, max_samples):
+        self.sql = sql
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=max_samples)
+        self.slow_count = 0
+        self.plan = None
+        self.plan_captured_at = None
+
+class QueryProfiler:
+    """
+    Database query listener (see models.database.add_query_listener).
+    Keeps count/total/max and recent-sample percentiles per statement
+    fingerprint, and captures EXPLAIN QUERY PLAN the first time a
+    fingerprint exceeds slow_ms (refreshed at most every plan_refresh
+    seconds). Statistics are per process.
+    """
+
+    def __init__(self, slow_ms=50, max_samples=500, max_fingerprints=1000, plan_refresh=300):
+        self.slow_seconds = slow_ms / 1000.0
+        self.max_samples = max_samples
+        self.max_fingerprints = max_fingerprints
+        self.plan_refresh = plan_refresh
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.started_at = time.time()
+
+    def __call__(self, sql, params, seconds, connection=None):
+        key = fingerprint(sql)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    return
+                stats = self._stats[key] = _QueryStats(sql.strip(), self.max_samples)
+            stats.count += 1
+            stats.total += seconds
+            stats.max = max(stats.max, seconds)
+            stats.samples.append(seconds)
+            slow = seconds >= self.slow_seconds
+            if slow:
+                stats.slow_count += 1
+            need_plan = slow and connection is not None and (
+                stats.plan_captured_at is None or time.time() - stats.plan_captured_at > self.plan_refresh
+            )
+            if need_plan:
+                stats.plan_captured_at = time.time()
+
+        if slow:
+            logger.warning(f"Slow query ({seconds * 1000:.1f} ms): {key}")
+        if need_plan:
+            plan = self._explain(connection, sql, params)
+            with self._lock:
+                stats.plan = plan
+
+    @staticmethod
+    def _explain(connection, sql, params):
+        """EXPLAIN QUERY PLAN on the same connection (plain cursor, so it is not profiled itself)"""
+        if not sql.lstrip().upper().startswith(('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'REPLACE')):
+            return None
+        if params is None:
+            params = [None] * sql.count('?')
+        try:
+            cursor = connection.cursor(sqlite3.Cursor)
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[3] for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            return [f'unavailable: {e}']
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self.started_at = time.time()
+
+    def top(self, limit=20, sort='total'):
+        """Fingerprints ordered by total (default), mean, max or count"""
+        with self._lock:
+            rows = []
+            for key, s in self._stats.items():
+                samples = sorted(s.samples)
+                plan = s.plan or []
+                rows.append({
+                    'fingerprint': key,
+                    'sample_sql': s.sql,
+                    'count': s.count,
+                    'total_ms': round(s.total * 1000, 3),
+                    'mean_ms': round(s.total / s.count * 1000, 3),
+                    'p50_ms': round(_percentile(samples, 50) * 1000, 3),
+                    'p95_ms': round(_percentile(samples, 95) * 1000, 3),
+                    'p99_ms': round(_percentile(samples, 99) * 1000, 3),
+                    'max_ms': round(s.max * 1000, 3),
+                    'slow_count': s.slow_count,
+                    'plan': s.plan,
+                    'full_scan': any(
+                        step.startswith('SCAN') and 'COVERING INDEX' not in step for step in plan
+                    )
+                })
+        key_name = {'total': 'total_ms', 'mean': 'mean_ms', 'max': 'max_ms', 'count': 'count'}[sort]
+        rows.sort(key=lambda r: r[key_name], reverse=True)
+        return rows[:limit]
+
+profiler = None
+
+def install_profiler(slow_ms=50):
+    """Create the process-wide profiler and register it as a query listener"""
+    global profiler
+    from models.database import add_query_listener
+    if profiler is None:
+        profiler = QueryProfiler(slow_ms=slow_ms)
+        add_query_listener(profiler)
+    return profiler
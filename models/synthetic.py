@@ -0,0 +1,94 @@
+"""
+Seeded synthetic draw histories for every rule set in GAMES_REGISTRY
+
+Draws are dated from the game's start_date at its frequency and returned
+newest first, shaped like Database.get_draws rows, so they can be fed to
+the analytics engines or to Database.insert_draw unchanged:
+
+    lottery (6 of 1-37 + bonus)   results = {'main_numbers': [...], 'bonus_numbers': [...]}
+    digit games (777 / 123)       results = {'main_numbers': [digits, repeats allowed]}
+    sports_betting (1X2 rounds)   results = {'outcomes': ['1', 'X', '2', ...]}
+    horse_racing                  results = {'race_winners': [...]}
+"""
+
+import random
+from datetime import date, timedelta
+
+from models.games import GAMES_REGISTRY, get_game
+
+# Gaps (in days) between consecutive draws, cycled per frequency
+FREQUENCY_GAPS = {
+    'daily': (1,),
+    'twice_weekly': (3, 4),
+    'weekly': (7,),
+    'special': (14, 21, 28),
+}
+
+# Horses per race when generating horse_racing results
+HORSES_PER_RACE = 12
+
+def draw_dates(game, n_draws):
+    """First n_draws dates from the game's start_date at its frequency"""
+    gaps = FREQUENCY_GAPS.get(game.get('frequency'), (7,))
+    day = date.fromisoformat(game['start_date'])
+    dates = []
+    for i in range(n_draws):
+        dates.append(day)
+        day += timedelta(days=gaps[i % len(gaps)])
+    return dates
+
+def draws_for_years(game, years):
+    """Number of draws a game produces in the given number of years"""
+    gaps = FREQUENCY_GAPS.get(game.get('frequency'), (7,))
+    return int(years * 365.25 * len(gaps) / sum(gaps))
+
+def make_results(game, rng):
+    """One draw's results following the game's rules"""
+    rules = game['rules']
+    game_type = game.get('game_type')
+
+    if game_type == 'sports_betting':
+        return {'outcomes': [rng.choice(rules['outcomes']) for _ in range(rules['matches'])]}
+    if game_type == 'horse_racing':
+        return {'race_winners': [rng.randint(1, HORSES_PER_RACE) for _ in range(rules['races'])]}
+
+    min_num, max_num = rules['main_range']
+    if rules.get('digit_game'):
+        results = {'main_numbers': [rng.randint(min_num, max_num) for _ in range(rules['main_numbers'])]}
+    else:
+        results = {'main_numbers': sorted(rng.sample(range(min_num, max_num + 1), rules['main_numbers']))}
+    if rules.get('bonus_numbers'):
+        bonus_min, bonus_max = rules['bonus_range']
+        results['bonus_numbers'] = [rng.randint(bonus_min, bonus_max) for _ in range(rules['bonus_numbers'])]
+    return results
+
+def generate_draws(game_id, n_draws=None, years=None, seed=0):
+    """
+    Synthetic draws for one game, newest first.
+    Pass n_draws, or years of history (default: 30 years). The same
+    (game_id, size, seed) always yields the same draws.
+    """
+    game = get_game(game_id)
+    if game is None:
+        raise ValueError(f"Unknown game: {game_id}")
+    if n_draws is None:
+        n_draws = draws_for_years(game, 30 if years is None else years)
+
+    rng = random.Random(f'{game_id}:{seed}')
+    draws = []
+    for i, day in enumerate(draw_dates(game, n_draws)):
+        draws.append({
+            'game_id': game_id,
+            'draw_number': i + 1,
+            'draw_date': day.isoformat(),
+            'results': make_results(game, rng),
+            'extra_data': {},
+            'source_url': None,
+            'verified': True
+        })
+    draws.reverse()
+    return draws
+
+def generate_history(years=30, seed=0, games=None):
+    """{game_id: draws} for every registry game (or the given ids)"""
+    return {game_id: generate_draws(game_id, years=years, seed=seed) for game_id in (games or GAMES_REGISTRY)}
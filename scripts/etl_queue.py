@@ -0,0 +1,116 @@
+"""Background ETL job queue backed by the etl_jobs table"""
+
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+class ETLJobQueue:
+    """
+    Runs ETL jobs on background worker threads.
+
+    Jobs are persisted in etl_jobs and claimed atomically, so several
+    gunicorn workers can share one queue without running a job twice.
+    Submitting a job identical to one that is still pending returns the
+    pending job instead of queueing another. While a job runs its worker
+    refreshes heartbeat_at every heartbeat_interval seconds; jobs whose
+    heartbeat is older than stale_after are failed when a queue starts.
+    """
+    
+    def __init__(self, db, runner=None, poll_interval=5.0, stale_after=None, heartbeat_interval=30.0):
+        self.db = db
+        self.runner = runner
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.heartbeat_interval = heartbeat_interval
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+    
+    def start(self, workers=1):
+        """Start worker threads (idempotent)"""
+        with self._lock:
+            if self._threads:
+                return
+            if self.stale_after:
+                failed = self.db.fail_stale_etl_jobs(self.stale_after)
+                if failed:
+                    logger.warning(f"Marked {failed} stale ETL job(s) as failed")
+            self._stop.clear()
+            for i in range(max(1, workers)):
+                thread = threading.Thread(target=self._work, name=f'etl-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            logger.info(f"ETL job queue started with {len(self._threads)} worker(s)")
+    
+    def resume(self, workers=1):
+        """Start workers if a previous process left jobs pending (called at app startup)"""
+        pending = self.db.count_pending_etl_jobs()
+        if pending:
+            logger.info(f"Resuming {pending} pending ETL job(s)")
+            self.start(workers)
+    
+    def stop(self, timeout=None):
+        """Stop worker threads after their current job"""
+        self._stop.set()
+        self._wakeup.set()
+        with self._lock:
+            for thread in self._threads:
+                thread.join(timeout)
+            self._threads = []
+    
+    def submit(self, game_id='all', mode='incremental', requested_by=None):
+        """Queue an ETL job and return (job, created)"""
+        job_id, created = self.db.create_etl_job(game_id, mode, requested_by)
+        if created:
+            logger.info(f"Queued ETL job {job_id} ({game_id}, {mode}) for {requested_by}")
+        self._wakeup.set()
+        return self.db.get_etl_job(job_id), created
+    
+    def _work(self):
+        while not self._stop.is_set():
+            job = self.db.claim_etl_job()
+            if job is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            self._run_job(job)
+    
+    def _heartbeat(self, job_id, done):
+        while not done.wait(self.heartbeat_interval):
+            try:
+                self.db.update_etl_job(job_id, heartbeat_at=datetime.now())
+            except Exception as e:
+                logger.warning(f"ETL job {job_id} heartbeat failed: {e}")
+    
+    def _run_job(self, job):
+        job_id = job['id']
+        progress = {}
+        
+        def on_progress(game_id, result):
+            progress[game_id] = result
+            self.db.update_etl_job(job_id, progress=progress, heartbeat_at=datetime.now())
+        
+        done = threading.Event()
+        threading.Thread(target=self._heartbeat, args=(job_id, done), name=f'etl-heartbeat-{job_id}', daemon=True).start()
+        logger.info(f"Running ETL job {job_id} ({job['game_id']}, {job['mode']})")
+        try:
+            runner = self.runner
+            if runner is None:
+                from scripts.etl_runner import run_etl as runner
+            result = runner(game_id=job['game_id'], mode=job['mode'], db=self.db, on_progress=on_progress)
+            failed = [gid for gid, r in result.items() if r.get('status') == 'failed']
+            self.db.update_etl_job(
+                job_id,
+                status='failed' if failed else 'success',
+                result=result,
+                error=f"Failed games: {', '.join(failed)}" if failed else None,
+                finished_at=datetime.now()
+            )
+        except Exception as e:
+            logger.error(f"ETL job {job_id} failed: {e}")
+            self.db.update_etl_job(job_id, status='failed', error=str(e), finished_at=datetime.now())
+        finally:
+            done.set()
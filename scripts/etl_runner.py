@@ -6,6 +6,8 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import argparse
+from config import Config
+from etl.orchestrator import HostThrottle, run_concurrently
 from models.database import Database
 from models.games import get_game, get_all_games
 from etl.pais import LottoETL, ChanceETL, Pais777ETL, Pais123ETL
@@ -26,9 +28,20 @@ ETL_CLASSES = {
     'winner_horses': WinnerHorsesETL,
 }
 
-def run_etl(game_id='all', mode='incremental'):
-    """Run ETL for specified game(s)"""
-    db = Database()
+def run_etl(game_id='all', mode='incremental', db=None, on_progress=None,
+            workers=None, per_host=None, delay=None):
+    """
+    Run ETL for specified game(s)
+    Games are fetched and parsed concurrently (up to `workers` at a time,
+    `per_host` per site, `delay` seconds apart); database writes stay serial.
+    on_progress(game_id, result) is called when a game starts and finishes
+    """
+    db = db or Database()
+    workers = workers or Config.ETL_CONCURRENCY
+    throttle = HostThrottle(
+        max_per_host=per_host or Config.ETL_PER_HOST_CONCURRENCY,
+        delay=Config.ETL_POLITENESS_DELAY if delay is None else delay
+    )
     results = {}
     
     if game_id == 'all':
@@ -37,6 +50,7 @@ def run_etl(game_id='all', mode='incremental'):
     else:
         game_ids = [game_id]
     
+    etls = {}
     for gid in game_ids:
         game = get_game(gid)
         if not game:
@@ -47,29 +61,50 @@ def run_etl(game_id='all', mode='incremental'):
         if not etl_class:
             logger.warning(f"No ETL implementation for {gid}")
             results[gid] = {'status': 'not_implemented'}
+            if on_progress:
+                on_progress(gid, results[gid])
             continue
         
         logger.info(f"Running ETL for {game['name']}")
         etl = etl_class(game, db)
-        result = etl.run(mode=mode)
+        etl.throttle = throttle
+        etls[gid] = etl
+        if on_progress:
+            on_progress(gid, {'status': 'running'})
+    
+    def load(gid, extracted):
+        result = etls[gid].run(mode=mode, extracted=extracted.result)
         results[gid] = result
+        if on_progress:
+            on_progress(gid, result)
+        return result
+    
+    run_concurrently(etls, lambda gid: etls[gid].extract(mode=mode), load, max_workers=workers)
     
-    return results
+    return {gid: results[gid] for gid in game_ids if gid in results}
 
 def main():
     parser = argparse.ArgumentParser(description='Run lottery ETL')
     parser.add_argument('--game', default='all', help='Game ID or "all"')
     parser.add_argument('--mode', default='incremental', choices=['full', 'incremental'])
+    parser.add_argument('--workers', type=int, default=Config.ETL_CONCURRENCY,
+                        help='Games fetched/parsed concurrently')
+    parser.add_argument('--per-host', type=int, default=Config.ETL_PER_HOST_CONCURRENCY,
+                        help='Max concurrent requests per host')
+    parser.add_argument('--delay', type=float, default=Config.ETL_POLITENESS_DELAY,
+                        help='Min seconds between requests to the same host')
     
     args = parser.parse_args()
     
-    results = run_etl(game_id=args.game, mode=args.mode)
+    results = run_etl(game_id=args.game, mode=args.mode, workers=args.workers,
+                      per_host=args.per_host, delay=args.delay)
     
     logger.info("ETL Results:")
     for game_id, result in results.items():
         logger.info(f"  {game_id}: {result['status']} - "
                    f"Inserted: {result.get('records_inserted', 0)}, "
-                   f"Updated: {result.get('records_updated', 0)}")
+                   f"Updated: {result.get('records_updated', 0)}, "
+                   f"Unchanged: {result.get('records_unchanged', 0)}")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""Roll ingestion runs past the retention window into daily per-game summaries"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from config import Config
+from models.database import Database
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Roll old ingestion_runs into ingestion_daily_summary')
+    parser.add_argument('--older-than-days', type=int, default=Config.INGESTION_LOG_RETENTION_DAYS,
+                        help='Keep individual runs for this many days')
+    parser.add_argument('--db-path', default=Config.DATABASE_PATH)
+    args = parser.parse_args()
+
+    result = Database(args.db_path).rollup_ingestion_runs(older_than_days=args.older_than_days)
+    logger.info(f"Runs before {result['cutoff']}: {result['runs_rolled_up']} rolled up "
+                f"into {result['summary_rows']} daily summary rows")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""In-process ETL scheduler driven by the etl_schedules table"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+import re
+import threading
+import time
+from datetime import datetime
+
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+
+try:
+    import fcntl
+except ImportError:  # Windows - single-instance locking is unavailable
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# The scheduler running in this process, if any (used by the admin API to
+# apply schedule edits immediately)
+active_scheduler = None
+
+# crontab numbers weekdays from Sunday (0 and 7 = sun); APScheduler from Monday
+CRONTAB_WEEKDAYS = ('sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat')
+NUMERIC_WEEKDAY_RE = re.compile(r'^(\*|\d+)(?:-(\d+))?(?:/(\d+))?$')
+
+def _crontab_day_of_week(field):
+    """
+    Translate a crontab day_of_week field into APScheduler's: numbers, ranges
+    and steps are expanded to day names; names (mon-fri) pass through as is.
+    """
+    if field == '*':
+        return field
+    days = []
+    for part in field.split(','):
+        match = NUMERIC_WEEKDAY_RE.match(part)
+        if not match:
+            days.append(part)
+            continue
+        first, last, step = match.groups()
+        if first == '*':
+            first, last = 0, 6
+        else:
+            first = int(first)
+            last = int(last) if last is not None else (6 if step else first)
+        if not 0 <= first <= last <= 7:
+            raise ValueError(f"Invalid day_of_week '{part}' (expected 0-7, 0 and 7 = Sunday)")
+        for n in range(first, last + 1, int(step or 1)):
+            name = CRONTAB_WEEKDAYS[n % 7]
+            if name not in days:
+                days.append(name)
+    return ','.join(days)
+
+def build_trigger(cron_expression, jitter=None):
+    """
+    Build a CronTrigger from a 5-field crontab expression.
+    day_of_week follows crontab (0 or 7 = Sunday, 1 = Monday), not
+    APScheduler's Monday-based numbering.
+    """
+    fields = cron_expression.split()
+    if len(fields) != 5:
+        raise ValueError(f"Invalid cron expression '{cron_expression}' (expected 5 fields)")
+    minute, hour, day, month, day_of_week = fields
+    return CronTrigger(
+        minute=minute, hour=hour, day=day, month=month,
+        day_of_week=_crontab_day_of_week(day_of_week), jitter=jitter
+    )
+
+class ETLScheduler:
+    """
+    Runs per-game ETL on the cron schedules stored in etl_schedules.
+
+    Games without a schedule (or with a 'default' row) use the default cron
+    expression. At most max_concurrency games run at once; a run missed by
+    more than misfire_grace_time is skipped and several missed runs are
+    coalesced into one. Jobs live in memory, so when a game is first loaded
+    the next_run stored in etl_schedules is checked: if it passed while no
+    scheduler was running (and is within misfire_grace_time) the game's job
+    is brought forward to run now, once. With log_retention_days, ingestion runs past that age
+    are rolled into daily summaries on rollup_cron. Schedule edits are
+    picked up by reload(), which is also called every sync_interval seconds
+    so edits made through another process are applied without a restart.
+    """
+    
+    def __init__(self, db, game_ids=None, runner=None, default_cron='0 3 * * *',
+                 max_concurrency=2, misfire_grace_time=3600, jitter=120, sync_interval=60,
+                 log_retention_days=None, rollup_cron='30 4 * * *'):
+        self.db = db
+        self.game_ids = game_ids
+        self.runner = runner
+        self.default_cron = default_cron
+        self.misfire_grace_time = misfire_grace_time
+        self.jitter = jitter or None
+        self.sync_interval = sync_interval
+        self.log_retention_days = log_retention_days
+        self.rollup_cron = rollup_cron
+        self._loaded = {}
+        self._lock = threading.Lock()
+        self.scheduler = BackgroundScheduler(
+            # Schedule syncs and log rollups get their own thread so long ETL
+            # runs cannot hold up schedule reloads
+            executors={
+                'default': ThreadPoolExecutor(max_concurrency),
+                'maintenance': ThreadPoolExecutor(1)
+            },
+            job_defaults={
+                'coalesce': True,
+                'max_instances': 1,
+                'misfire_grace_time': misfire_grace_time
+            }
+        )
+    
+    def start(self):
+        """Start the scheduler and load schedules"""
+        global active_scheduler
+        self.scheduler.start()
+        self.reload()
+        if self.sync_interval:
+            self.scheduler.add_job(
+                self.reload, 'interval', seconds=self.sync_interval,
+                id='etl:sync-schedules', executor='maintenance', replace_existing=True
+            )
+        if self.log_retention_days:
+            self.scheduler.add_job(
+                self._rollup_logs, build_trigger(self.rollup_cron),
+                id='maintenance:rollup-ingestion-runs', executor='maintenance', replace_existing=True
+            )
+        active_scheduler = self
+        logger.info(f"ETL scheduler started with {len(self._loaded)} game schedule(s)")
+    
+    def shutdown(self, wait=True):
+        """Stop the scheduler"""
+        global active_scheduler
+        self.scheduler.shutdown(wait=wait)
+        if active_scheduler is self:
+            active_scheduler = None
+    
+    def _game_ids(self):
+        if self.game_ids is not None:
+            return list(self.game_ids)
+        from scripts.etl_runner import ETL_CLASSES
+        return list(ETL_CLASSES)
+    
+    def reload(self):
+        """Sync scheduled jobs with etl_schedules"""
+        with self._lock:
+            for game_id in self._game_ids():
+                self.db.ensure_etl_schedule(game_id)
+            
+            wanted = {}
+            schedules = {}
+            for schedule in self.db.get_etl_schedules():
+                if schedule['is_enabled']:
+                    wanted[schedule['game_id']] = schedule['cron_expression'] or self.default_cron
+                    schedules[schedule['game_id']] = schedule
+            
+            for game_id in set(self._loaded) - set(wanted):
+                self.scheduler.remove_job(f'etl:{game_id}')
+                self.db.update_schedule_runs(game_id, next_run=None)
+                del self._loaded[game_id]
+                logger.info(f"Unscheduled ETL for {game_id}")
+            
+            for game_id, cron_expression in wanted.items():
+                if self._loaded.get(game_id) == cron_expression:
+                    continue
+                try:
+                    trigger = build_trigger(cron_expression, jitter=self.jitter)
+                except ValueError as e:
+                    logger.error(f"Bad schedule for {game_id}: {e}")
+                    continue
+                missed = None if game_id in self._loaded else self._missed_run(schedules[game_id])
+                job = self.scheduler.add_job(
+                    self._run_game, trigger, args=[game_id],
+                    id=f'etl:{game_id}', name=f'ETL {game_id}', replace_existing=True
+                )
+                if missed:
+                    # Pull the regular job forward rather than adding a second one, so
+                    # max_instances=1 keeps the catch-up and the next cron fire apart
+                    logger.info(f"Catching up ETL for {game_id} (run due at {missed} was missed)")
+                    job = job.modify(next_run_time=datetime.now().astimezone())
+                self._loaded[game_id] = cron_expression
+                self.db.update_schedule_runs(game_id, next_run=getattr(job, 'next_run_time', None))
+                logger.info(f"Scheduled ETL for {game_id}: '{cron_expression}'")
+    
+    def _missed_run(self, schedule):
+        """The stored next_run if it passed without a run and within the grace time, else None"""
+        next_run = _as_local(schedule.get('next_run'))
+        now = datetime.now().astimezone()
+        if next_run is None or next_run > now:
+            return None
+        last_run = _as_local(schedule.get('last_run'))
+        if last_run is not None and last_run >= next_run:
+            return None
+        if self.misfire_grace_time is not None and (now - next_run).total_seconds() > self.misfire_grace_time:
+            logger.warning(f"Skipping missed ETL for {schedule['game_id']} due at {next_run} (past the grace time)")
+            return None
+        return next_run
+
+    def _run_game(self, game_id):
+        started = datetime.now()
+        job = self.scheduler.get_job(f'etl:{game_id}')
+        self.db.update_schedule_runs(game_id, last_run=started, next_run=job.next_run_time if job else None)
+        
+        runner = self.runner
+        if runner is None:
+            from scripts.etl_runner import run_etl as runner
+        try:
+            runner(game_id=game_id, mode='incremental', db=self.db)
+        except Exception as e:
+            logger.error(f"Scheduled ETL for {game_id} failed: {e}")
+
+    def _rollup_logs(self):
+        try:
+            self.db.rollup_ingestion_runs(older_than_days=self.log_retention_days)
+        except Exception as e:
+            logger.error(f"Ingestion log rollup failed: {e}")
+
+def _as_local(value):
+    """etl_schedules timestamp (aware next_run or naive local last_run) as an aware datetime"""
+    if not value:
+        return None
+    try:
+        value = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    return value.astimezone()
+
+def acquire_scheduler_lock(path):
+    """
+    Take an exclusive, non-blocking lock so only one process (e.g. one
+    gunicorn worker) runs the scheduler. Returns the open lock file, or
+    None if another process holds it.
+    """
+    if fcntl is None:
+        return open(path, 'a')
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    lock_file = open(path, 'a')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+def create_scheduler(db, app_config):
+    """Build an ETLScheduler from Flask/Config settings"""
+    return ETLScheduler(
+        db,
+        default_cron=app_config['ETL_SCHEDULE_CRON'],
+        max_concurrency=app_config['ETL_SCHEDULER_MAX_CONCURRENCY'],
+        misfire_grace_time=app_config['ETL_SCHEDULER_MISFIRE_GRACE'],
+        jitter=app_config['ETL_SCHEDULER_JITTER'],
+        sync_interval=app_config['ETL_SCHEDULER_SYNC_INTERVAL'],
+        log_retention_days=app_config['INGESTION_LOG_RETENTION_DAYS'],
+        rollup_cron=app_config['INGESTION_LOG_ROLLUP_CRON']
+    )
+
+def main():
+    from config import Config
+    from models.database import Database
+    
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description='Run the ETL scheduler service')
+    parser.add_argument('--lock-file', default=Config.ETL_SCHEDULER_LOCK_FILE)
+    args = parser.parse_args()
+    
+    lock = acquire_scheduler_lock(args.lock_file)
+    if lock is None:
+        logger.error(f"Another scheduler holds {args.lock_file}; exiting")
+        sys.exit(1)
+    
+    scheduler = create_scheduler(Database(), vars(Config))
+    scheduler.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except (KeyboardInterrupt, SystemExit):
+        scheduler.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Sync the NDJSON data archive (written by etl.run_ingest) into the SQLite database"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import hashlib
+import json
+import time
+from pathlib import Path
+from etl.run_ingest import GAMES as ARCHIVE_GAMES
+from models.database import Database
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Archive game id -> database game id (models/games.py)
+GAME_MAP = {
+    'pais_lotto': 'lotto',
+    'pais_chance': 'chance',
+}
+
+def file_sha256(path):
+    """SHA-256 of a file, read in chunks"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def to_draw(item, game_id):
+    """Convert an archive NDJSON record to Database draw data (None if unusable)"""
+    try:
+        draw_number = int(item['draw_id'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return {
+        'game_id': game_id,
+        'draw_number': draw_number,
+        'draw_date': item['date'],
+        'results': {
+            'main_numbers': item['numbers'],
+            'bonus_numbers': item.get('bonus') or []
+        },
+        'extra_data': item.get('metadata') or {},
+        'source_url': item.get('source'),
+        'verified': True,
+        'checksum': item.get('checksum')
+    }
+
+def iter_batches(path, game_id, batch_size):
+    """Stream a year file as batches of draws; also counts skipped records"""
+    batch = []
+    skipped = 0
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                draw = to_draw(json.loads(line), game_id)
+            except ValueError:
+                draw = None
+            if draw is None:
+                skipped += 1
+                continue
+            batch.append(draw)
+            if len(batch) >= batch_size:
+                yield batch, skipped
+                batch, skipped = [], 0
+    if batch or skipped:
+        yield batch, skipped
+
+def sync_game(data_repo, archive_game_id, db, batch_size=500, force=False):
+    """
+    Upsert one game's year files into the database.
+    Files whose SHA-256 matches the last sync are skipped entirely; within
+    changed files only draws whose checksum differs are written.
+    """
+    start_time = time.time()
+    game_id = GAME_MAP[archive_game_id]
+    data_repo = Path(data_repo)
+    base = data_repo / ARCHIVE_GAMES[archive_game_id]['data_subdir']
+    synced = {} if force else db.get_archive_sync_files(game_id)
+
+    result = {'game_id': game_id, 'files': 0, 'files_skipped': 0, 'records_fetched': 0,
+              'records_inserted': 0, 'records_updated': 0, 'records_unchanged': 0, 'records_skipped': 0}
+
+    for path in sorted(base.glob('[0-9][0-9][0-9][0-9].ndjson')):
+        rel = path.relative_to(data_repo).as_posix()
+        sha = file_sha256(path)
+        if synced.get(rel) == sha:
+            result['files_skipped'] += 1
+            continue
+
+        draws = 0
+        for batch, skipped in iter_batches(path, game_id, batch_size):
+            counts = db.upsert_draws(batch)
+            draws += len(batch)
+            result['records_skipped'] += skipped
+            result['records_inserted'] += counts['inserted']
+            result['records_updated'] += counts['updated']
+            result['records_unchanged'] += counts['unchanged']
+        result['records_fetched'] += draws
+        result['files'] += 1
+        db.mark_archive_file_synced(rel, game_id, sha, path.stat().st_size, draws)
+
+    db.log_ingestion_run({
+        'game_id': game_id,
+        'status': 'success',
+        'records_fetched': result['records_fetched'],
+        'records_inserted': result['records_inserted'],
+        'records_updated': result['records_updated'],
+        'records_unchanged': result['records_unchanged'],
+        'duration_seconds': time.time() - start_time
+    })
+    logger.info(
+        f"Synced {archive_game_id} -> {game_id}: {result['files']} files "
+        f"({result['files_skipped']} unchanged), {result['records_inserted']} inserted, "
+        f"{result['records_updated']} updated"
+    )
+    return result
+
+def sync_archive(data_repo, games='all', db=None, batch_size=500, force=False):
+    """Sync the given archive games (or 'all') and return per-game results"""
+    db = db or Database()
+    game_ids = list(GAME_MAP) if games == 'all' else [g.strip() for g in games.split(',') if g.strip()]
+
+    results = {}
+    for archive_game_id in game_ids:
+        if archive_game_id not in GAME_MAP:
+            logger.warning(f"No database game mapped for {archive_game_id} (skipping)")
+            continue
+        try:
+            results[archive_game_id] = sync_game(data_repo, archive_game_id, db, batch_size, force)
+        except Exception as e:
+            logger.error(f"Sync failed for {archive_game_id}: {e}")
+            db.log_ingestion_run({'game_id': GAME_MAP[archive_game_id], 'status': 'failed', 'errors': [str(e)]})
+            results[archive_game_id] = {'status': 'failed', 'error': str(e)}
+    return results
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Sync the NDJSON data archive into the database')
+    parser.add_argument('--data-repo-path', required=True, help='Path to checked-out lottery-data-archive repo')
+    parser.add_argument('--games', default='all', help="Comma-separated archive game ids or 'all'")
+    parser.add_argument('--batch-size', type=int, default=500, help='Draws per upsert transaction')
+    parser.add_argument('--force', action='store_true', help='Re-read files even if their checksum is unchanged')
+
+    args = parser.parse_args()
+    if args.games != 'all':
+        unknown = [g.strip() for g in args.games.split(',') if g.strip() and g.strip() not in GAME_MAP]
+        if unknown:
+            parser.error(f"unknown game id(s): {', '.join(unknown)} (known: {', '.join(GAME_MAP)})")
+
+    results = sync_archive(args.data_repo_path, args.games, batch_size=args.batch_size, force=args.force)
+
+    logger.info("Sync Results:")
+    for game_id, result in results.items():
+        logger.info(f"  {game_id}: {result}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""DB-backed admin login and bounded password verification tests"""
+
+import threading
+
+import pytest
+from api import auth
+from api.auth import DUMMY_HASH, PasswordVerifier, VerifierBusy, hash_password, verify_password
+from app import create_app
+
+@pytest.fixture
+def auth_app(tmp_path):
+    app = create_app(overrides={
+        'DATABASE_PATH': str(tmp_path / 'auth.db'),
+        'ADMIN_USERNAME': 'root',
+        'ADMIN_PASSWORD': 's3cret-pass',
+        'METRICS_ENABLED': False
+    })
+    yield app
+    app.extensions['password_verifier'].shutdown()
+
+def _login(client, username, password):
+    return client.post('/api/admin/login', json={'username': username, 'password': password})
+
+def test_verify_password():
+    """Test PBKDF2 hashes verify and malformed/dummy hashes never match"""
+    stored = hash_password('hunter2')
+    assert verify_password('hunter2', stored)
+    assert not verify_password('hunter3', stored)
+    assert not verify_password('hunter2', 'not-a-hash')
+    assert not verify_password('hunter2', None)
+    assert not verify_password('', DUMMY_HASH)
+
+def test_login_uses_seeded_admin_users(auth_app):
+    """Test the config admin is seeded once, logins check admin_users and stamp last_login"""
+    db = auth_app.extensions['lottery_db']
+    user = db.get_admin_user('root')
+    assert user['password_hash'] != 's3cret-pass' and user['last_login'] is None
+
+    with auth_app.test_client() as client:
+        response = _login(client, 'root', 's3cret-pass')
+        assert response.status_code == 200 and response.get_json()['access_token']
+        assert _login(client, 'root', 'wrong').status_code == 401
+        assert _login(client, 'nobody', 's3cret-pass').status_code == 401
+        assert client.post('/api/admin/login', json={}).status_code == 400
+
+        db.create_admin_user('ops', hash_password('ops-pass'))
+        assert _login(client, 'ops', 'ops-pass').status_code == 200
+        with db.get_connection() as conn:
+            conn.execute("UPDATE admin_users SET is_active = 0 WHERE username = 'ops'")
+        assert _login(client, 'ops', 'ops-pass').status_code == 401
+
+    assert db.get_admin_user('root')['last_login'] is not None
+    assert db.count_admin_users() == 2
+
+def test_verifier_rejects_when_saturated(monkeypatch, auth_app):
+    """Test a full hashing pool fails fast (503 on login) instead of queueing without bound"""
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow_verify(password, stored_hash):
+        started.set()
+        release.wait(5)
+        return False
+
+    monkeypatch.setattr(auth, 'verify_password', slow_verify)
+    verifier = PasswordVerifier(workers=1, max_pending=0, timeout=5)
+    auth_app.extensions['password_verifier'] = verifier
+    holder = threading.Thread(target=verifier.verify, args=('x', DUMMY_HASH))
+    holder.start()
+    try:
+        assert started.wait(5)
+        with pytest.raises(VerifierBusy):
+            verifier.verify('y', DUMMY_HASH)
+        with auth_app.test_client() as client:
+            response = _login(client, 'root', 's3cret-pass')
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+    finally:
+        release.set()
+        holder.join()
+        verifier.shutdown()
@@ -1,11 +1,24 @@
 """API tests"""
 
+import csv
+import gzip
+import io
+import json
+import os
+import subprocess
+import sys
+
 import pytest
-from app import app
+from app import create_app
 
 @pytest.fixture
-def client():
+def app(tmp_path):
+    app = create_app(overrides={'DATABASE_PATH': str(tmp_path / 'api.db'), 'METRICS_ENABLED': False})
     app.config['TESTING'] = True
+    return app
+
+@pytest.fixture
+def client(app):
     with app.test_client() as client:
         yield client
 
@@ -30,3 +43,145 @@ def test_games_list(client):
     data = response.get_json()
     assert data['success'] is True
     assert len(data['games']) > 0
+
+@pytest.fixture
+def sample_draws(app, monkeypatch):
+    """Seed a few draws for a throwaway game id"""
+    from models.games import GAMES_REGISTRY
+    db = app.extensions['lottery_db']
+    game_id = 'test_draws'
+    monkeypatch.setitem(GAMES_REGISTRY, game_id, {'id': game_id})
+    for n, date in enumerate(['2024-01-02', '2024-01-05', '2024-01-09'], start=1):
+        db.insert_draw({
+            'game_id': game_id,
+            'draw_number': n,
+            'draw_date': date,
+            'results': {'main_numbers': [1, 2, 3, 4, 5, n + 6], 'bonus_numbers': [n]},
+        })
+    return game_id
+
+def test_export_ndjson(client, sample_draws):
+    """Test NDJSON export with a date range"""
+    response = client.get(f'/api/draws/{sample_draws}/export?format=ndjson&from=2024-01-03')
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line['draw_number'] for line in lines] == [2, 3]
+    assert lines[0]['results']['main_numbers'][-1] == 8
+
+def test_export_csv_gzip(client, sample_draws):
+    """Test gzip-compressed CSV export"""
+    response = client.get(f'/api/draws/{sample_draws}/export?format=csv',
+                          headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.get_data()).decode('utf-8'))))
+    assert [row['draw_date'] for row in rows] == ['2024-01-02', '2024-01-05', '2024-01-09']
+
+def test_export_invalid_format(client):
+    """Test export rejects unknown formats"""
+    response = client.get('/api/draws/lotto/export?format=xml')
+    assert response.status_code == 400
+
+def test_export_rejects_unknown_game_and_bad_dates(client, sample_draws):
+    """Test export 404s an unknown game and 400s malformed date bounds instead of an empty file"""
+    assert client.get('/api/draws/no_such_game/export').status_code == 404
+    response = client.get(f'/api/draws/{sample_draws}/export?from=03/01/2024')
+    assert response.status_code == 400
+    assert 'from' in response.get_json()['error']
+    assert client.get(f'/api/draws/{sample_draws}/export?to=2024-13-01').status_code == 400
+
+def test_iter_draws_holds_no_lock_between_batches(tmp_path):
+    """Test keyset batches cover every draw once and a writer can commit mid-export"""
+    from models.database import Database
+    db = Database(str(tmp_path / 'export.db'))
+    for n, date in enumerate(['2024-01-02', '2024-01-02', '2024-01-05', '2024-01-09', '2024-01-12'], start=1):
+        db.insert_draw({'game_id': 'lotto', 'draw_number': n, 'draw_date': date, 'results': [n]})
+
+    rows = db.iter_draws('lotto', batch_size=2)
+    first = next(rows)
+    with db.get_connection() as conn:
+        conn.execute('PRAGMA busy_timeout = 0')
+        conn.execute('BEGIN IMMEDIATE')
+        conn.execute("UPDATE draws SET verified = 1 WHERE game_id = 'lotto'")
+    assert [first['draw_number']] + [row['draw_number'] for row in rows] == [1, 2, 3, 4, 5]
+
+def test_draws_decoded(client, sample_draws):
+    """Test draw results are returned as JSON, not encoded strings"""
+    response = client.get(f'/api/draws/{sample_draws}?limit=1')
+    assert response.status_code == 200
+    draw = response.get_json()['draws'][0]
+    assert draw['results'] == {'main_numbers': [1, 2, 3, 4, 5, 9], 'bonus_numbers': [3]}
+
+def test_draws_compact(client, sample_draws):
+    """Test columnar draws format"""
+    response = client.get(f'/api/draws/{sample_draws}?format=compact')
+    assert response.status_code == 200
+    draws = response.get_json()['draws']
+    assert draws['draw_numbers'] == [3, 2, 1]
+    assert draws['dates'] == ['2024-01-09', '2024-01-05', '2024-01-02']
+    assert draws['numbers'][0] == [1, 2, 3, 4, 5, 9]
+    assert draws['bonus'] == [[3], [2], [1]]
+
+def test_metrics_endpoint(tmp_path):
+    """Test /metrics exposes per-route latency, status counts and DB query timing"""
+    metrics_app = create_app(overrides={'DATABASE_PATH': str(tmp_path / 'metrics.db'), 'METRICS_ENABLED': True})
+    with metrics_app.test_client() as client:
+        client.get('/api/games')
+        client.get('/api/draws/lotto')
+        response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+    body = response.get_data(as_text=True)
+    assert 'http_request_duration_seconds_bucket{blueprint="api",le="0.005",method="GET",route="/api/games"}' in body
+    assert 'http_requests_total{blueprint="api",method="GET",route="/api/draws/<game_id>",status="200"}' in body
+    assert 'db_query_duration_seconds_count{operation="SELECT"}' in body
+
+def test_metrics_off_by_default_and_token_protected(tmp_path):
+    """Test /metrics is not served unless enabled, and METRICS_TOKEN gates it"""
+    default_app = create_app(overrides={'DATABASE_PATH': str(tmp_path / 'default.db')})
+    assert default_app.test_client().get('/metrics').status_code == 404
+
+    guarded = create_app(overrides={'DATABASE_PATH': str(tmp_path / 'guarded.db'),
+                                    'METRICS_ENABLED': True, 'METRICS_TOKEN': 's3cret'})
+    with guarded.test_client() as client:
+        assert client.get('/metrics').status_code == 401
+        assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+        assert client.get('/metrics', headers={'Authorization': 'Bearer s3cret'}).status_code == 200
+
+def test_metrics_aggregate_across_worker_processes(tmp_path):
+    """Test counters from separate worker processes are summed via the multiprocess dir"""
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    record = ("from api.metrics import REQUESTS; "
+              "REQUESTS.labels('GET', 'api', '/api/stats/<game_id>', '200').inc()")
+    for _ in range(2):
+        subprocess.run([sys.executable, '-c', record], env=env, check=True)
+    out = subprocess.run([sys.executable, '-c', 'from api.metrics import render_metrics; '
+                          'print(render_metrics().decode())'],
+                         env=env, check=True, capture_output=True, text=True).stdout
+    assert 'route="/api/stats/<game_id>",status="200"} 2.0' in out
+
+def test_create_app_uses_its_own_database(tmp_path):
+    """Test the factory wires the configured database into routes and initializes it once"""
+    from models.database import get_database
+    db_path = str(tmp_path / 'nested' / 'factory.db')
+    factory_app = create_app(overrides={'DATABASE_PATH': db_path, 'METRICS_ENABLED': False})
+    db = factory_app.extensions['lottery_db']
+    assert db is get_database(db_path)
+    db.insert_draw({'game_id': 'lotto', 'draw_number': 1, 'draw_date': '2024-01-02',
+                    'results': {'main_numbers': [1, 2, 3, 4, 5, 6], 'bonus_numbers': [1]}})
+    with factory_app.test_client() as client:
+        data = client.get('/api/draws/lotto/latest').get_json()
+    assert data['draw']['draw_number'] == 1
+    assert factory_app.extensions['startup_report']['total_ms'] > 0
+
+def test_app_import_is_side_effect_free_and_defers_analytics_libraries(tmp_path):
+    """Test importing the app builds nothing, and creating it does not load numpy/scipy/sklearn"""
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = (f"import sys; sys.path.insert(0, {repo!r}); import os, app; "
+            "print(sorted(os.listdir('.'))); "
+            "a = app.create_app(overrides={'DATABASE_PATH': 'lazy.db', 'METRICS_ENABLED': False}); "
+            "print(a.extensions['startup_report']['heavy_modules_loaded'], "
+            "'scipy' in sys.modules or 'sklearn' in sys.modules)")
+    out = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True,
+                         cwd=str(tmp_path), env=dict(os.environ, LOG_FILE='app.log')).stdout
+    assert out.splitlines() == ['[]', '[] False']
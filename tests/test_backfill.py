@@ -0,0 +1,98 @@
+"""Historical backfill crawler tests (against a local fixture server)"""
+
+import threading
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from etl import backfill, run_ingest
+from etl.connectors.base_connector import BaseConnector
+from etl.connectors.pais_lotto import PaisLottoConnector
+from etl.utils.ndjson import load_draw_ids
+
+def _draws_between(start, end):
+    """Deterministic fixture archive: one draw every 3 days from 2020-01-01"""
+    first = date(2020, 1, 1)
+    day = first
+    rows = []
+    while day <= end:
+        if day < start:
+            day += timedelta(days=3)
+            continue
+        draw_id = 1000 + (day - first).days // 3
+        numbers = [(draw_id + k * 5) % 37 + 1 for k in range(6)]
+        cells = ''.join(f'<td>{n}</td>' for n in numbers)
+        rows.append(f'<tr><td>{draw_id}</td><td>{day:%d/%m/%Y}</td>{cells}<td>{draw_id % 7 + 1}</td></tr>')
+        day += timedelta(days=3)
+    rows.reverse()
+    return f'<html><body><table>{"".join(rows)}</table></body></html>'
+
+class LocalLottoConnector(PaisLottoConnector):
+    """Lotto connector that accepts the local test server as official source"""
+
+    def __init__(self):
+        BaseConnector.__init__(self, game_name='pais_lotto', official_domain='127.0.0.1')
+
+@pytest.fixture
+def archive_server(monkeypatch):
+    state = {'requests': [], 'fail': set()}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            qs = parse_qs(urlsplit(self.path).query)
+            start = datetime.strptime(qs['fromDate'][0], '%d/%m/%Y').date()
+            end = datetime.strptime(qs['toDate'][0], '%d/%m/%Y').date()
+            state['requests'].append(start)
+            if start in state['fail']:
+                self.send_response(500)
+                self.end_headers()
+                return
+            body = _draws_between(start, end).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}/lotto/archive.aspx'
+    cfg = dict(run_ingest.GAMES['pais_lotto'], connector=LocalLottoConnector, source_url=url)
+    monkeypatch.setitem(run_ingest.GAMES, 'pais_lotto', cfg)
+    yield state
+    server.shutdown()
+    server.server_close()
+
+def test_make_shards_covers_range():
+    """Test shards are contiguous calendar periods clipped to the range"""
+    shards = backfill.make_shards(date(2019, 11, 15), date(2020, 3, 10), months=2)
+    assert [(s.start, s.end) for s in shards] == [
+        (date(2019, 11, 15), date(2019, 12, 31)),
+        (date(2020, 1, 1), date(2020, 2, 29)),
+        (date(2020, 3, 1), date(2020, 3, 10)),
+    ]
+
+def test_interrupted_backfill_resumes_missing_shards(tmp_path, archive_server):
+    """Test a failed shard is refetched on the next run and completed shards are not"""
+    archive_server['fail'].add(date(2020, 2, 1))
+    kwargs = dict(workers=3, per_host=3, delay=0, max_retries=1)
+
+    first = backfill.backfill_game(tmp_path, 'pais_lotto', date(2020, 1, 1), date(2020, 4, 30), **kwargs)
+    assert first['failed_shards'] == 1
+    assert sorted(archive_server['requests']) == [date(2020, m, 1) for m in (1, 2, 3, 4)]
+
+    archive_server['fail'].clear()
+    archive_server['requests'].clear()
+    second = backfill.backfill_game(tmp_path, 'pais_lotto', date(2020, 1, 1), date(2020, 4, 30), **kwargs)
+    assert archive_server['requests'] == [date(2020, 2, 1)]
+    assert second['skipped_shards'] == 3
+    assert second['failed_shards'] == 0
+
+    year_file = tmp_path / run_ingest.GAMES['pais_lotto']['data_subdir'] / '2020.ndjson'
+    expected = (date(2020, 4, 30) - date(2020, 1, 1)).days // 3 + 1
+    assert first['added'] + second['added'] == expected
+    assert len(load_draw_ids(year_file)) == expected
@@ -0,0 +1,68 @@
+"""Synthetic draw generator and benchmark baseline comparison tests"""
+
+from benchmarks.run_benchmarks import compare, load_baseline, run_suite, save_baseline
+from models.games import GAMES_REGISTRY
+from models.synthetic import draws_for_years, generate_draws, generate_history
+
+def test_generator_is_seeded_and_newest_first():
+    """Test the same seed reproduces the same history and a different seed does not"""
+    a = generate_draws('lotto', n_draws=50, seed=1)
+    assert a == generate_draws('lotto', n_draws=50, seed=1)
+    assert a != generate_draws('lotto', n_draws=50, seed=2)
+    assert a[0]['draw_date'] > a[-1]['draw_date']
+    assert a[-1]['draw_date'] == GAMES_REGISTRY['lotto']['start_date']
+
+def test_generator_follows_every_rule_set():
+    """Test decades of draws for every registry game respect its rules"""
+    history = generate_history(years=30)
+    assert set(history) == set(GAMES_REGISTRY)
+    for game_id, draws in history.items():
+        game = GAMES_REGISTRY[game_id]
+        rules = game['rules']
+        assert len(draws) == draws_for_years(game, 30)
+        for draw in draws[:200]:
+            results = draw['results']
+            if game['game_type'] == 'sports_betting':
+                assert len(results['outcomes']) == rules['matches']
+                assert set(results['outcomes']) <= set(rules['outcomes'])
+            elif game['game_type'] == 'horse_racing':
+                assert len(results['race_winners']) == rules['races']
+            else:
+                low, high = rules['main_range']
+                nums = results['main_numbers']
+                assert len(nums) == rules['main_numbers']
+                assert all(low <= n <= high for n in nums)
+                if not rules.get('digit_game'):
+                    assert len(set(nums)) == len(nums)
+                if rules.get('bonus_numbers'):
+                    b_low, b_high = rules['bonus_range']
+                    assert all(b_low <= n <= b_high for n in results['bonus_numbers'])
+    assert len(history['chance']) > 10000
+
+def test_suite_baseline_round_trip_flags_regressions(tmp_path):
+    """Test a small run saves a baseline and compare() flags only real slowdowns"""
+    results = run_suite(sizes=[30], cases=['statistics', 'db'], games=['lotto'], repeat=1)
+    assert set(results) == {'statistics[lotto:30]', 'db.insert_draw[lotto:30]', 'db.get_draws[lotto:30]'}
+
+    path = str(tmp_path / 'baseline.json')
+    save_baseline(path, results, repeat=1)
+    baseline = load_baseline(path)
+    assert compare(results, baseline) == []
+
+    slower = {name: dict(r, seconds=r['seconds'] * 2 + 0.01) for name, r in results.items()}
+    assert {r['case'] for r in compare(slower, baseline)} == set(results)
+    noise = {name: dict(r, seconds=r['seconds'] + 0.001) for name, r in results.items()}
+    assert compare(noise, baseline, min_delta=0.002) == []
+    assert load_baseline(str(tmp_path / 'missing.json')) is None
+
+def test_committed_baseline_covers_default_suite():
+    """Test the committed baseline has an entry for every default case and size"""
+    from benchmarks.run_benchmarks import CASES, DEFAULT_BASELINE, DEFAULT_GAMES, DEFAULT_SIZES
+    baseline = load_baseline(DEFAULT_BASELINE)
+    assert baseline is not None
+    for size in DEFAULT_SIZES:
+        for game in DEFAULT_GAMES:
+            for case in ('statistics', 'patterns', 'recommendations'):
+                assert f'{case}[{game}:{size}]' in baseline
+        assert f'parser[pais_lotto:{size}]' in baseline
+    assert {name.split('[')[0].split('.')[0] for name in baseline} == set(CASES)
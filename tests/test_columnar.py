@@ -0,0 +1,60 @@
+"""Parquet compaction and columnar reader tests"""
+
+import importlib
+from datetime import date
+
+import pytest
+import pyarrow.parquet as pq
+from etl import columnar, run_ingest
+from etl.parsers.pais_heuristic import parse_pais_archive_html
+from etl.testing import LOTTO_ARGS, make_archive_page
+
+def _ingest(tmp_path, n_rows):
+    draws = parse_pais_archive_html(make_archive_page(n_rows), **LOTTO_ARGS)
+    run_ingest.write_draws(tmp_path, 'pais_lotto', draws)
+    return draws
+
+def test_compaction_writes_typed_columns_one_row_group_per_year(tmp_path):
+    """Test the Parquet file has fixed-width number columns and a row group per year"""
+    draws = _ingest(tmp_path, 300)
+    path = columnar.compact_game(tmp_path, 'pais_lotto')
+
+    meta = pq.ParquetFile(path).metadata
+    years = {d.draw_date.year for d in draws}
+    assert meta.num_rows == 300
+    assert meta.num_row_groups == len(years)
+
+    table = columnar.read_draws(tmp_path, 'pais_lotto')
+    assert table.schema.names == ['date', 'draw_id', 'n1', 'n2', 'n3', 'n4', 'n5', 'n6', 'bonus1', 'checksum']
+    first = min(draws, key=lambda d: d.draw_date)
+    row = table.slice(0, 1).to_pylist()[0]
+    assert row['draw_id'] == first.draw_id
+    assert [row[f'n{i}'] for i in range(1, 7)] == first.numbers
+    assert row['bonus1'] == first.bonus_numbers[0]
+
+def test_date_range_read_and_up_to_date_skip(tmp_path):
+    """Test date filters return only matching draws and unchanged sources are not rewritten"""
+    draws = _ingest(tmp_path, 300)
+    path = columnar.compact_game(tmp_path, 'pais_lotto')
+    mtime = path.stat().st_mtime_ns
+    assert columnar.compact_game(tmp_path, 'pais_lotto') == path
+    assert path.stat().st_mtime_ns == mtime
+
+    lo, hi = date(1991, 1, 1), date(1991, 12, 31)
+    table = columnar.read_draws(tmp_path, 'pais_lotto', lo, hi, columns=['date', 'draw_id'])
+    expected = sorted(d.draw_id for d in draws if lo <= d.draw_date.date() <= hi)
+    assert sorted(table.column('draw_id').to_pylist()) == expected
+
+@pytest.mark.parametrize('cli', ['columnar', 'run_ingest', 'backfill', 'reparse'])
+def test_cli_rejects_unknown_game_ids(cli, tmp_path, monkeypatch, capsys):
+    """Test a mistyped --games id is a usage error in every ETL CLI, not a silent no-op"""
+    module = importlib.import_module(f'etl.{cli}')
+    argv = [cli, '--data-repo-path', str(tmp_path), '--games', 'pais_lotto,pais_lottto']
+    if cli == 'backfill':
+        argv += ['--from', '2020-01-01']
+    monkeypatch.setattr('sys.argv', argv)
+    with pytest.raises(SystemExit) as exc:
+        module.main()
+    assert exc.value.code == 2
+    assert 'pais_lottto' in capsys.readouterr().err
+    assert not [p for p in tmp_path.rglob('*') if p.is_file()]
@@ -0,0 +1,91 @@
+"""ETL job queue tests"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+from models.database import Database
+from scripts.etl_queue import ETLJobQueue
+
+def _wait_for(db, job_id, status, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = db.get_etl_job(job_id)
+        if job['status'] == status:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not reach {status}: {job}")
+
+def test_job_runs_in_background_with_progress(tmp_path):
+    """Test submit returns immediately and the worker records per-game progress"""
+    db = Database(str(tmp_path / 'test.db'))
+    release = threading.Event()
+
+    def runner(game_id, mode, db, on_progress):
+        on_progress('lotto', {'status': 'running'})
+        release.wait(5)
+        on_progress('lotto', {'status': 'success', 'records_inserted': 3})
+        return {'lotto': {'status': 'success', 'records_inserted': 3}}
+
+    queue = ETLJobQueue(db, runner=runner, poll_interval=0.05)
+    queue.start(workers=1)
+    try:
+        job, created = queue.submit('lotto', 'incremental', requested_by='admin')
+        assert created
+        job = _wait_for(db, job['id'], 'running')
+        assert job['progress'] in ({}, {'lotto': {'status': 'running'}})
+
+        release.set()
+        job = _wait_for(db, job['id'], 'success')
+        assert job['progress']['lotto']['records_inserted'] == 3
+        assert job['result'] == {'lotto': {'status': 'success', 'records_inserted': 3}}
+    finally:
+        queue.stop(timeout=5)
+
+def test_identical_pending_jobs_are_deduplicated(tmp_path):
+    """Test an identical pending job is reused instead of queued twice"""
+    db = Database(str(tmp_path / 'test.db'))
+    queue = ETLJobQueue(db)  # not started, so jobs stay pending
+
+    first, created_first = queue.submit('all', 'full')
+    second, created_second = queue.submit('all', 'full')
+    other, created_other = queue.submit('all', 'incremental')
+
+    assert created_first and not created_second and created_other
+    assert first['id'] == second['id'] != other['id']
+
+def test_pending_jobs_resume_at_startup(tmp_path):
+    """Test a job left pending by a previous process runs without a new trigger"""
+    db = Database(str(tmp_path / 'test.db'))
+    job, _ = ETLJobQueue(db).submit('lotto', 'incremental')
+
+    queue = ETLJobQueue(db, runner=lambda **kw: {'lotto': {'status': 'success'}}, poll_interval=0.05)
+    queue.resume(workers=1)
+    try:
+        _wait_for(db, job['id'], 'success')
+    finally:
+        queue.stop(timeout=5)
+
+def test_stale_sweep_spares_jobs_with_a_live_heartbeat(tmp_path):
+    """Test a long job in another worker keeps its status while it heartbeats"""
+    db = Database(str(tmp_path / 'test.db'))
+    release = threading.Event()
+    queue = ETLJobQueue(db, runner=lambda **kw: release.wait(5) and {}, poll_interval=0.05, heartbeat_interval=0.05)
+    queue.start(workers=1)
+    try:
+        job, _ = queue.submit('all', 'full')
+        _wait_for(db, job['id'], 'running')
+        time.sleep(0.5)
+        assert db.fail_stale_etl_jobs(0.3) == 0
+
+        dead, _ = ETLJobQueue(db).submit('lotto', 'full')
+        with db.get_connection() as conn:
+            an_hour_ago = datetime.now() - timedelta(hours=1)
+            conn.execute("UPDATE etl_jobs SET status = 'running', started_at = ?, heartbeat_at = ? WHERE id = ?",
+                         (an_hour_ago, an_hour_ago, dead['id']))
+        assert db.fail_stale_etl_jobs(0.3) == 1
+        assert db.get_etl_job(dead['id'])['error'] == 'interrupted'
+        assert db.get_etl_job(job['id'])['status'] == 'running'
+    finally:
+        release.set()
+        queue.stop(timeout=5)
@@ -0,0 +1,36 @@
+"""Per-stage ETL timing tests"""
+
+from etl.base import BaseETL
+from models.database import Database
+
+class FakeETL(BaseETL):
+    """ETL returning two fixed draws"""
+
+    def fetch_data(self, mode='incremental'):
+        self.timer.bytes_downloaded += 1234
+        return ['<tr>1</tr>', '<tr>2</tr>']
+
+    def parse_data(self, raw_data):
+        return [
+            {'draw_number': n, 'draw_date': f'2024-01-0{n}', 'results': {'main_numbers': [1, 2, 3, 4, 5, n + 5]}}
+            for n in (1, 2)
+        ]
+
+def test_run_records_stage_timings_and_trends(tmp_path):
+    """Test ingestion_runs stores per-stage durations and trends aggregate them per game"""
+    db = Database(str(tmp_path / 'test.db'))
+    etl = FakeETL({'id': 'lotto', 'official_source': 'https://www.pais.co.il/lotto/archive.aspx'}, db)
+    for _ in range(2):
+        result = etl.run(mode='full')
+    assert result['records_unchanged'] == 2
+
+    with db.get_connection() as conn:
+        run = dict(conn.cursor().execute('SELECT * FROM ingestion_runs ORDER BY id DESC LIMIT 1').fetchone())
+    for stage in ('fetch', 'parse', 'validate', 'checksum', 'load'):
+        assert run[f'{stage}_seconds'] >= 0
+    assert run['bytes_downloaded'] == 1234
+    assert run['rows_per_second'] > 0
+
+    trends = db.get_ingestion_trends(days=1)
+    assert trends['lotto'][0]['runs'] == 2
+    assert trends['lotto'][0]['bytes_downloaded'] == 2468
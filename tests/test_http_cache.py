@@ -0,0 +1,113 @@
+"""Conditional fetch / HTTP cache tests (against a local HTTP server)"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from etl import run_ingest
+from etl.connectors.base_connector import BaseConnector
+from etl.connectors.pais_lotto import PaisLottoConnector
+from etl.utils.http_cache import HttpCache
+
+ARCHIVE_HTML = """<html><body><table>
+<tr><th>הגרלה</th><th>תאריך</th></tr>
+<tr><td>3651</td><td>06/01/2024</td><td>3</td><td>9</td><td>14</td><td>22</td><td>30</td><td>35</td><td>5</td></tr>
+<tr><td>3650</td><td>02/01/2024</td><td>1</td><td>7</td><td>12</td><td>19</td><td>28</td><td>33</td><td>2</td></tr>
+</table></body></html>"""
+
+class LocalLottoConnector(PaisLottoConnector):
+    """Lotto connector that accepts the local test server as official source"""
+
+    def __init__(self):
+        BaseConnector.__init__(self, game_name='pais_lotto', official_domain='127.0.0.1')
+
+@pytest.fixture
+def archive_server():
+    state = {'etag': '"v1"', 'statuses': []}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            etag = state['etag']
+            if etag and self.headers.get('If-None-Match') == etag:
+                state['statuses'].append(304)
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = ARCHIVE_HTML.encode('utf-8')
+            state['statuses'].append(200)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            if etag:
+                self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state['url'] = f'http://127.0.0.1:{server.server_port}/lotto/archive.aspx'
+    yield state
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def local_lotto(monkeypatch, archive_server):
+    cfg = dict(run_ingest.GAMES['pais_lotto'], connector=LocalLottoConnector, source_url=archive_server['url'])
+    monkeypatch.setitem(run_ingest.GAMES, 'pais_lotto', cfg)
+    return archive_server
+
+def test_not_modified_skips_parse_and_write(tmp_path, local_lotto):
+    """Test the second incremental run gets a 304 and skips parse/write"""
+    cache = HttpCache(tmp_path / 'http_cache')
+
+    first = run_ingest.ingest_game(tmp_path, 'pais_lotto', http_cache=cache, conditional=True)
+    assert first['added'] == 2
+    assert first['timings']['bytes_downloaded'] == len(ARCHIVE_HTML.encode('utf-8'))
+    assert {'fetch_seconds', 'parse_seconds', 'checksum_seconds', 'load_seconds'} <= set(first['timings'])
+
+    second = run_ingest.ingest_game(tmp_path, 'pais_lotto', http_cache=cache, conditional=True)
+    assert second['unchanged'] is True
+    assert second['fetched'] == 0
+    assert local_lotto['statuses'] == [200, 304]
+
+def test_hash_match_without_validators(tmp_path, local_lotto):
+    """Test an identical body is treated as unchanged when the server sends no ETag"""
+    local_lotto['etag'] = None
+    cache = HttpCache(tmp_path / 'http_cache')
+
+    run_ingest.ingest_game(tmp_path, 'pais_lotto', http_cache=cache, conditional=True)
+    second = run_ingest.ingest_game(tmp_path, 'pais_lotto', http_cache=cache, conditional=True)
+
+    assert second.get('unchanged') is True
+    assert local_lotto['statuses'] == [200, 200]
+
+def test_cache_not_committed_when_write_fails(tmp_path, local_lotto, monkeypatch):
+    """Test a failed write does not make the next run skip the page"""
+    cache = HttpCache(tmp_path / 'http_cache')
+
+    def fail(*args, **kwargs):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(run_ingest, 'write_draws', fail)
+    with pytest.raises(OSError):
+        run_ingest.ingest_game(tmp_path, 'pais_lotto', http_cache=cache, conditional=True)
+    assert cache.get(local_lotto['url']) is None
+
+def test_compaction_failure_does_not_fail_ingest(tmp_path, local_lotto, monkeypatch, caplog):
+    """Test a Parquet compaction error after a successful ingest is only a warning"""
+    from etl import columnar
+
+    def fail(*args, **kwargs):
+        raise OSError('pyarrow exploded')
+
+    monkeypatch.setattr(columnar, 'compact_game', fail)
+    monkeypatch.setattr('sys.argv', ['run_ingest', '--data-repo-path', str(tmp_path), '--games', 'pais_lotto',
+                                     '--no-http-cache', '--no-raw-store'])
+    run_ingest.main()
+
+    assert 'Parquet compaction failed: pyarrow exploded' in caplog.text
+    assert run_ingest.load_stop_markers(tmp_path)['pais_lotto']['last_draw_id']
@@ -0,0 +1,119 @@
+"""Filterable ingestion log queries, keyset pagination and retention rollups"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app
+from models.database import Database
+
+def _add_run(db, run_date, game_id='lotto', status='success', fetched=10, errors=None, duration=1.0, retries=1):
+    with db.get_connection() as conn:
+        conn.execute('''
+            INSERT INTO ingestion_runs (game_id, run_date, status, records_fetched, errors, duration_seconds, retries)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (game_id, run_date, status, fetched, json.dumps(errors or []), duration, retries))
+
+@pytest.fixture
+def db(tmp_path):
+    return Database(str(tmp_path / 'logs.db'))
+
+def test_filters_and_keyset_pagination(db):
+    """Test game/status/date filters and that cursor pages cover every run exactly once"""
+    for day in range(1, 6):
+        _add_run(db, f'2024-03-0{day} 03:00:00', 'lotto')
+        _add_run(db, f'2024-03-0{day} 03:00:00', 'chance', status='failed' if day % 2 else 'success')
+
+    seen = []
+    runs, cursor = db.get_ingestion_runs(limit=3)
+    seen.extend(runs)
+    while cursor:
+        runs, cursor = db.get_ingestion_runs(limit=3, before=cursor)
+        seen.extend(runs)
+    assert len(seen) == 10 and len({r['id'] for r in seen}) == 10
+    assert [r['run_date'] for r in seen] == sorted((r['run_date'] for r in seen), reverse=True)
+
+    failed, _ = db.get_ingestion_runs(game_id='chance', status='failed')
+    assert [r['run_date'][:10] for r in failed] == ['2024-03-05', '2024-03-03', '2024-03-01']
+    ranged, _ = db.get_ingestion_runs(game_id='lotto', date_from='2024-03-02', date_to='2024-03-04')
+    assert [r['run_date'][:10] for r in ranged] == ['2024-03-04', '2024-03-03', '2024-03-02']
+
+    with db.get_connection() as conn:
+        plan = [row[3] for row in conn.execute(
+            'EXPLAIN QUERY PLAN SELECT * FROM ingestion_runs WHERE game_id = ? AND (run_date, id) < (?, ?) '
+            'ORDER BY run_date DESC, id DESC LIMIT 5', ('lotto', '2024-03-03', 99))]
+    assert any('idx_ingestion_runs_game_date' in step for step in plan)
+    assert not any('TEMP B-TREE' in step for step in plan)
+
+def test_rollup_moves_old_runs_into_daily_summary(db):
+    """Test old runs are summarized per day/game/status and deleted, and reruns merge"""
+    old = (datetime.utcnow() - timedelta(days=120)).strftime('%Y-%m-%d')
+    recent = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    _add_run(db, f'{old} 01:00:00', fetched=5, duration=2.0)
+    _add_run(db, f'{old} 13:00:00', fetched=7, duration=3.0)
+    _add_run(db, f'{old} 14:00:00', status='failed', errors=['timeout'])
+    _add_run(db, recent)
+
+    result = db.rollup_ingestion_runs(older_than_days=90)
+    assert result['runs_rolled_up'] == 3
+    runs, _ = db.get_ingestion_runs()
+    assert len(runs) == 1 and runs[0]['run_date'] == recent
+
+    summary = {row['status']: row for row in db.get_ingestion_summary(game_id='lotto')}
+    assert summary['success']['day'] == old
+    assert summary['success']['runs'] == 2 and summary['success']['records_fetched'] == 12
+    assert summary['success']['total_duration_seconds'] == 5.0 and summary['success']['max_duration_seconds'] == 3.0
+    assert summary['failed']['runs_with_errors'] == 1 and 'timeout' in summary['failed']['last_error']
+
+    assert db.rollup_ingestion_runs(older_than_days=90)['runs_rolled_up'] == 0
+    _add_run(db, f'{old} 20:00:00', fetched=1, duration=4.0)
+    db.rollup_ingestion_runs(older_than_days=90)
+    merged = {row['status']: row for row in db.get_ingestion_summary()}['success']
+    assert merged['runs'] == 3 and merged['records_fetched'] == 13 and merged['max_duration_seconds'] == 4.0
+
+def test_rollup_merges_runs_without_counters(db):
+    """Test runs with NULL retries/records (logged before those columns existed) do not blank the summary"""
+    old = (datetime.utcnow() - timedelta(days=120)).strftime('%Y-%m-%d')
+    _add_run(db, f'{old} 01:00:00', fetched=5, retries=2)
+    db.rollup_ingestion_runs(older_than_days=90)
+    _add_run(db, f'{old} 02:00:00', fetched=None, retries=None)
+    db.rollup_ingestion_runs(older_than_days=90)
+    _add_run(db, f'{old} 03:00:00', fetched=3, retries=1)
+    db.rollup_ingestion_runs(older_than_days=90)
+
+    row = db.get_ingestion_summary()[0]
+    assert (row['runs'], row['records_fetched'], row['retries']) == (3, 8, 3)
+
+def test_rollup_keeps_most_recent_error(db):
+    """Test last_error is the latest run's error even when an earlier error sorts higher"""
+    old = (datetime.utcnow() - timedelta(days=120)).strftime('%Y-%m-%d')
+    _add_run(db, f'{old} 01:00:00', status='failed', errors=['timeout fetching page'])
+    _add_run(db, f'{old} 05:00:00', status='failed', errors=['HTTP 503'])
+    _add_run(db, f'{old} 09:00:00', status='failed')
+    db.rollup_ingestion_runs(older_than_days=90)
+
+    row = db.get_ingestion_summary()[0]
+    assert row['runs_with_errors'] == 2 and 'HTTP 503' in row['last_error']
+
+def test_ingestion_logs_endpoint(tmp_path):
+    """Test the admin endpoint filters, pages with an opaque cursor and validates input"""
+    app = create_app(overrides={'DATABASE_PATH': str(tmp_path / 'api.db'), 'METRICS_ENABLED': False})
+    db = app.extensions['lottery_db']
+    for day in range(1, 4):
+        _add_run(db, f'2024-05-0{day} 03:00:00', 'lotto')
+    _add_run(db, '2024-05-02 04:00:00', '777')
+    with app.app_context():
+        headers = {'Authorization': f"Bearer {create_access_token(identity='admin')}"}
+
+    with app.test_client() as client:
+        first = client.get('/api/admin/ingestion-logs?game_id=lotto&limit=2', headers=headers).get_json()
+        assert [l['run_date'][:10] for l in first['logs']] == ['2024-05-03', '2024-05-02']
+        second = client.get(f"/api/admin/ingestion-logs?game_id=lotto&limit=2&cursor={first['next_cursor']}",
+                            headers=headers).get_json()
+        assert [l['run_date'][:10] for l in second['logs']] == ['2024-05-01']
+        assert second['next_cursor'] is None
+
+        assert client.get('/api/admin/ingestion-logs?from=05/01/2024', headers=headers).status_code == 400
+        assert client.get('/api/admin/ingestion-logs?cursor=@@', headers=headers).status_code == 400
+        assert client.get('/api/admin/ingestion-logs/summary', headers=headers).get_json()['summary'] == []
@@ -0,0 +1,38 @@
+"""Load-test harness tests (mix parsing, reporting and a short run under gunicorn)"""
+
+import pytest
+from benchmarks.load_test import (
+    build_database, parse_configs, parse_mix, run_config, summarize
+)
+
+def test_parse_mix_and_configs():
+    """Test weighted mixes and WORKERSxTHREADS lists are parsed and validated"""
+    assert parse_mix('draws=5, latest=3,stats') == {'draws': 5.0, 'latest': 3.0, 'stats': 1.0}
+    with pytest.raises(ValueError):
+        parse_mix('draws=1,bogus=2')
+    with pytest.raises(ValueError):
+        parse_mix('draws=0')
+    assert parse_configs('1x1, 2x4,3') == [(1, 1), (2, 4), (3, 1)]
+
+def test_summarize_reports_percentiles_and_errors():
+    """Test per-endpoint and overall throughput, percentiles and error rate"""
+    samples = [{'endpoint': 'draws', 'status': 200, 'error': None, 'latency': i / 1000} for i in range(1, 101)]
+    samples += [{'endpoint': 'stats', 'status': 500, 'error': None, 'latency': 0.2},
+                {'endpoint': 'stats', 'status': 0, 'error': 'ConnectTimeout', 'latency': 1.0}]
+    report = summarize(samples, elapsed=2.0)
+    assert report['draws']['requests'] == 100
+    assert report['draws']['p50_ms'] == 51.0 and report['draws']['p99_ms'] == 99.0
+    assert report['draws']['error_rate'] == 0
+    assert report['stats']['errors'] == 2
+    assert report['all']['requests'] == 102 and report['all']['rps'] == 51.0
+
+def test_short_run_under_gunicorn(tmp_path):
+    """Test the harness serves the weighted mix from a synthetic database without errors"""
+    counts = build_database(str(tmp_path), games=['lotto'], years=2)
+    assert counts['lotto'] > 100
+    mix = {'draws': 2, 'latest': 1, 'coverage': 1}
+    report = run_config(str(tmp_path), 1, 2, mix, rate=20, duration=1, warmup=0,
+                        games=['lotto'], concurrency=4)
+    assert report['all']['requests'] == 20
+    assert report['all']['errors'] == 0
+    assert set(report) <= {'all', 'draws', 'latest', 'coverage'}
@@ -0,0 +1,71 @@
+"""Memory accounting and analytics memory budget tests"""
+
+import tracemalloc
+
+import pytest
+from api.memory import MemoryBudget, track_memory
+from app import create_app
+from models.synthetic import generate_draws
+
+@pytest.fixture
+def tracing():
+    tracemalloc.start()
+    yield
+    tracemalloc.stop()
+
+def test_track_memory_nested_peaks(tracing):
+    """Test inner peaks are measured and also count towards the enclosing block"""
+    with track_memory() as outer:
+        keep = bytearray(512 * 1024)
+        with track_memory() as inner:
+            temp = bytearray(2 * 1024 * 1024)
+            del temp
+        del keep
+    assert inner['peak_bytes'] >= 2 * 1024 * 1024
+    assert outer['peak_bytes'] >= inner['peak_bytes'] + 512 * 1024
+
+def test_track_memory_without_tracing():
+    """Test the tracker is a no-op when tracemalloc is off"""
+    assert not tracemalloc.is_tracing()
+    with track_memory('statistics') as used:
+        pass
+    assert used['peak_bytes'] is None
+
+def test_budget_plans_fewer_draws_and_learns():
+    """Test the budget degrades to fewer draws, never below the minimum, using measured estimates"""
+    assert MemoryBudget(0).plan('statistics', 1000) == (1000, False)
+    budget = MemoryBudget(budget_bytes=1024 * 1024, bytes_per_draw=2048, min_draws=100)
+    assert budget.plan('statistics', 1000) == (512, True)
+    assert budget.plan('statistics', 400) == (400, False)
+    budget.record('statistics', peak_bytes=40 * 1024 * 1024, draws=1000)
+    assert budget.plan('statistics', 1000) == (100, True)
+    budget.record('recommendations', peak_bytes=100 * 1024, draws=1000)
+    assert budget.plan('recommendations', 1000) == (1000, False)
+
+def test_stats_endpoint_degrades_and_exports_peaks(tmp_path):
+    """Test an over-budget stats request analyzes fewer draws and peaks reach /metrics"""
+    app = create_app(overrides={
+        'DATABASE_PATH': str(tmp_path / 'memory.db'),
+        'METRICS_ENABLED': True,
+        'MEMORY_TRACKING_ENABLED': True,
+        'ANALYTICS_MEMORY_BUDGET_MB': 0.25,
+        'ANALYTICS_MIN_DRAWS': 50
+    })
+    try:
+        app.extensions['lottery_db'].upsert_draws(generate_draws('lotto', n_draws=1500))
+        with app.test_client() as client:
+            data = client.get('/api/stats/lotto').get_json()
+            assert data['sample_size'] == 128
+            assert data['degraded'] == {'reason': 'memory_budget', 'sample_size': 128, 'requested': 1000}
+            assert app.extensions['memory_budget'].bytes_per_draw('statistics') != 2048
+
+            recs = client.get('/api/recommendations/lotto').get_json()
+            assert recs['success'] and 'balanced_set' in recs['recommendations']
+
+            metrics = client.get('/metrics').get_data(as_text=True)
+        assert 'analytics_memory_peak_bytes_count{stage="statistics"}' in metrics
+        assert 'analytics_memory_peak_bytes_count{stage="get_draws"}' in metrics
+        assert 'http_request_memory_peak_bytes_count{blueprint="api",route="/api/stats/<game_id>"}' in metrics
+        assert 'analytics_degraded_total{kind="statistics"}' in metrics
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,74 @@
+"""NDJSON sidecar draw_id index tests"""
+
+import json
+
+from etl.utils.ndjson import index_path, load_draw_ids, write_ndjson
+
+
+def _rows(*ids):
+    return [{'draw_id': i, 'numbers': [1, 2, 3]} for i in ids]
+
+
+def test_write_creates_index(tmp_path):
+    """Test writing a year file records its draw_ids in the sidecar"""
+    path = tmp_path / '2024.ndjson'
+    write_ndjson(path, _rows('1', '2'))
+
+    idx = json.loads(index_path(path).read_text(encoding='utf-8'))
+    assert idx['draw_ids'] == ['1', '2']
+    assert idx['offset'] == path.stat().st_size
+    assert load_draw_ids(path) == {'1', '2'}
+
+
+def test_lines_appended_outside_writer_are_picked_up(tmp_path):
+    """Test lines appended without updating the index are found via a tail scan"""
+    path = tmp_path / '2024.ndjson'
+    write_ndjson(path, _rows('1'))
+    with path.open('a', encoding='utf-8') as f:
+        f.write(json.dumps({'draw_id': '2'}) + '\n')
+        f.write('{"draw_id": "3"')  # interrupted write
+
+    assert load_draw_ids(path) == {'1', '2'}
+    assert json.loads(index_path(path).read_text(encoding='utf-8'))['draw_ids'] == ['1', '2']
+
+
+def test_rewritten_file_or_corrupt_index_triggers_rescan(tmp_path):
+    """Test a file rewritten in place or a broken index falls back to a full scan"""
+    path = tmp_path / '2024.ndjson'
+    write_ndjson(path, _rows('1', '2'))
+
+    path.write_text(json.dumps({'draw_id': '9'}) + '\n' + json.dumps({'draw_id': '10'}) + '\n', encoding='utf-8')
+    assert load_draw_ids(path) == {'9', '10'}
+
+    index_path(path).write_text('not json', encoding='utf-8')
+    assert load_draw_ids(path) == {'9', '10'}
+
+
+def test_append_after_interrupted_write_starts_a_new_line(tmp_path):
+    """Test appending to a file ending in a partial line does not glue records onto it"""
+    path = tmp_path / '2024.ndjson'
+    write_ndjson(path, _rows('1'))
+    with path.open('a', encoding='utf-8') as f:
+        f.write('{"draw_id": "2"')  # interrupted write
+
+    write_ndjson(path, _rows('3'))
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert lines[1] == '{"draw_id": "2"'
+    assert json.loads(lines[2])['draw_id'] == '3'
+    assert load_draw_ids(path) == {'1', '3'}
+
+
+def test_write_reuses_ids_already_loaded(tmp_path, monkeypatch):
+    """Test passing the loaded id set skips a second index load"""
+    path = tmp_path / '2024.ndjson'
+    write_ndjson(path, _rows('1'))
+    ids = load_draw_ids(path)
+
+    def fail(_path):
+        raise AssertionError('index loaded twice')
+    monkeypatch.setattr('etl.utils.ndjson.load_draw_ids', fail)
+    write_ndjson(path, _rows('2'), ids=ids)
+    monkeypatch.undo()
+
+    assert ids == {'1', '2'}
+    assert load_draw_ids(path) == {'1', '2'}
@@ -0,0 +1,70 @@
+"""Concurrent ingestion orchestrator tests"""
+
+import threading
+import time
+
+from etl.orchestrator import HostThrottle, run_concurrently
+
+def test_extract_runs_in_parallel_and_load_is_serial():
+    """Test wall time is bounded by the slowest extraction and loads never overlap"""
+    loading = threading.Lock()
+    overlaps = []
+
+    def extract(item):
+        time.sleep(0.2)
+        return item * 2
+
+    def load(item, fut):
+        if not loading.acquire(blocking=False):
+            overlaps.append(item)
+            return None
+        try:
+            return fut.result()
+        finally:
+            loading.release()
+
+    started = time.monotonic()
+    results = dict(run_concurrently([1, 2, 3, 4], extract, load, max_workers=4))
+    assert time.monotonic() - started < 0.6
+    assert results == {1: 2, 2: 4, 3: 6, 4: 8}
+    assert overlaps == []
+
+def test_extract_errors_reach_load():
+    """Test extraction exceptions surface through the future passed to load"""
+    def extract(item):
+        raise RuntimeError(f'fetch failed: {item}')
+
+    def load(item, fut):
+        try:
+            fut.result()
+        except RuntimeError as e:
+            return str(e)
+
+    assert run_concurrently(['lotto'], extract, load, max_workers=2) == [('lotto', 'fetch failed: lotto')]
+
+def test_host_throttle_caps_concurrency_and_spaces_requests():
+    """Test per-host cap and politeness delay"""
+    throttle = HostThrottle(max_per_host=2, delay=0.05)
+    active = {'now': 0, 'max': 0}
+    starts = []
+    lock = threading.Lock()
+
+    def request():
+        with throttle.slot('https://www.pais.co.il/lotto/archive.aspx'):
+            with lock:
+                starts.append(time.monotonic())
+                active['now'] += 1
+                active['max'] = max(active['max'], active['now'])
+            time.sleep(0.1)
+            with lock:
+                active['now'] -= 1
+
+    threads = [threading.Thread(target=request) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    starts.sort()
+    assert active['max'] == 2
+    assert all(b - a >= 0.045 for a, b in zip(starts, starts[1:]))
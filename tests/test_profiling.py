@@ -0,0 +1,85 @@
+"""Opt-in request profiling tests"""
+
+import pstats
+import re
+
+import pytest
+from flask_jwt_extended import create_access_token
+from api.profiling import ProfileStore
+from app import create_app
+from models.synthetic import generate_draws
+
+def _make_app(tmp_path, **overrides):
+    app = create_app(overrides={
+        'DATABASE_PATH': str(tmp_path / 'profiling.db'),
+        'PROFILE_DIR': str(tmp_path / 'profiles'),
+        'PROFILE_INTERVAL_MS': 1,
+        'METRICS_ENABLED': False,
+        **overrides
+    })
+    app.extensions['lottery_db'].upsert_draws(generate_draws('lotto', n_draws=1000))
+    with app.app_context():
+        headers = {'Authorization': f"Bearer {create_access_token(identity='admin', additional_claims={'role': 'admin'})}"}
+    return app, headers
+
+def test_admin_header_profiles_request_as_folded_stacks(tmp_path):
+    """Test only X-Profile with a valid admin JWT profiles, and the profile can be listed and downloaded"""
+    app, headers = _make_app(tmp_path)
+    with app.test_client() as client:
+        assert 'X-Profile-Id' not in client.get('/api/stats/lotto').headers
+        assert 'X-Profile-Id' not in client.get('/api/stats/lotto', headers={'X-Profile': '1'}).headers
+        assert 'X-Profile-Id' not in client.get('/api/games', headers={**headers, 'X-Profile': '1'}).headers
+
+        response = client.get('/api/stats/lotto', headers={**headers, 'X-Profile': '1'})
+        assert response.status_code == 200
+        profile_id = response.headers['X-Profile-Id']
+
+        profiles = client.get('/api/admin/profiles', headers=headers).get_json()['profiles']
+        assert [p['id'] for p in profiles] == [profile_id]
+        assert profiles[0]['path'] == '/api/stats/lotto'
+        assert profiles[0]['requested_by'] == 'admin'
+        assert profiles[0]['samples'] > 0
+
+        folded = client.get(f'/api/admin/profiles/{profile_id}', headers=headers).get_data(as_text=True)
+        lines = folded.splitlines()
+        assert lines and all(re.match(r'^\S.* \d+$', line) for line in lines)
+        assert 'api/routes.py' in folded
+
+        assert client.get('/api/admin/profiles/../../etc/passwd', headers=headers).status_code == 404
+        assert client.get('/api/admin/profiles', headers={}).status_code == 401
+
+def test_non_admin_token_does_not_profile(tmp_path):
+    """Test a valid JWT without the admin role cannot trigger profiling"""
+    app, _ = _make_app(tmp_path)
+    with app.app_context():
+        viewer = create_access_token(identity='viewer', additional_claims={'role': 'viewer'})
+        no_role = create_access_token(identity='legacy')
+    with app.test_client() as client:
+        for token in (viewer, no_role):
+            response = client.get('/api/stats/lotto', headers={'Authorization': f'Bearer {token}', 'X-Profile': '1'})
+            assert response.status_code == 200
+            assert 'X-Profile-Id' not in response.headers
+    assert app.extensions['profile_store'].list() == []
+
+def test_sampled_cprofile_mode_writes_pstats(tmp_path):
+    """Test PROFILE_SAMPLE_RATE selects requests and cprofile mode writes a loadable pstats file"""
+    app, headers = _make_app(tmp_path, PROFILE_MODE='cprofile', PROFILE_SAMPLE_RATE=1.0)
+    with app.test_client() as client:
+        profile_id = client.get('/api/draws/lotto/latest').headers['X-Profile-Id']
+    meta, path = app.extensions['profile_store'].get(profile_id)
+    assert meta['requested_by'] == 'sampled' and meta['file'].endswith('.pstats')
+    assert pstats.Stats(path).total_calls > 0
+
+def test_store_keeps_newest_profiles(tmp_path):
+    """Test pruning keeps only the newest PROFILE_KEEP profiles"""
+    store = ProfileStore(str(tmp_path), keep=2)
+    ids = [f'2024010{i}T000000-{i:012x}' for i in range(1, 5)]
+    for profile_id in ids:
+        store.save(profile_id, 'sample', lambda path: open(path, 'w').close(), {})
+    assert [p['id'] for p in store.list()] == ids[:1:-1]
+    assert store.get(ids[0]) is None
+
+def test_invalid_profile_mode_is_rejected(tmp_path):
+    """Test an unknown PROFILE_MODE fails at startup"""
+    with pytest.raises(ValueError):
+        create_app(overrides={'PROFILE_MODE': 'bogus', 'PROFILE_DIR': str(tmp_path), 'METRICS_ENABLED': False})
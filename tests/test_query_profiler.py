@@ -0,0 +1,46 @@
+"""SQL query profiler tests"""
+
+from flask_jwt_extended import create_access_token
+from app import create_app
+from models import query_profiler
+from models.database import Database, add_query_listener, remove_query_listener
+from models.query_profiler import QueryProfiler, fingerprint
+
+def test_fingerprint_normalizes_literals():
+    """Test literals and IN-list lengths do not create separate fingerprints"""
+    a = fingerprint("SELECT *  FROM draws\n WHERE game_id = 'lotto' AND draw_number IN (?, ?, ?) LIMIT 10")
+    b = fingerprint("SELECT * FROM draws WHERE game_id = 'chance' AND draw_number IN (?,?) LIMIT 5")
+    assert a == b == 'SELECT * FROM draws WHERE game_id = ? AND draw_number IN (?+) LIMIT ?'
+
+def test_profiler_aggregates_and_captures_plans(tmp_path):
+    """Test per-fingerprint counts/percentiles and EXPLAIN QUERY PLAN for slow statements"""
+    db = Database(str(tmp_path / 'test.db'))
+    profiler = QueryProfiler(slow_ms=0)
+    add_query_listener(profiler)
+    try:
+        for game_id in ('lotto', 'chance', 'lotto'):
+            db.get_draws(game_id)
+        with db.get_connection() as conn:
+            conn.cursor().execute('SELECT COUNT(*) FROM draws WHERE verified = 1')
+    finally:
+        remove_query_listener(profiler)
+
+    top = {q['fingerprint']: q for q in profiler.top(limit=50)}
+    by_game = next(q for key, q in top.items() if key.startswith('SELECT * FROM draws WHERE game_id'))
+    assert by_game['count'] == 3
+    assert by_game['p50_ms'] <= by_game['p99_ms'] <= by_game['max_ms']
+    assert any('idx_draws_game_date' in step for step in by_game['plan'])
+    assert not by_game['full_scan']
+    assert top['SELECT COUNT(*) FROM draws WHERE verified = ?']['full_scan']
+
+def test_admin_query_stats_endpoint(tmp_path, monkeypatch):
+    """Test the admin endpoint returns profiler rows and rejects unknown sorts"""
+    app = create_app(overrides={'DATABASE_PATH': str(tmp_path / 'api.db'), 'METRICS_ENABLED': False})
+    monkeypatch.setattr(query_profiler, 'profiler', QueryProfiler(slow_ms=1000))
+    query_profiler.profiler('SELECT 1', (), 0.002)
+    with app.app_context():
+        headers = {'Authorization': f"Bearer {create_access_token(identity='admin')}"}
+    with app.test_client() as client:
+        data = client.get('/api/admin/stats/queries?sort=count', headers=headers).get_json()
+        assert data['queries'][0]['fingerprint'] == 'SELECT ?'
+        assert client.get('/api/admin/stats/queries?sort=bogus', headers=headers).status_code == 400
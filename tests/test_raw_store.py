@@ -0,0 +1,73 @@
+"""Raw page store and offline reparse tests"""
+
+import json
+from etl import reparse, run_ingest
+from etl.parsers.pais_heuristic import parse_pais_archive_html
+from etl.testing import LOTTO_ARGS, make_archive_page
+from etl.utils.ndjson import load_draw_ids, write_ndjson
+from etl.utils.raw_store import RawPageStore
+
+def test_store_is_content_addressed(tmp_path):
+    """Test identical bodies are stored once but every fetch is in the manifest"""
+    store = RawPageStore(tmp_path / 'raw', codec='gzip')
+    body = make_archive_page(5).encode('utf-8')
+
+    sha = store.put('https://www.pais.co.il/lotto/archive.aspx', body, game_id='pais_lotto')
+    assert store.put('https://www.pais.co.il/lotto/archive.aspx', body, game_id='pais_lotto') == sha
+
+    assert store.get(sha) == body
+    assert len(list((tmp_path / 'raw' / 'objects').rglob('*.gz'))) == 1
+    assert [e['sha256'] for e in store.iter_manifest()] == [sha, sha]
+
+def test_reparse_merges_archived_pages_into_dataset(tmp_path):
+    """Test reparse updates and adds archived draws but keeps draws the store does not have"""
+    store = RawPageStore(tmp_path / 'raw')
+    store.put('u', make_archive_page(40, seed=1).encode('utf-8'), game_id='pais_lotto')
+    store.put('u', make_archive_page(60, seed=1).encode('utf-8'), game_id='pais_lotto')
+    archived = parse_pais_archive_html(make_archive_page(60, seed=1), **LOTTO_ARGS)
+    connector = run_ingest.GAMES['pais_lotto']['connector']()
+    for d in archived:
+        d.checksum = connector.calculate_checksum(d)
+
+    data_dir = tmp_path / run_ingest.GAMES['pais_lotto']['data_subdir']
+    unchanged = run_ingest.draw_payload(archived[0])
+    outdated = dict(run_ingest.draw_payload(archived[1]), numbers=[1, 2, 3, 4, 5, 6], checksum='old')
+    scraped = {'game_id': 'pais_lotto', 'draw_id': '1', 'date': '1985-03-02',
+               'numbers': [1, 2, 3, 4, 5, 6], 'bonus': [7], 'checksum': 'pre-store'}
+    write_ndjson(data_dir / f"{archived[0].draw_date.year}.ndjson", [unchanged])
+    write_ndjson(data_dir / f"{archived[1].draw_date.year}.ndjson", [outdated])
+    write_ndjson(data_dir / '1985.ndjson', [scraped])
+
+    results = reparse.reparse(tmp_path, store, ['pais_lotto', 'pais_chance'], workers=2)
+    assert [r['game_id'] for r in results] == ['pais_lotto']
+    assert (results[0]['fetched'], results[0]['added'], results[0]['updated'], results[0]['kept']) == (60, 58, 1, 1)
+
+    records = {}
+    for path in data_dir.glob('*.ndjson'):
+        recs = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+        assert load_draw_ids(path) == {r['draw_id'] for r in recs}
+        records.update((r['draw_id'], r) for r in recs)
+    assert len(records) == 61
+    assert records['1'] == scraped
+    assert records[archived[1].draw_id]['numbers'] == archived[1].numbers
+    assert records[archived[0].draw_id] == unchanged
+    assert not list(tmp_path.rglob('*.reparse*'))
+
+def test_reparse_rebuilds_parquet(tmp_path):
+    """Test the Parquet copy reflects reparsed draws even when year file sizes are unchanged"""
+    from etl import columnar
+    store = RawPageStore(tmp_path / 'raw')
+    html = make_archive_page(5, seed=3)
+    store.put('u', html.encode('utf-8'), game_id='pais_lotto')
+    draw = parse_pais_archive_html(html, **LOTTO_ARGS)[0]
+    draw.checksum = run_ingest.GAMES['pais_lotto']['connector']().calculate_checksum(draw)
+
+    data_dir = tmp_path / run_ingest.GAMES['pais_lotto']['data_subdir']
+    wrong = [(n % 37) + 1 for n in draw.numbers]  # same digit count, so the file size barely moves
+    write_ndjson(data_dir / f'{draw.draw_date.year}.ndjson', [dict(run_ingest.draw_payload(draw), numbers=wrong, checksum='old')])
+    columnar.compact_game(tmp_path, 'pais_lotto')
+
+    reparse.reparse(tmp_path, store, ['pais_lotto'], workers=1)
+    table = columnar.read_draws(tmp_path, 'pais_lotto', columns=['draw_id', 'n1'])
+    n1 = dict(zip(table.column('draw_id').to_pylist(), table.column('n1').to_pylist()))
+    assert n1[draw.draw_id] == draw.numbers[0]
@@ -0,0 +1,137 @@
+"""ETL scheduler tests"""
+
+import threading
+import time
+import pytest
+from datetime import datetime, timedelta
+from models.database import Database
+from scripts.scheduler import ETLScheduler, build_trigger
+
+@pytest.fixture
+def db(tmp_path):
+    return Database(str(tmp_path / 'test.db'))
+
+def _schedules(db):
+    return {s['game_id']: s for s in db.get_etl_schedules()}
+
+def test_build_trigger_rejects_bad_expressions():
+    """Test cron validation"""
+    assert build_trigger('0 3 * * *', jitter=60).jitter == 60
+    with pytest.raises(ValueError):
+        build_trigger('0 3 * *')
+
+@pytest.mark.parametrize('expression,weekdays', [
+    ('0 3 * * 0', {'Sun'}),
+    ('0 3 * * 7', {'Sun'}),
+    ('0 3 * * 1-5', {'Mon', 'Tue', 'Wed', 'Thu', 'Fri'}),
+    ('0 3 * * 5-7', {'Fri', 'Sat', 'Sun'}),
+    ('0 3 * * */3', {'Sun', 'Wed', 'Sat'}),
+    ('0 3 * * tue,sat', {'Tue', 'Sat'}),
+])
+def test_build_trigger_uses_crontab_weekdays(expression, weekdays):
+    """Test numeric day_of_week fields count from Sunday like crontab"""
+    trigger = build_trigger(expression)
+    fired, previous = set(), None
+    now = datetime(2026, 10, 19, tzinfo=trigger.timezone)
+    for _ in range(14):
+        previous = trigger.get_next_fire_time(previous, now)
+        fired.add(previous.strftime('%a'))
+        now = previous
+    assert fired == weekdays
+    with pytest.raises(ValueError):
+        build_trigger('0 3 * * 8')
+
+def test_schedules_load_with_default_fallback(db):
+    """Test games without a schedule row fall back to the default cron"""
+    db.upsert_etl_schedule('lotto', '30 22 * * tue,sat')
+    scheduler = ETLScheduler(db, game_ids=['lotto', 'chance'], default_cron='0 3 * * *', sync_interval=0)
+    scheduler.start()
+    try:
+        jobs = {job.id: job for job in scheduler.scheduler.get_jobs()}
+        assert set(jobs) == {'etl:lotto', 'etl:chance'}
+        schedules = _schedules(db)
+        assert schedules['lotto']['next_run'] is not None
+        assert schedules['chance']['schedule_type'] == 'default'
+        assert scheduler._loaded == {'lotto': '30 22 * * tue,sat', 'chance': '0 3 * * *'}
+    finally:
+        scheduler.shutdown(wait=False)
+
+def test_reload_applies_edits_and_run_records_last_run(db):
+    """Test admin edits are picked up without restart and runs write last_run"""
+    ran = []
+    scheduler = ETLScheduler(db, game_ids=['lotto', 'chance'], runner=lambda **kw: ran.append(kw), sync_interval=0)
+    scheduler.start()
+    try:
+        db.upsert_etl_schedule('lotto', '15 4 * * *')
+        db.upsert_etl_schedule('chance', None, is_enabled=False)
+        scheduler.reload()
+        assert scheduler._loaded == {'lotto': '15 4 * * *'}
+        assert _schedules(db)['chance']['next_run'] is None
+
+        scheduler._run_game('lotto')
+        assert ran[0]['game_id'] == 'lotto'
+        assert _schedules(db)['lotto']['last_run'] is not None
+    finally:
+        scheduler.shutdown(wait=False)
+
+@pytest.mark.parametrize('missed_by,last_run_after,catches_up', [
+    (timedelta(minutes=1), False, True),
+    (timedelta(hours=2), False, False),
+    (timedelta(minutes=1), True, False),
+])
+def test_restart_catches_up_missed_run(db, missed_by, last_run_after, catches_up):
+    """Test a run due while no scheduler was up is run once on load, within the grace time"""
+    due = datetime.now().astimezone() - missed_by
+    db.ensure_etl_schedule('lotto')
+    db.update_schedule_runs('lotto', next_run=due,
+                            last_run=(due + timedelta(seconds=5)).replace(tzinfo=None) if last_run_after else None)
+    ran = []
+    scheduler = ETLScheduler(db, game_ids=['lotto'], runner=lambda **kw: ran.append(kw),
+                             misfire_grace_time=3600, sync_interval=0)
+    scheduler.start()
+    try:
+        deadline = time.monotonic() + 5
+        while catches_up and not ran and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert [r['game_id'] for r in ran] == (['lotto'] if catches_up else [])
+        # The catch-up reuses the regular job, so it can never overlap the next cron fire
+        assert [job.id for job in scheduler.scheduler.get_jobs() if job.id.startswith('etl:lotto')] == ['etl:lotto']
+        deadline = time.monotonic() + 5
+        while scheduler.scheduler.get_job('etl:lotto').next_run_time <= datetime.now().astimezone():
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        scheduler.reload()
+        assert len(ran) == (1 if catches_up else 0)
+    finally:
+        scheduler.shutdown(wait=False)
+
+def test_log_rollup_job_is_scheduled(db):
+    """Test the ingestion log rollup runs as a maintenance job when retention is set"""
+    scheduler = ETLScheduler(db, game_ids=['lotto'], sync_interval=0, log_retention_days=30, rollup_cron='15 4 * * *')
+    scheduler.start()
+    try:
+        job = scheduler.scheduler.get_job('maintenance:rollup-ingestion-runs')
+        assert job is not None and job.executor == 'maintenance'
+        scheduler._rollup_logs()
+    finally:
+        scheduler.shutdown(wait=False)
+
+def test_schedule_sync_is_not_blocked_by_running_etl(db):
+    """Test schedule reloads run on the maintenance executor while ETL threads are busy"""
+    release = threading.Event()
+    scheduler = ETLScheduler(db, game_ids=['lotto', 'chance'], runner=lambda **kw: release.wait(5),
+                             max_concurrency=2, sync_interval=1)
+    scheduler.start()
+    try:
+        for game_id in ('lotto', 'chance'):
+            scheduler.scheduler.add_job(scheduler._run_game, 'date', args=[game_id], id=f'busy:{game_id}')
+        assert scheduler.scheduler.get_job('etl:sync-schedules').executor == 'maintenance'
+
+        db.upsert_etl_schedule('lotto', '15 4 * * *')
+        deadline = time.monotonic() + 5
+        while scheduler._loaded.get('lotto') != '15 4 * * *' and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert scheduler._loaded['lotto'] == '15 4 * * *'
+    finally:
+        release.set()
+        scheduler.shutdown(wait=False)
@@ -0,0 +1,66 @@
+"""Single-flight tests"""
+
+import threading
+import time
+
+import pytest
+from api.singleflight import SingleFlight, fcntl
+
+def _run_concurrently(flight, key, fn, n=8):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do(key, fn))) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+def test_concurrent_calls_share_result():
+    """Test concurrent identical calls run the computation once"""
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {'value': 42}
+
+    results = _run_concurrently(SingleFlight(), 'stats:lotto', compute)
+    assert len(calls) == 1
+    assert results == [{'value': 42}] * 8
+
+def test_errors_propagate_and_do_not_stick():
+    """Test a failing leader raises for everyone and the next call recomputes"""
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError):
+        flight.do('k', fail)
+    assert flight.do('k', lambda: 'ok') == 'ok'
+
+@pytest.mark.skipif(fcntl is None, reason='requires fcntl')
+def test_lock_dir_shares_result_across_workers(tmp_path):
+    """Test a worker waiting on the lock file reuses the other worker's result"""
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {'value': len(calls)}
+
+    worker_a = SingleFlight(lock_dir=str(tmp_path))
+    worker_b = SingleFlight(lock_dir=str(tmp_path))
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(worker_a.do('k', compute))),
+        threading.Thread(target=lambda: results.append(worker_b.do('k', compute))),
+    ]
+    for t in threads:
+        t.start()
+        time.sleep(0.05)
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == [{'value': 1}, {'value': 1}]
@@ -0,0 +1,69 @@
+"""NDJSON archive -> SQLite sync tests"""
+
+import sqlite3
+
+from etl import run_ingest
+from etl.connectors.pais_lotto import PaisLottoConnector
+from etl.parsers.pais_heuristic import parse_pais_archive_html
+from etl.testing import LOTTO_ARGS, make_archive_page
+from models.database import Database
+from scripts.sync_archive import sync_archive
+
+def test_sync_is_incremental(tmp_path):
+    """Test unchanged files are skipped and only new/changed draws are written"""
+    data_repo = tmp_path / 'archive'
+    db = Database(str(tmp_path / 'test.db'))
+    draws = parse_pais_archive_html(make_archive_page(50), **LOTTO_ARGS)
+    run_ingest.write_draws(data_repo, 'pais_lotto', draws[10:])
+
+    first = sync_archive(data_repo, 'pais_lotto', db=db, batch_size=7)['pais_lotto']
+    assert first['records_inserted'] == 40
+    stored = db.get_draws('lotto', limit=1)[0]
+    newest = draws[10]
+    assert stored['draw_number'] == int(newest.draw_id)
+    assert stored['results'] == {'main_numbers': newest.numbers, 'bonus_numbers': newest.bonus_numbers}
+
+    second = sync_archive(data_repo, 'pais_lotto', db=db)['pais_lotto']
+    assert second['files'] == 0 and second['records_fetched'] == 0
+
+    run_ingest.write_draws(data_repo, 'pais_lotto', draws[:10])
+    third = sync_archive(data_repo, 'pais_lotto', db=db)['pais_lotto']
+    assert third['records_inserted'] == 10
+    assert third['records_updated'] == 0
+    assert third['records_unchanged'] == third['records_fetched'] - 10
+    assert len(list(db.iter_draws('lotto'))) == 50
+
+def test_upsert_draws_counts_changes(tmp_path):
+    """Test upsert_draws reports inserted, updated and unchanged rows"""
+    db = Database(str(tmp_path / 'test.db'))
+    draw = {'game_id': 'lotto', 'draw_number': 1, 'draw_date': '2024-01-02',
+            'results': {'main_numbers': [1, 2, 3, 4, 5, 6], 'bonus_numbers': [1]}}
+
+    assert db.upsert_draws([draw]) == {'inserted': 1, 'updated': 0, 'unchanged': 0}
+    assert db.upsert_draws([draw]) == {'inserted': 0, 'updated': 0, 'unchanged': 1}
+    changed = dict(draw, results={'main_numbers': [1, 2, 3, 4, 5, 7], 'bonus_numbers': [1]})
+    assert db.upsert_draws([changed, dict(draw, draw_number=2)]) == {'inserted': 1, 'updated': 1, 'unchanged': 0}
+    stored = {d['draw_number']: d for d in db.get_draws('lotto')}
+    assert stored[1]['results']['main_numbers'] == [1, 2, 3, 4, 5, 7]
+
+def test_checksum_matches_connector_scheme_and_old_db_is_migrated(tmp_path):
+    """Test stored checksums equal the archive's and older databases gain the new columns"""
+    path = str(tmp_path / 'old.db')
+    with sqlite3.connect(path) as conn:
+        conn.execute('CREATE TABLE draws (id INTEGER PRIMARY KEY AUTOINCREMENT, game_id TEXT NOT NULL, '
+                     'draw_number INTEGER NOT NULL, draw_date DATE NOT NULL, results JSON NOT NULL, '
+                     'extra_data JSON, source_url TEXT, verified BOOLEAN DEFAULT 0, '
+                     'created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, UNIQUE(game_id, draw_number))')
+        conn.execute('CREATE TABLE ingestion_runs (id INTEGER PRIMARY KEY AUTOINCREMENT, game_id TEXT, '
+                     'run_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP, status TEXT NOT NULL, records_fetched INTEGER DEFAULT 0, records_inserted INTEGER DEFAULT 0, '
+                     'records_updated INTEGER DEFAULT 0, errors JSON, duration_seconds REAL, checksum TEXT)')
+    db = Database(path)
+
+    draw = parse_pais_archive_html(make_archive_page(1), **LOTTO_ARGS)[0]
+    draw.checksum = PaisLottoConnector().calculate_checksum(draw)
+    assert db.insert_draw({
+        'game_id': 'lotto', 'draw_number': int(draw.draw_id), 'draw_date': draw.draw_date.date().isoformat(),
+        'results': {'main_numbers': draw.numbers, 'bonus_numbers': draw.bonus_numbers},
+    }) is not None
+    assert db.get_draws('lotto')[0]['checksum'] == draw.checksum
+    db.log_ingestion_run({'game_id': 'lotto', 'status': 'success', 'records_unchanged': 3})